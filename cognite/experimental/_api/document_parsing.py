@@ -28,6 +28,7 @@ class DocumentParsingAPI(ContextAPI):
         return self._run_job(
             job_path="/detect",
             status_path="/",
+            use_cache=True,
             file_id=file_id,
             entities=entities,
             partial_match=partial_match,
@@ -1,10 +1,24 @@
-from typing import Dict, List, Optional, Tuple, Union
+import hashlib
+import heapq
+import json
+from datetime import datetime
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 from cognite.client import utils
+from cognite.client.data_classes import (
+    EventUpdate,
+    FileMetadataUpdate,
+    RelationshipList,
+    SequenceUpdate,
+    TimeSeriesUpdate,
+)
 from cognite.client.data_classes._base import CogniteResource
+from cognite.client.exceptions import CogniteDuplicatedError
 from cognite.experimental._context_client import ContextAPI
 from cognite.experimental.data_classes import (
     ContextualizationJob,
+    EntityMatchingBlocker,
+    EntityMatchingMatches,
     EntityMatchingModel,
     EntityMatchingModelList,
     EntityMatchingModelUpdate,
@@ -30,6 +44,23 @@ class EntityMatchingPipelineRunsAPI(ContextAPI):
             EntityMatchingPipelineRun: object which can be used to wait for and retrieve results."""
         return self._retrieve(id=id)
 
+    def __call__(
+        self, id: int = None, external_id: str = None, chunk_size: int = None, limit: int = None
+    ) -> Generator[Union[EntityMatchingPipelineRun, EntityMatchingPipelineRunList], None, None]:
+        """Iterate over the run history of a pipeline, fetching pages lazily.
+
+        Args:
+            id: id of the pipeline to retrieve runs for.
+            external_id: external id of the pipeline to retrieve runs for.
+            chunk_size (int, optional): Number of runs to return in each chunk. Defaults to yielding one run a time.
+            limit (int, optional): Maximum number of runs to return. Defaults to returning all items.
+
+        Yields:
+            Union[EntityMatchingPipelineRun, EntityMatchingPipelineRunList]: yields runs one by one if chunk_size is not specified, else EntityMatchingPipelineRunList objects."""
+        return self._camel_list_iterator(
+            "/list", self._load_runs, chunk_size=chunk_size, limit=limit, json={"id": id, "externalId": external_id}
+        )
+
     def list(self, id=None, external_id=None, limit=100) -> EntityMatchingPipelineRunList:
         """List pipeline runs
 
@@ -40,8 +71,19 @@ class EntityMatchingPipelineRunsAPI(ContextAPI):
 
         Returns:
             EntityMatchingPipelineRunList: list of pipeline runs"""
-        runs = self._camel_post("/list", json={"id": id, "externalId": external_id, "limit": limit}).json()["items"]
-        return EntityMatchingPipelineRunList._load(runs, cognite_client=self._cognite_client)
+        runs = [
+            run
+            for page in self._camel_list_generator("/list", limit=limit, json={"id": id, "externalId": external_id})
+            for run in page
+        ]
+        return self._load_runs(runs)
+
+    def _load_runs(self, runs: List[Dict]) -> EntityMatchingPipelineRunList:
+        runs = EntityMatchingPipelineRunList._load(runs, cognite_client=self._cognite_client)
+        for run in runs:
+            run._status_path = self._RESOURCE_PATH + "/"
+            run._status_poller = self.status_poller
+        return runs
 
 
 class EntityMatchingPipelinesAPI(ContextAPI):
@@ -89,6 +131,23 @@ class EntityMatchingPipelinesAPI(ContextAPI):
         utils._auxiliary.assert_type(external_ids, "external_id", [List], allow_none=True)
         return self._retrieve_multiple(ids=ids, external_ids=external_ids, wrap_ids=True)
 
+    def __call__(
+        self, chunk_size: int = None, limit: int = None
+    ) -> Generator[Union[EntityMatchingPipeline, EntityMatchingPipelineList], None, None]:
+        """Iterate over pipelines, fetching pages lazily.
+
+        Args:
+            chunk_size (int, optional): Number of pipelines to return in each chunk. Defaults to yielding one pipeline a time.
+            limit (int, optional): Maximum number of pipelines to return. Defaults to returning all items.
+
+        Yields:
+            Union[EntityMatchingPipeline, EntityMatchingPipelineList]: yields pipelines one by one if chunk_size is not specified, else EntityMatchingPipelineList objects."""
+        return self._camel_list_iterator("/list", self._load_pipelines, chunk_size=chunk_size, limit=limit)
+
+    def __iter__(self) -> Generator[EntityMatchingPipeline, None, None]:
+        """Iterate over all pipelines."""
+        return self.__call__()
+
     def list(self, limit=100) -> EntityMatchingPipelineList:
         """List pipelines
         Args:
@@ -96,7 +155,9 @@ class EntityMatchingPipelinesAPI(ContextAPI):
 
         Returns:
             EntityMatchingModelList: List of pipelines."""
-        pipelines = self._camel_post("/list", json={"limit": limit}).json()["items"]
+        return self._load_pipelines([p for page in self._camel_list_generator("/list", limit=limit) for p in page])
+
+    def _load_pipelines(self, pipelines: List[Dict]) -> EntityMatchingPipelineList:
         return EntityMatchingPipelineList._load(pipelines, cognite_client=self._cognite_client)
 
     def run(self, id: int = None, external_id: str = None) -> ContextualizationJob:
@@ -111,6 +172,28 @@ class EntityMatchingPipelinesAPI(ContextAPI):
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(id, external_id)
         return self._run_job(job_path="/run", id=id, external_id=external_id)
 
+    def run_many(self, ids: List[int] = None, external_ids: List[str] = None) -> List[ContextualizationJob]:
+        """Run many pipelines concurrently. Use `as_completed` to process their results as they finish.
+
+        Args:
+            ids: ids of the pipelines to run.
+            external_ids: external ids of the pipelines to run.
+
+        Returns:
+            List[ContextualizationJob]: one job per pipeline, ids first, in the given order.
+
+        Examples:
+
+            Run pipelines and handle each result as soon as it is available::
+
+                >>> jobs = client.entity_matching.pipelines.run_many(external_ids=site_pipelines)
+                >>> for job in client.entity_matching.pipelines.as_completed(jobs):
+                ...     print(job.job_id, job.status)"""
+        tasks = [(id, None) for id in ids or []] + [(None, external_id) for external_id in external_ids or []]
+        summary = utils._concurrency.execute_tasks_concurrently(self.run, tasks, max_workers=self._config.max_workers)
+        summary.raise_compound_exception_if_failed_tasks()
+        return summary.results
+
 
 class EntityMatchingAPI(ContextAPI):
     _RESOURCE_PATH = EntityMatchingModel._RESOURCE_PATH
@@ -155,11 +238,34 @@ class EntityMatchingAPI(ContextAPI):
     ) -> Union[EntityMatchingModel, List[EntityMatchingModel]]:
         """Update model
 
+        Lists of models are updated in chunks of at most 1000, which are sent in parallel. If some chunks fail, a CogniteAPIError is raised
+        with the models which were updated in `successful`, those which were not in `failed`, and those with an unknown outcome in `unknown`.
+
         Args:
             item (Union[EntityMatchingModel,EntityMatchingModelUpdate,List[Union[EntityMatchingModel,EntityMatchingModelUpdate]]) : Model(s) to update
         """
         return self._update_multiple(items=item)
 
+    def __call__(
+        self, filter: Dict = None, chunk_size: int = None, limit: int = None
+    ) -> Generator[Union[EntityMatchingModel, EntityMatchingModelList], None, None]:
+        """Iterate over models, fetching pages lazily.
+
+        Args:
+            filter (dict): If not None, return models with parameter values that matches what is specified in the filter.
+            chunk_size (int, optional): Number of models to return in each chunk. Defaults to yielding one model a time.
+            limit (int, optional): Maximum number of models to return. Defaults to returning all items.
+
+        Yields:
+            Union[EntityMatchingModel, EntityMatchingModelList]: yields models one by one if chunk_size is not specified, else EntityMatchingModelList objects."""
+        return self._camel_list_iterator(
+            "/list", self._load_models, chunk_size=chunk_size, limit=limit, json={"filter": self._camel_filter(filter)}
+        )
+
+    def __iter__(self) -> Generator[EntityMatchingModel, None, None]:
+        """Iterate over all models."""
+        return self.__call__()
+
     def list(self, filter: Dict = None, limit=100) -> EntityMatchingModelList:
         """List models
 
@@ -169,32 +275,97 @@ class EntityMatchingAPI(ContextAPI):
 
         Returns:
             EntityMatchingModelList: List of models."""
-        filter = {utils._auxiliary.to_camel_case(k): v for k, v in (filter or {}).items() if v is not None}
-        models = self._camel_post("/list", json={"filter": filter}).json()["items"]
-        return EntityMatchingModelList(
-            [self._LIST_CLASS._RESOURCE._load(model, cognite_client=self._cognite_client) for model in models]
-        )
+        pages = self._camel_list_generator("/list", limit=limit, json={"filter": self._camel_filter(filter)})
+        return self._load_models([model for page in pages for model in page])
+
+    def jobs(
+        self, chunk_size: int = None, limit: int = None
+    ) -> Generator[Union[EntityMatchingModel, EntityMatchingModelList], None, None]:
+        """Iterate over jobs, fetching pages lazily.
 
-    def list_jobs(self) -> EntityMatchingModelList:
+        Args:
+            chunk_size (int, optional): Number of jobs to return in each chunk. Defaults to yielding one job a time.
+            limit (int, optional): Maximum number of jobs to return. Defaults to returning all items.
+
+        Yields:
+            Union[EntityMatchingModel, EntityMatchingModelList]: yields jobs one by one if chunk_size is not specified, else EntityMatchingModelList objects."""
+        return self._camel_list_iterator("/jobs", self._load_models, chunk_size=chunk_size, limit=limit, method="GET")
+
+    def list_jobs(self, limit=100) -> EntityMatchingModelList:
         """List jobs
 
+        Args:
+            limit (int, optional): Maximum number of items to return. Defaults to 100. Set to -1, float("inf") or None to return all items.
+
         Returns:
             EntityMatchingModelList: List of jobs."""
+        return self._load_models(
+            [job for page in self._camel_list_generator("/jobs", limit=limit, method="GET") for job in page]
+        )
+
+    @staticmethod
+    def _camel_filter(filter: Optional[Dict]) -> Dict:
+        return {utils._auxiliary.to_camel_case(k): v for k, v in (filter or {}).items() if v is not None}
+
+    def _load_models(self, models: List[Dict]) -> EntityMatchingModelList:
         return EntityMatchingModelList(
-            [
-                self._LIST_CLASS._RESOURCE._load(model, cognite_client=self._cognite_client)
-                for model in self._camel_get("/jobs").json()["items"]
-            ]
+            [self._LIST_CLASS._RESOURCE._load(model, cognite_client=self._cognite_client) for model in models]
         )
 
     def delete(self, id: Union[int, List[int]] = None, external_id: Union[str, List[str]] = None) -> None:
         """Delete models
 
+        Models are deleted in chunks of at most 1000, which are sent in parallel. If some chunks fail, a CogniteAPIError is raised
+        with the deleted ids in `successful`, and the others in `failed` or `unknown`.
+
         Args:
             id (Union[int, List[int]): Id or list of ids
             external_id (Union[str, List[str]]): External ID or list of external ids"""
         self._delete_multiple(ids=id, external_ids=external_id, wrap_ids=True)
 
+    def apply_retention(
+        self,
+        older_than: Union[int, str, datetime] = None,
+        statuses: List[str] = None,
+        filter: Dict = None,
+        keep_latest: int = 0,
+        dry_run: bool = False,
+    ) -> EntityMatchingModelList:
+        """Delete models according to a retention policy. Models are streamed page by page, and the selected models are deleted with `delete`.
+
+        Args:
+            older_than (Union[int, str, datetime]): Only delete models requested before this time, given in ms since epoch, as a datetime or as a time-ago string, e.g. '30d-ago'.
+            statuses (List[str]): Only delete models with one of these statuses, e.g. ['Failed'].
+            filter (dict): Only consider models with parameter values that match this filter, see `list`.
+            keep_latest (int): Never delete this many of the most recently requested models among those considered.
+            dry_run (bool): Return the models which would be deleted without deleting them.
+
+        Returns:
+            EntityMatchingModelList: the deleted models.
+
+        Examples:
+
+            Delete failed models, and models older than 90 days except for the 10 most recent::
+
+                >>> client.entity_matching.apply_retention(statuses=["Failed"])
+                >>> client.entity_matching.apply_retention(older_than="90d-ago", keep_latest=10)"""
+        cutoff = utils._time.timestamp_to_ms(older_than) if older_than is not None else None
+        latest, expired = [], EntityMatchingModelList([])
+        for model in self(filter=filter):
+            if keep_latest:
+                heapq.heappush(latest, (model.request_timestamp or 0, model.id))
+                if len(latest) > keep_latest:
+                    heapq.heappop(latest)
+            if (cutoff is None or (model.request_timestamp or 0) < cutoff) and (
+                statuses is None or model.status in statuses
+            ):
+                expired.append(model)
+        kept = {id for _, id in latest}
+        expired = EntityMatchingModelList([model for model in expired if model.id not in kept])
+        if expired and not dry_run:
+            self.delete(id=[model.id for model in expired])
+        return expired
+
     def fit(
         self,
         match_from: List[Union[Dict, CogniteResource]],
@@ -207,6 +378,8 @@ class EntityMatchingAPI(ContextAPI):
         name: str = None,
         description: str = None,
         external_id: str = None,
+        project_fields: bool = False,
+        blocker: EntityMatchingBlocker = None,
     ) -> EntityMatchingModel:
         """Fit entity matching model.
 
@@ -223,18 +396,39 @@ class EntityMatchingAPI(ContextAPI):
             name (str): Optional user-defined name of model.
             description (str): Optional user-defined description of model.
             external_id (str): Optional external id. Must be unique within the project.
+            project_fields (bool): only send the fields used in match_fields, plus 'id' and 'externalId'. Reduces payload size and preparation time for large inputs.
+            blocker (EntityMatchingBlocker): if given, entities in match_to which share no tokens with any entity in match_from, and are not part of true_matches, are not sent. The pruning ratio is available in `blocker.stats`.
         Returns:
             EntityMatchingModel: Resulting queued model."""
 
+        from_fields, to_fields = None, None
+        if project_fields:
+            from_fields = EntityMatchingModel._match_field_names(match_fields, "from")
+            to_fields = EntityMatchingModel._match_field_names(match_fields, "to")
         if match_fields:
             match_fields = [ft if isinstance(ft, dict) else {"from": ft[0], "to": ft[1]} for ft in match_fields]
         if true_matches:
             true_matches = [convert_true_match(true_match) for true_match in true_matches]
+        match_from = EntityMatchingModel.dump_entities(match_from, from_fields)
+        match_to = EntityMatchingModel.dump_entities(match_to, to_fields)
+        if blocker and match_from and match_to:
+            matched_to = {tm.get("toId", tm.get("toExternalId")) for tm in true_matches or []}
+            match_to = blocker.prune(
+                match_from,
+                match_to,
+                EntityMatchingModel._match_field_names(match_fields, "from"),
+                EntityMatchingModel._match_field_names(match_fields, "to"),
+                keep=[
+                    j
+                    for j, entity in enumerate(match_to)
+                    if entity.get("id") in matched_to or entity.get("externalId") in matched_to
+                ],
+            )
         response = self._camel_post(
             context_path="/",
             json=dict(
-                match_from=EntityMatchingModel.dump_entities(match_from),
-                match_to=EntityMatchingModel.dump_entities(match_to),
+                match_from=match_from,
+                match_to=match_to,
                 true_matches=true_matches,
                 match_fields=match_fields,
                 feature_type=feature_type,
@@ -249,12 +443,13 @@ class EntityMatchingAPI(ContextAPI):
 
     def predict(
         self,
-        match_from: Optional[List[Dict]] = None,
-        match_to: Optional[List[Dict]] = None,
+        match_from: Optional[List[Union[Dict, CogniteResource]]] = None,
+        match_to: Optional[List[Union[Dict, CogniteResource]]] = None,
         num_matches=1,
         score_threshold=None,
         id: Optional[int] = None,
         external_id: Optional[str] = None,
+        project_fields: bool = False,
     ) -> ContextualizationJob:
         """Predict entity matching. NB. blocks and waits for the model to be ready if it has been recently created.
 
@@ -266,15 +461,91 @@ class EntityMatchingAPI(ContextAPI):
             ignore_missing_fields (bool): whether missing data in keyFrom or keyTo should be filled in with an empty string.
             id: ids of the model to use.
             external_id: external ids of the model to use.
+            project_fields (bool): only send the fields used by the model's match_fields, plus 'id' and 'externalId'.
         Returns:
             ContextualizationJob: object which can be used to wait for and retrieve results."""
         return self.retrieve(
             id=id, external_id=external_id
         ).predict(  # could call predict directly but this is friendlier
-            match_from=EntityMatchingModel.dump_entities(match_from),
-            match_to=EntityMatchingModel.dump_entities(match_to),
+            match_from=match_from,
+            match_to=match_to,
+            num_matches=num_matches,
+            score_threshold=score_threshold,
+            project_fields=project_fields,
+        )
+
+    def predict_chunked(
+        self,
+        match_from: List[Union[Dict, CogniteResource]],
+        match_to: Optional[List[Union[Dict, CogniteResource]]] = None,
+        num_matches=1,
+        score_threshold=None,
+        max_chunk_bytes: int = 10 * 1024 ** 2,
+        max_retries: int = 2,
+        id: Optional[int] = None,
+        external_id: Optional[str] = None,
+        project_fields: bool = False,
+    ) -> List[Dict]:
+        """Predict entity matching for a large number of entities, by splitting match_from into chunks which are predicted concurrently.
+        NB. blocks and waits for all predictions to finish.
+
+        Args:
+            match_from: entities to match from, does not need an 'id' field. Tolerant to passing more than is needed or used (e.g. json dump of time series list).
+            match_to: entities to match to, does not need an 'id' field.  Tolerant to passing more than is needed or used. If omitted, will use data from fit.
+            num_matches (int): number of matches to return for each item.
+            score_threshold (float): only return matches with a score above this threshold
+            max_chunk_bytes (int): maximum size of the serialized entities in each request, including match_to, which is sent with every chunk.
+            max_retries (int): number of times a chunk is resubmitted if its job fails.
+            id: ids of the model to use.
+            external_id: external ids of the model to use.
+            project_fields (bool): only send the fields used by the model's match_fields, plus 'id' and 'externalId'.
+        Returns:
+            List[Dict]: the combined result items of all chunks, in the order of match_from."""
+        return self.retrieve(id=id, external_id=external_id).predict_chunked(
+            match_from=match_from,
+            match_to=match_to,
             num_matches=num_matches,
             score_threshold=score_threshold,
+            max_chunk_bytes=max_chunk_bytes,
+            max_retries=max_retries,
+            project_fields=project_fields,
+        )
+
+    def predict_blocked(
+        self,
+        match_from: List[Union[Dict, CogniteResource]],
+        match_to: List[Union[Dict, CogniteResource]],
+        blocker: EntityMatchingBlocker = None,
+        num_matches=1,
+        score_threshold=None,
+        block_size: int = 1000,
+        max_retries: int = 2,
+        id: Optional[int] = None,
+        external_id: Optional[str] = None,
+    ) -> List[Dict]:
+        """Predict entity matching with client-side blocking, so that each block of match_from is only matched against its candidates in match_to.
+        NB. blocks and waits for all predictions to finish.
+
+        Args:
+            match_from: entities to match from, does not need an 'id' field. Tolerant to passing more than is needed or used (e.g. json dump of time series list).
+            match_to: entities to match to, does not need an 'id' field.  Tolerant to passing more than is needed or used.
+            blocker (EntityMatchingBlocker): blocking settings. Its `stats` are updated with the pruning ratio. Defaults to blocking on shared tokens.
+            num_matches (int): number of matches to return for each item.
+            score_threshold (float): only return matches with a score above this threshold
+            block_size (int): maximum number of entities to match from in each block.
+            max_retries (int): number of times a block is resubmitted if its job fails.
+            id: ids of the model to use.
+            external_id: external ids of the model to use.
+        Returns:
+            List[Dict]: the combined result items of all blocks, in the order of match_from."""
+        return self.retrieve(id=id, external_id=external_id).predict_blocked(
+            match_from=match_from,
+            match_to=match_to,
+            blocker=blocker,
+            num_matches=num_matches,
+            score_threshold=score_threshold,
+            block_size=block_size,
+            max_retries=max_retries,
         )
 
     def refit(
@@ -294,6 +565,206 @@ class EntityMatchingAPI(ContextAPI):
             EntityMatchingModel: new model refitted to true_matches."""
         return self.retrieve(id=id, external_id=external_id).refit(true_matches=true_matches)
 
+    def evaluate(
+        self,
+        match_from: List[Union[Dict, CogniteResource]],
+        match_to: List[Union[Dict, CogniteResource]],
+        true_matches: List[Union[Dict, Tuple[Union[int, str], Union[int, str]]]],
+        configurations: List[Dict[str, Any]],
+        n_folds: int = 5,
+        score_threshold: float = None,
+        seed: int = 0,
+        cache: Dict[str, List[Dict]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Evaluate fit settings using k-fold cross validation on known matches. For each configuration and fold, a model is fitted
+        on the true matches outside the fold, used to predict the best match of each entity in the fold, and then deleted.
+        All folds of all configurations are run concurrently. NB. blocks and waits for all models and predictions to finish.
+
+        Args:
+            match_from: entities to match from, should have an 'id' field. Tolerant to passing more than is needed or used (e.g. json dump of time series list)
+            match_to: entities to match to, should have an 'id' field.  Tolerant to passing more than is needed or used.
+            true_matches: Known valid matches given as a list of dicts with keys 'fromId', 'fromExternalId', 'toId', 'toExternalId').
+             A tuple can be used instead of the dictionary for convenience, interpreted as id/externalId based on type.
+            configurations (List[Dict[str, Any]]): keyword arguments to `fit` to compare, e.g. [{"feature_type": "simple"}, {"feature_type": "bigram", "classifier": "randomforest"}]
+            n_folds (int): number of folds to split true_matches into.
+            score_threshold (float): only count predicted matches with a score above this threshold
+            seed (int): seed for the random assignment of true matches to folds.
+            cache (Dict[str, List[Dict]]): if given, prediction results are stored here and reused by later calls with the same data, configuration and folds.
+
+        Returns:
+            List[Dict[str, Any]]: 'configuration', 'precision', 'recall' and 'f1' for each configuration, in the same order."""
+        np = utils._auxiliary.local_import("numpy")
+        true_matches = [convert_true_match(true_match) for true_match in true_matches]
+        if not 2 <= n_folds <= len(true_matches):
+            raise ValueError("n_folds must be at least 2 and at most the number of true matches")
+        match_from = EntityMatchingModel.dump_entities(match_from)
+        match_to = EntityMatchingModel.dump_entities(match_to)
+        data_hash = hashlib.sha256(
+            json.dumps([match_from, match_to], sort_keys=True, default=utils._auxiliary.json_dump_default).encode()
+        ).hexdigest()
+        folds = np.array_split(np.random.RandomState(seed).permutation(len(true_matches)), n_folds)
+
+        def evaluate_fold(configuration, fold):
+            in_fold = set(fold.tolist())
+            train = [true_matches[i] for i in range(len(true_matches)) if i not in in_fold]
+            test = [true_matches[i] for i in fold]
+            key = hashlib.sha256(
+                json.dumps([data_hash, configuration, train, test, score_threshold], sort_keys=True).encode()
+            ).hexdigest()
+            if cache is not None and key in cache:
+                return cache[key]
+            from_keys = {tm.get("fromId", tm.get("fromExternalId")) for tm in test}
+            test_from = [e for e in match_from if e.get("id") in from_keys or e.get("externalId") in from_keys]
+            model = self.fit(match_from=match_from, match_to=match_to, true_matches=train, **configuration)
+            try:
+                items = model.predict(
+                    match_from=test_from, match_to=match_to, num_matches=1, score_threshold=score_threshold
+                ).result["items"]
+            finally:
+                self.delete(id=model.id)
+            if cache is not None:
+                cache[key] = items
+            return items
+
+        tasks = [(configuration, fold) for configuration in configurations for fold in folds]
+        summary = utils._concurrency.execute_tasks_concurrently(
+            evaluate_fold, tasks, max_workers=self._config.max_workers
+        )
+        summary.raise_compound_exception_if_failed_tasks()
+
+        evaluations = []
+        for c, configuration in enumerate(configurations):
+            expected, predicted = [], []
+            for fold, items in zip(folds, summary.results[c * n_folds : (c + 1) * n_folds]):
+                for i in fold:
+                    expected_id, predicted_id = self._evaluate_true_match(true_matches[i], items)
+                    expected.append(expected_id)
+                    predicted.append(predicted_id)
+            expected, predicted = np.array(expected, dtype=object), np.array(predicted, dtype=object)
+            has_prediction = np.not_equal(predicted, None)
+            n_correct = np.sum(has_prediction & np.equal(predicted, expected))
+            precision = n_correct / max(np.sum(has_prediction), 1)
+            recall = n_correct / len(expected)
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            evaluations.append(
+                {
+                    "configuration": configuration,
+                    "precision": float(precision),
+                    "recall": float(recall),
+                    "f1": float(f1),
+                }
+            )
+        return evaluations
+
+    @staticmethod
+    def _evaluate_true_match(true_match: Dict, items: List[Dict]) -> Tuple[Union[int, str], Union[int, str]]:
+        """Returns the expected and predicted id or external id of the entity matched to, as given in the true match."""
+        from_field, from_value = (
+            ("id", true_match["fromId"]) if "fromId" in true_match else ("externalId", true_match["fromExternalId"])
+        )
+        to_field, to_value = (
+            ("id", true_match["toId"]) if "toId" in true_match else ("externalId", true_match["toExternalId"])
+        )
+        for item in items:
+            if item["matchFrom"].get(from_field) == from_value:
+                matches = item.get("matches") or [{}]
+                return to_value, matches[0].get("matchTo", {}).get(to_field)
+        return to_value, None
+
+    _ASSET_LINK_UPDATES = {
+        "timeSeries": ("time_series", TimeSeriesUpdate, "asset_id"),
+        "sequence": ("sequences", SequenceUpdate, "asset_id"),
+        "event": ("events", EventUpdate, "asset_ids"),
+        "file": ("files", FileMetadataUpdate, "asset_ids"),
+    }
+
+    def write_matches(
+        self,
+        matches: Union[EntityMatchingMatches, ContextualizationJob, List[Dict]],
+        source_type: str,
+        target_type: str = "asset",
+        write_as: str = "relationships",
+        external_id_prefix: str = "match:",
+        data_set_id: int = None,
+        batch_size: int = 10000,
+    ) -> Dict[str, int]:
+        """Write accepted matches back to CDF, either as relationships or by linking the entities matched from to the assets matched to.
+        Writing the same matches again has no effect, so an interrupted write can be restarted.
+
+        Args:
+            matches: matches to write, e.g. after selecting them with `top_k`, `threshold` or `one_to_one`. A predict job or the result items of `predict_chunked` are also accepted, and all their matches are written.
+            source_type (str): Resource type of the entities matched from: 'timeSeries', 'sequence', 'event', 'file' or, for relationships, 'asset'.
+            target_type (str): Resource type of the entities matched to. Must be 'asset' unless writing relationships.
+            write_as (str): 'relationships' creates one relationship per match, with the score as confidence and an external id derived from the source and target external ids. 'asset_links' sets the asset id of time series and sequences, or adds to the asset ids of events and files.
+            external_id_prefix (str): Prefix of the relationship external ids.
+            data_set_id (int): Data set of the relationships.
+            batch_size (int): Number of matches prepared at a time. Each batch is written with concurrent requests.
+
+        Returns:
+            Dict[str, int]: number of matches 'written', and 'existing' relationships which were skipped."""
+        if isinstance(matches, ContextualizationJob):
+            matches = matches.matches()
+        elif not isinstance(matches, EntityMatchingMatches):
+            matches = EntityMatchingMatches._load(matches)
+        if write_as == "asset_links" and (source_type not in self._ASSET_LINK_UPDATES or target_type != "asset"):
+            raise ValueError(
+                "Asset links can only be written from {} to 'asset'".format(", ".join(self._ASSET_LINK_UPDATES))
+            )
+        elif write_as not in ["relationships", "asset_links"]:
+            raise ValueError("Unknown write_as '{}', should be 'relationships' or 'asset_links'".format(write_as))
+
+        counts = {"written": 0, "existing": 0}
+        for start in range(0, len(matches), batch_size):
+            batch = matches._select(slice(start, start + batch_size))
+            if write_as == "relationships":
+                batch_counts = self._create_relationships(
+                    batch.to_relationships(source_type, target_type, external_id_prefix, data_set_id)
+                )
+            else:
+                batch_counts = self._update_asset_links(batch, *self._ASSET_LINK_UPDATES[source_type])
+            for key, count in batch_counts.items():
+                counts[key] += count
+        return counts
+
+    def _create_relationships(self, relationships: RelationshipList) -> Dict[str, int]:
+        written, existing = 0, 0
+        while relationships:
+            try:
+                self._cognite_client.relationships.create(list(relationships))
+                written += len(relationships)
+                break
+            except CogniteDuplicatedError as e:
+                duplicated = {item.get("externalId") for item in e.duplicated} - {None}
+                remaining = [rel for rel in e.failed if rel.external_id not in duplicated]
+                if len(remaining) >= len(relationships):
+                    raise  # nothing was skipped, so retrying would fail the same way
+                written += len(e.successful)
+                existing += len(duplicated)
+                relationships = remaining
+        return {"written": written, "existing": existing}
+
+    def _update_asset_links(
+        self, matches: EntityMatchingMatches, api_name: str, update_cls, field: str
+    ) -> Dict[str, int]:
+        if any(from_id is None for from_id in matches.from_id) or any(to_id is None for to_id in matches.to_id):
+            raise ValueError("Asset links require an id for all entities matched from and to")
+        if field == "asset_id":
+            if len(set(matches.from_id)) < len(matches):
+                raise ValueError(
+                    "An entity matched from has several matches, select one with top_k(1) or one_to_one() first"
+                )
+            updates = [
+                update_cls(id=from_id).asset_id.set(to_id) for from_id, to_id in zip(matches.from_id, matches.to_id)
+            ]
+        else:
+            asset_ids = {}
+            for from_id, to_id in zip(matches.from_id, matches.to_id):
+                asset_ids.setdefault(from_id, []).append(to_id)
+            updates = [update_cls(id=from_id).asset_ids.add(to_ids) for from_id, to_ids in asset_ids.items()]
+        if updates:
+            getattr(self._cognite_client, api_name).update(updates)
+        return {"written": len(matches)}
+
     def create_rules(self, matches: List[Dict]) -> ContextualizationJob:
         """Fit rules model.
 
@@ -1,22 +1,35 @@
+import ast
+import builtins
+import fnmatch
+import hashlib
 import importlib.util
+import inspect
 import json
 import os
+import struct
+import subprocess
 import sys
+import threading
 import time
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
 from inspect import getsource
 from numbers import Number
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any, Callable, Dict, List, Optional, Union
-from zipfile import ZipFile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from cognite.client import utils
 from cognite.client._api_client import APIClient
+from cognite.client.exceptions import CogniteNotFoundError
 from cognite.experimental.data_classes import (
     Function,
     FunctionCall,
     FunctionCallList,
     FunctionCallLog,
+    FunctionCallLogEntry,
+    FunctionCallStats,
     FunctionList,
     FunctionSchedule,
     FunctionSchedulesList,
@@ -24,6 +37,33 @@ from cognite.experimental.data_classes import (
 
 HANDLER_FILE_NAME = "handler.py"
 MAX_RETRIES = 5
+CODE_EXTERNAL_ID_PREFIX = "function-code-"
+FUNCTION_IGNORE_FILE = ".functionignore"
+DEFAULT_IGNORE_PATTERNS = ["__pycache__/", ".git/", "*.pyc"]
+PARALLEL_COMPRESSION_THRESHOLD = 2 ** 20  # bytes
+ZIP_COMPRESSION_LEVEL = 6
+ZIP_DATE = 1 << 5 | 1  # 1980-01-01, the earliest date in the zip format
+ZIP_UTF8_FLAG = 0x800
+ZIP_CREATE_SYSTEM_UNIX = 3
+ZIP_FILE_MODE = 0o100644
+FUNCTION_ID_CACHE_TTL = 300  # seconds
+
+
+class FunctionCallError(Exception):
+    """Raised by `FunctionsAPI.map` for an input whose call did not complete, after all retries.
+
+    Args:
+        call (FunctionCall): The last call made with the input.
+        data (Any): The input.
+    """
+
+    def __init__(self, call: FunctionCall, data: Any):
+        self.call = call
+        self.data = data
+        message = (call.error or {}).get("message")
+        super().__init__(
+            f"Function call {call.id} ended with status {call.status}" + (f": {message}" if message else "")
+        )
 
 
 class FunctionsAPI(APIClient):
@@ -34,6 +74,9 @@ class FunctionsAPI(APIClient):
         super().__init__(*args, **kwargs)
         self.calls = FunctionCallsAPI(*args, **kwargs)
         self.schedules = FunctionSchedulesAPI(*args, **kwargs)
+        self._id_cache_ttl = FUNCTION_ID_CACHE_TTL
+        self._id_cache = {}  # external id -> (id, expiry time)
+        self._id_cache_lock = threading.Lock()
 
     def create(
         self,
@@ -52,7 +95,7 @@ class FunctionsAPI(APIClient):
     ) -> Function:
         """`When creating a function, <https://docs.cognite.com/api/playground/#operation/post-api-playground-projects-project-functions>`_
         the source code can be specified in one of three ways:\n
-        - Via the `folder` argument, which is the path to the folder where the source code is located. `function_path` must point to a python file in the folder within which a function named `handle` must be defined.\n
+        - Via the `folder` argument, which is the path to the folder where the source code is located. `function_path` must point to a python file in the folder within which a function named `handle` must be defined. Files and folders matching a pattern in a `.functionignore` file in the folder, as well as `__pycache__`, `.git` and virtual environments, are left out. The zipped folder is stored with an external id derived from a hash of its contents, and an earlier upload of the same code is reused.\n
         - Via the `file_id` argument, which is the ID of a zip-file uploaded to the files API. `function_path` must point to a python file in the zipped folder within which a function named `handle` must be defined.\n
         - Via the `function_handle` argument, which is a reference to a function object, which must be named `handle`.\n
 
@@ -98,47 +141,140 @@ class FunctionsAPI(APIClient):
                 >>> c = CogniteClient()
                 >>> function = c.functions.create(name="myfunction", function_handle=handle)
         """
-        self._assert_exactly_one_of_folder_or_file_id_or_function_handle(folder, file_id, function_handle)
-
-        if folder:
-            validate_function_folder(folder, function_path)
-            file_id = self._zip_and_upload_folder(folder, name)
-        elif function_handle:
-            _validate_function_handle(function_handle)
-            file_id = self._zip_and_upload_handle(function_handle, name)
-        utils._auxiliary.assert_type(cpu, "cpu", [Number], allow_none=False)
-        utils._auxiliary.assert_type(memory, "memory", [Number], allow_none=False)
-
-        sleep_time = 1.0  # seconds
-        for i in range(MAX_RETRIES):
-            file = self._cognite_client.files.retrieve(id=file_id)
-            if file is None or not file.uploaded:
-                time.sleep(sleep_time)
-                sleep_time *= 2
-            else:
-                break
-        else:
+        file_id = self._prepare_function_code(name, folder, file_id, function_path, function_handle, cpu, memory)
+        if file_id not in self._wait_for_uploaded_files([file_id]):
             raise IOError("Could not retrieve file from files API")
 
         url = "/functions"
-        function = {
-            "name": name,
-            "description": description,
-            "owner": owner,
-            "fileId": file_id,
-            "functionPath": function_path,
-            "cpu": float(cpu),
-            "memory": float(memory),
-        }
-        if external_id:
-            function.update({"externalId": external_id})
-        if api_key:
-            function.update({"apiKey": api_key})
-        if secrets:
-            function.update({"secrets": secrets})
+        function = _function_item(
+            name, file_id, function_path, external_id, description, owner, api_key, secrets, cpu, memory
+        )
         body = {"items": [function]}
         res = self._post(url, json=body)
-        return Function._load(res.json()["items"][0], cognite_client=self._cognite_client)
+        function = Function._load(res.json()["items"][0], cognite_client=self._cognite_client)
+        self._cache_ids([function])
+        return function
+
+    def deploy_many(
+        self,
+        specs: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+    ) -> List[Dict[str, Any]]:
+        """Create many functions concurrently and wait until they are deployed.
+
+        The code of all functions is zipped and uploaded concurrently, and the functions are created concurrently once
+        their files are available. The status of all functions which are still being deployed is then polled with a
+        single request per round, waiting `poll_interval` seconds between rounds and doubling the wait up to
+        `max_poll_interval`. A function which fails to be created does not stop the others.
+
+        Args:
+            specs (List[Dict[str, Any]]): Arguments to `create` for each function.
+            timeout (float, optional): Stop waiting after this many seconds. Functions which are not deployed by then are reported with their last known status.
+            poll_interval (float): Initial number of seconds between status polls.
+            max_poll_interval (float): Maximum number of seconds between status polls.
+
+        Returns:
+            List[Dict[str, Any]]: A report per function, in the same order as specs. Each report contains the 'name', the 'function' (None if it could not be created), the 'status' ('Ready', 'Failed', 'Queued' or 'Deploying', or 'Error' if the function could not be created), the 'error' and the number of seconds 'elapsed' until the status was last updated.
+
+        Examples:
+
+            Deploy functions from two folders::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> reports = c.functions.deploy_many([
+                ...     {"name": "function1", "folder": "path/to/code1"},
+                ...     {"name": "function2", "folder": "path/to/code2", "cpu": 0.5},
+                ... ])
+                >>> failed = [report["name"] for report in reports if report["status"] != "Ready"]
+        """
+        start = time.time()
+        arguments = []
+        for spec in specs:
+            bound = inspect.signature(self.create).bind(**spec)
+            bound.apply_defaults()
+            arguments.append(bound.arguments)
+        reports = [
+            {"name": args["name"], "function": None, "status": None, "error": None, "elapsed": None}
+            for args in arguments
+        ]
+
+        def fail(report, error):
+            report.update(status="Error", error=str(error), elapsed=time.time() - start)
+
+        file_ids = [None] * len(arguments)
+        with ThreadPoolExecutor(self._config.max_workers) as p:
+            futures = [
+                p.submit(
+                    self._prepare_function_code,
+                    args["name"],
+                    args["folder"],
+                    args["file_id"],
+                    args["function_path"],
+                    args["function_handle"],
+                    args["cpu"],
+                    args["memory"],
+                )
+                for args in arguments
+            ]
+            for i, future in enumerate(futures):
+                try:
+                    file_ids[i] = future.result()
+                except Exception as e:
+                    fail(reports[i], e)
+
+        uploaded = self._wait_for_uploaded_files([file_id for file_id in file_ids if file_id is not None])
+        for report, file_id in zip(reports, file_ids):
+            if file_id is not None and file_id not in uploaded:
+                fail(report, "Could not retrieve file from files API")
+
+        def create_function(args, file_id):
+            item = _function_item(
+                args["name"],
+                file_id,
+                args["function_path"],
+                args["external_id"],
+                args["description"],
+                args["owner"],
+                args["api_key"],
+                args["secrets"],
+                args["cpu"],
+                args["memory"],
+            )
+            res = self._post(self._RESOURCE_PATH, json={"items": [item]})
+            function = Function._load(res.json()["items"][0], cognite_client=self._cognite_client)
+            self._cache_ids([function])
+            return function
+
+        with ThreadPoolExecutor(self._config.max_workers) as p:
+            futures = {
+                i: p.submit(create_function, arguments[i], file_ids[i])
+                for i, report in enumerate(reports)
+                if report["status"] is None
+            }
+            for i, future in futures.items():
+                try:
+                    function = future.result()
+                    reports[i].update(function=function, status=function.status, elapsed=time.time() - start)
+                except Exception as e:
+                    fail(reports[i], e)
+
+        deploying = {report["function"].id: report for report in reports if report["status"] in ["Queued", "Deploying"]}
+        while deploying:
+            if timeout is not None and time.time() - start + poll_interval > timeout:
+                break
+            time.sleep(poll_interval)
+            poll_interval = min(2 * poll_interval, max_poll_interval)
+            for function in self.retrieve_multiple(ids=list(deploying)):
+                report = deploying[function.id]
+                report.update(
+                    function=function, status=function.status, error=function.error, elapsed=time.time() - start
+                )
+                if function.status not in ["Queued", "Deploying"]:
+                    del deploying[function.id]
+        return reports
 
     def delete(self, id: Union[int, List[int]] = None, external_id: Union[str, List[str]] = None) -> None:
         """`Delete one or more functions. <https://docs.cognite.com/api/playground/#operation/post-api-playground-projects-project-functions-delete>`_
@@ -158,6 +294,7 @@ class FunctionsAPI(APIClient):
                 >>> c = CogniteClient()
                 >>> c.functions.delete(id=[1,2,3], external_id="function3")
         """
+        self._forget_ids(ids=id, external_ids=external_id)
         self._delete_multiple(ids=id, external_ids=external_id, wrap_ids=True)
 
     def list(self) -> FunctionList:
@@ -270,11 +407,11 @@ class FunctionsAPI(APIClient):
         """
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(id, external_id)
         if external_id:
-            id = self.retrieve(external_id=external_id).id
+            id = self._resolve_id(external_id)
 
         url = f"/functions/{id}/call"
         body = {}
-        if data:
+        if data is not None:
             body = {"data": data}
         res = self._post(url, json=body)
 
@@ -284,47 +421,197 @@ class FunctionsAPI(APIClient):
 
         return function_call
 
-    def _zip_and_upload_folder(self, folder, name) -> int:
-        # / is not allowed in file names
-        name = name.replace("/", "-")
+    def map(
+        self,
+        inputs: Iterable[Any],
+        id: Optional[int] = None,
+        external_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_retries: int = 2,
+        ordered: bool = True,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+    ) -> Iterator[Any]:
+        """Call a function once for each input, and yield the responses.
+
+        At most `concurrency` calls are running at any time. Running calls are tracked in a single polling loop, see
+        `FunctionCallsAPI.as_completed`, and the responses of completed calls are retrieved concurrently. Calls which fail
+        or time out are made again, up to `max_retries` times. When ordered, responses which arrive before those of earlier
+        inputs count against `concurrency` until they are yielded, so no new calls are made while the responses of
+        `concurrency` inputs are waiting for an earlier one.
 
-        current_dir = os.getcwd()
-        os.chdir(folder)
+        Args:
+            inputs (Iterable[Any]): Input data for each call (JSON serializable). Consumed lazily.
+            id (int, optional): ID of the function.
+            external_id (str, optional): External ID of the function.
+            concurrency (int, optional): Maximum number of running calls. Defaults to the max_workers of the client.
+            max_retries (int): Number of times to retry a call which failed or timed out.
+            ordered (bool): Yield responses in the order of the inputs. If False, responses are yielded as soon as they are available.
+            poll_interval (float): Initial number of seconds between polling rounds.
+            max_poll_interval (float): Maximum number of seconds between polling rounds.
+
+        Yields:
+            Any: The response of each call, or a FunctionCallError in place of the response of an input whose call did not complete. Iteration continues past such inputs.
 
-        try:
-            with TemporaryDirectory() as tmpdir:
-                zip_path = os.path.join(tmpdir, "function.zip")
-                zf = ZipFile(zip_path, "w")
-                for root, dirs, files in os.walk("."):
-                    zf.write(root)
-                    for filename in files:
-                        zf.write(os.path.join(root, filename))
-                zf.close()
+        Examples:
 
-                file = self._cognite_client.files.upload(zip_path, name=f"{name}.zip")
+            Compute a function over shards of a dataset::
 
-            return file.id
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> shards = [{"asset_ids": asset_ids[i : i + 100]} for i in range(0, len(asset_ids), 100)]
+                >>> results = list(c.functions.map(shards, id=1, concurrency=20))
+        """
+        utils._auxiliary.assert_exactly_one_of_id_or_external_id(id, external_id)
+        if external_id:
+            id = self._resolve_id(external_id)
+        concurrency = concurrency or self._config.max_workers
+        inputs = enumerate(inputs)
+        exhausted = False
+        retries = deque()  # (index, data, attempt) of calls to make again
+        running = {}  # call id -> ((index, data, attempt), call)
+        results = {}  # index -> Future of the response
+        next_index = 0
+        interval = poll_interval
+
+        with ThreadPoolExecutor(self._config.max_workers) as p:
+            while True:
+                tasks = []
+                while len(running) + len(tasks) < concurrency and (retries or not exhausted):
+                    if retries:
+                        tasks.append(retries.popleft())
+                        continue
+                    if ordered and len(running) + len(tasks) + len(results) >= concurrency:
+                        break
+                    item = next(inputs, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        tasks.append((*item, 0))
+                submitted = [p.submit(self.call, id=id, data=data, wait=False) for _, data, _ in tasks]
+                for task, future in zip(tasks, submitted):
+                    call = future.result()
+                    running[call.id] = (task, call)
+
+                if ordered:
+                    while next_index in results and results[next_index].done():
+                        yield results.pop(next_index).result()
+                        next_index += 1
+                else:
+                    for index in [index for index, future in results.items() if future.done()]:
+                        yield results.pop(index).result()
+
+                if not running:
+                    if results:
+                        wait_for_futures(
+                            [results[next_index]] if ordered else list(results.values()), return_when=FIRST_COMPLETED
+                        )
+                    elif exhausted:
+                        return
+                    continue
+
+                time.sleep(interval)
+                finished = self.calls._refresh_calls([call for _, call in running.values()])
+                for call in finished:
+                    (index, data, attempt), _ = running.pop(call.id)
+                    if call.status == "Completed":
+                        results[index] = p.submit(self.calls.get_response, call_id=call.id, function_id=id)
+                    elif attempt < max_retries:
+                        retries.append((index, data, attempt + 1))
+                    else:
+                        results[index] = Future()
+                        results[index].set_result(FunctionCallError(call, data))
+                interval = poll_interval if finished else min(2 * interval, max_poll_interval)
+
+    def _resolve_id(self, external_id: str) -> int:
+        return self._resolve_ids([external_id])[external_id]
+
+    def _resolve_ids(self, external_ids: List[str]) -> Dict[str, int]:
+        """Returns the ids of the functions with the given external ids. Ids which are not cached, or which have been
+        cached for longer than `FUNCTION_ID_CACHE_TTL` seconds, are retrieved in a single request."""
+        now = time.monotonic()
+        with self._id_cache_lock:
+            ids = {
+                external_id: self._id_cache[external_id][0]
+                for external_id in external_ids
+                if external_id in self._id_cache and self._id_cache[external_id][1] > now
+            }
+        missing = [external_id for external_id in dict.fromkeys(external_ids) if external_id not in ids]
+        if missing:
+            functions = self.retrieve_multiple(external_ids=missing)
+            self._cache_ids(functions)
+            ids.update({function.external_id: function.id for function in functions})
+        return ids
+
+    def _cache_ids(self, functions: List[Function]) -> None:
+        expiry = time.monotonic() + self._id_cache_ttl
+        with self._id_cache_lock:
+            for function in functions:
+                if function.external_id is not None:
+                    self._id_cache[function.external_id] = (function.id, expiry)
+
+    def _forget_ids(self, ids: Union[int, List[int]] = None, external_ids: Union[str, List[str]] = None) -> None:
+        ids = set([ids] if isinstance(ids, int) else ids or [])
+        external_ids = set([external_ids] if isinstance(external_ids, str) else external_ids or [])
+        with self._id_cache_lock:
+            for external_id, (id, _) in list(self._id_cache.items()):
+                if external_id in external_ids or id in ids:
+                    del self._id_cache[external_id]
+
+    def _prepare_function_code(self, name, folder, file_id, function_path, function_handle, cpu, memory) -> int:
+        """Validates the arguments to `create`, and zips and uploads the code if needed. Returns the id of the code file."""
+        self._assert_exactly_one_of_folder_or_file_id_or_function_handle(folder, file_id, function_handle)
+        utils._auxiliary.assert_type(cpu, "cpu", [Number], allow_none=False)
+        utils._auxiliary.assert_type(memory, "memory", [Number], allow_none=False)
+
+        if folder:
+            validate_function_folder(folder, function_path)
+            file_id = self._zip_and_upload_folder(folder, name)
+        elif function_handle:
+            _validate_function_handle(function_handle)
+            file_id = self._zip_and_upload_handle(function_handle, name)
+        return file_id
 
-        finally:
-            os.chdir(current_dir)
+    def _wait_for_uploaded_files(self, file_ids: List[int]) -> Set[int]:
+        """Retrieves the files until all of them are uploaded, backing off exponentially. Returns the ids of the uploaded files."""
+        pending, uploaded = set(file_ids), set()
+        sleep_time = 1.0  # seconds
+        for i in range(MAX_RETRIES):
+            try:
+                files = self._cognite_client.files.retrieve_multiple(ids=sorted(pending))
+            except CogniteNotFoundError as e:
+                # Files which were just created may not be found yet, so they are kept pending until the last attempt
+                found = pending - {item["id"] for item in e.not_found}
+                files = self._cognite_client.files.retrieve_multiple(ids=sorted(found)) if found else []
+            uploaded.update(file.id for file in files if file.uploaded)
+            pending -= uploaded
+            if not pending or i == MAX_RETRIES - 1:
+                break
+            time.sleep(sleep_time)
+            sleep_time *= 2
+        return uploaded
 
-    def _zip_and_upload_handle(self, function_handle, name) -> int:
+    def _zip_and_upload_folder(self, folder, name) -> int:
         # / is not allowed in file names
         name = name.replace("/", "-")
 
-        with TemporaryDirectory() as tmpdir:
-            handle_path = os.path.join(tmpdir, HANDLER_FILE_NAME)
-            with open(handle_path, "w") as f:
-                source = getsource(function_handle)
-                f.write(source)
+        external_id = CODE_EXTERNAL_ID_PREFIX + _hash_folder(folder)
+        file = self._cognite_client.files.retrieve(external_id=external_id)
+        if file is not None and file.uploaded:
+            return file.id
 
-            zip_path = os.path.join(tmpdir, "function.zip")
-            zf = ZipFile(zip_path, "w")
-            zf.write(handle_path, arcname=HANDLER_FILE_NAME)
-            zf.close()
+        content = _zip_folder(folder, max_workers=self._config.max_workers)
+        file = self._cognite_client.files.upload_bytes(
+            content, name=f"{name}.zip", external_id=external_id, overwrite=True
+        )
+        return file.id
 
-            file = self._cognite_client.files.upload(zip_path, name=f"{name}.zip")
+    def _zip_and_upload_handle(self, function_handle, name) -> int:
+        # / is not allowed in file names
+        name = name.replace("/", "-")
 
+        content = _zip_entries([(HANDLER_FILE_NAME, *_deflate(getsource(function_handle).encode()))])
+        file = self._cognite_client.files.upload_bytes(content, name=f"{name}.zip")
         return file.id
 
     @staticmethod
@@ -341,11 +628,180 @@ class FunctionsAPI(APIClient):
             )
 
 
+def _function_item(
+    name, file_id, function_path, external_id, description, owner, api_key, secrets, cpu, memory
+) -> Dict[str, Any]:
+    function = {
+        "name": name,
+        "description": description,
+        "owner": owner,
+        "fileId": file_id,
+        "functionPath": function_path,
+        "cpu": float(cpu),
+        "memory": float(memory),
+    }
+    if external_id:
+        function.update({"externalId": external_id})
+    if api_key:
+        function.update({"apiKey": api_key})
+    if secrets:
+        function.update({"secrets": secrets})
+    return function
+
+
+def _read_ignore_patterns(folder: str) -> List[str]:
+    patterns = list(DEFAULT_IGNORE_PATTERNS)
+    ignore_file = os.path.join(folder, FUNCTION_IGNORE_FILE)
+    if os.path.isfile(ignore_file):
+        with open(ignore_file) as f:
+            patterns.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return patterns
+
+
+def _is_ignored(relative_path: str, is_dir: bool, patterns: List[str]) -> bool:
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip("/")
+        if "/" in pattern:
+            if fnmatch.fnmatchcase(relative_path, pattern.lstrip("/")):
+                return True
+        elif fnmatch.fnmatchcase(relative_path.rsplit("/", 1)[-1], pattern):
+            return True
+    return False
+
+
+def _list_function_files(folder: str) -> List[Tuple[str, str]]:
+    """Sorted (archive name, path) pairs of the files in a function folder.
+
+    Skips __pycache__ and .git folders, virtual environments (folders containing a pyvenv.cfg), and files and folders
+    matching a pattern in the .functionignore file of the folder. Patterns are matched against the name, or against the
+    path relative to the folder if they contain a '/'. Patterns ending in '/' only match folders."""
+    patterns = _read_ignore_patterns(folder)
+    result = []
+    for root, dirs, files in os.walk(folder):
+        relative_root = Path(os.path.relpath(root, folder)).as_posix()
+        relative_root = "" if relative_root == "." else relative_root + "/"
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if not _is_ignored(relative_root + d, True, patterns)
+            and not os.path.isfile(os.path.join(root, d, "pyvenv.cfg"))
+        )
+        for filename in files:
+            if not _is_ignored(relative_root + filename, False, patterns):
+                result.append((relative_root + filename, os.path.join(root, filename)))
+    return sorted(result)
+
+
+def _hash_folder(folder: str) -> str:
+    """Deterministic hash of the relative paths and contents of the files which are zipped from a function folder."""
+    digest = hashlib.sha256()
+    for arcname, path in _list_function_files(folder):
+        digest.update(f"{arcname}\0{os.path.getsize(path)}\0".encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(2 ** 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _deflate(content: bytes) -> Tuple[int, int, bytes]:
+    compressor = zlib.compressobj(ZIP_COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return zlib.crc32(content), len(content), compressor.compress(content) + compressor.flush()
+
+
+def _deflate_file(path: str) -> Tuple[int, int, bytes]:
+    with open(path, "rb") as f:
+        return _deflate(f.read())
+
+
+def _zip_entries(entries: List[Tuple[str, int, int, bytes]]) -> bytes:
+    """Writes a zip archive of (name, crc32, size, raw deflated content) entries in the given order.
+
+    All entries get the same timestamp and permissions, so the archive only depends on the names and contents."""
+    if len(entries) > 0xFFFF:
+        raise ValueError(f"Function code can contain at most {0xFFFF} files, got {len(entries)}")
+    local_headers, central_headers, offset = [], [], 0
+    for name, crc, size, data in entries:
+        encoded_name = name.encode("utf-8")
+        local_headers.append(
+            struct.pack(
+                "<4s5H3L2H",
+                b"PK\x03\x04",
+                20,
+                ZIP_UTF8_FLAG,
+                zlib.DEFLATED,
+                0,
+                ZIP_DATE,
+                crc,
+                len(data),
+                size,
+                len(encoded_name),
+                0,
+            )
+            + encoded_name
+        )
+        local_headers.append(data)
+        central_headers.append(
+            struct.pack(
+                "<4s6H3L5H2L",
+                b"PK\x01\x02",
+                ZIP_CREATE_SYSTEM_UNIX << 8 | 20,
+                20,
+                ZIP_UTF8_FLAG,
+                zlib.DEFLATED,
+                0,
+                ZIP_DATE,
+                crc,
+                len(data),
+                size,
+                len(encoded_name),
+                0,
+                0,
+                0,
+                0,
+                ZIP_FILE_MODE << 16,
+                offset,
+            )
+            + encoded_name
+        )
+        offset += len(local_headers[-2]) + len(data)
+    central_directory = b"".join(central_headers)
+    if offset + len(central_directory) > 0xFFFFFFFF:
+        raise ValueError("Function code can be at most 4 GB when zipped")
+    end_of_central_directory = struct.pack(
+        "<4s4H2LH", b"PK\x05\x06", 0, 0, len(entries), len(entries), len(central_directory), offset, 0
+    )
+    return b"".join(local_headers) + central_directory + end_of_central_directory
+
+
+def _zip_folder(folder: str, max_workers: int = 1) -> bytes:
+    """Zips a function folder in memory, see `_list_function_files` for which files are included.
+
+    The archive is byte for byte deterministic: entries are sorted and have fixed timestamps and permissions. Files are
+    compressed concurrently if the folder is larger than PARALLEL_COMPRESSION_THRESHOLD bytes."""
+    files = _list_function_files(folder)
+    if sum(os.path.getsize(path) for _, path in files) < PARALLEL_COMPRESSION_THRESHOLD:
+        max_workers = 1
+    summary = utils._concurrency.execute_tasks_concurrently(
+        _deflate_file, [(path,) for _, path in files], max_workers=max_workers
+    )
+    summary.raise_compound_exception_if_failed_tasks()
+    return _zip_entries([(arcname, *deflated) for (arcname, _), deflated in zip(files, summary.results)])
+
+
 def convert_file_path_to_module_path(file_path: str):
     return ".".join(Path(file_path).with_suffix("").parts)
 
 
 def validate_function_folder(root_path, function_path):
+    """Checks that `function_path` in `root_path` defines a valid `handle` function, without importing it.
+
+    The handler file is parsed, and the `handle` function and the modules imported at the top level of the handler and
+    of the modules it imports from the folder are checked statically. Only if `handle` is not defined by a plain
+    function definition at the top level, e.g. if it is imported, assigned or defined inside a try or if statement, is
+    the handler imported, in a separate process. Results are cached by the hash of the folder contents."""
     file_extension = Path(function_path).suffix
     if file_extension != ".py":
         raise TypeError(f"{function_path} is not a valid value for function_path. File extension must be .py.")
@@ -356,21 +812,152 @@ def validate_function_folder(root_path, function_path):
     if not function_path_full.is_file():
         raise TypeError(f"No file found at location '{function_path}' in '{root_path}'.")
 
-    sys.path.insert(0, root_path)
+    cache_key = (_hash_folder(root_path), Path(function_path).as_posix())
+    if cache_key not in _validated_folders:
+        try:
+            _validate_function_folder_statically(root_path, function_path)
+            _validated_folders[cache_key] = None
+        except Exception as e:
+            _validated_folders[cache_key] = (type(e), e.args)
+    if _validated_folders[cache_key] is not None:
+        error_type, args = _validated_folders[cache_key]
+        raise error_type(*args)
+
 
-    # Necessary to clear the cache if you have previously imported the module (this would have precedence over sys.path)
-    cached_handler_module = sys.modules.get("handler")
-    if cached_handler_module:
-        del sys.modules["handler"]
+_validated_folders = {}  # (folder hash, function path) -> None if valid, else (exception type, arguments)
 
-    module_path = convert_file_path_to_module_path(function_path)
-    handler = importlib.import_module(module_path)
 
-    if "handle" not in handler.__dir__():
+def _validate_function_folder_statically(root_path, function_path):
+    module_path = convert_file_path_to_module_path(function_path)
+    tree = _parse_module_file(Path(root_path) / Path(function_path))
+    handle = None
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "handle":
+            handle = node
+        elif _binds_name(node, "handle"):
+            handle = node
+    if handle is None and not any(
+        (isinstance(node, ast.FunctionDef) and node.name == "handle") or _binds_name(node, "handle")
+        for node in _nested_statements(tree.body)
+    ):
         raise TypeError(f"{function_path} must contain a function named 'handle'.")
+    if not isinstance(handle, ast.FunctionDef):
+        # handle is imported, assigned, or defined inside a compound statement such as try or if
+        _validate_function_folder_in_subprocess(root_path, function_path)
+        return
+    arguments = getattr(handle.args, "posonlyargs", []) + handle.args.args
+    if not {argument.arg for argument in arguments}.issubset({"data", "client", "secrets"}):
+        raise TypeError(
+            "Arguments to function referenced by function_handle must be a subset of (data, client, secrets)"
+        )
 
+    checked, pending = set(), [(module_path, tree)]
+    while pending:
+        module_path, tree = pending.pop()
+        checked.add(module_path)
+        for imported in _resolve_top_level_imports(root_path, module_path, tree):
+            if imported is not None and imported[0] not in checked:
+                pending.append((imported[0], _parse_module_file(imported[1])))
+
+
+def _parse_module_file(path: Path) -> ast.Module:
+    with open(path, "rb") as f:
+        return ast.parse(f.read(), filename=str(path))
+
+
+def _nested_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Yields the statements nested in the compound statements of a body, such as if, try and with, which are executed
+    in the same scope. Function and class bodies are not entered."""
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        for field in ["body", "orelse", "finalbody", "handlers"]:
+            for child in getattr(node, field, []):
+                statements = child.body if isinstance(child, ast.ExceptHandler) else [child]
+                yield from statements
+                yield from _nested_statements(statements)
+
+
+def _binds_name(node: ast.stmt, name: str) -> bool:
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return any((alias.asname or alias.name.split(".")[0]) == name for alias in node.names)
+    if isinstance(node, (ast.Assign, ast.AnnAssign)):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        return any(isinstance(target, ast.Name) and target.id == name for target in targets)
+    return isinstance(node, (ast.AsyncFunctionDef, ast.ClassDef)) and node.name == name
+
+
+def _resolve_top_level_imports(root_path, module_path: str, tree: ast.Module) -> List[Optional[Tuple[str, Path]]]:
+    """Resolves the imports at the top level of a module, raising ImportError for those which would fail.
+
+    Returns the module path and file of imported modules in the folder, and None for modules outside of it. Imports
+    nested in other statements, such as try or if, are not checked, as they may be conditional."""
+    package = module_path.split(".")[:-1]
+    resolved = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            resolved.extend(_resolve_module(root_path, alias.name) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            resolved.append(_resolve_module(root_path, node.module))
+        elif isinstance(node, ast.ImportFrom):
+            if not package:
+                raise ImportError("attempted relative import with no known parent package")
+            if node.level > len(package):
+                raise ImportError("attempted relative import beyond top-level package")
+            base = package[: len(package) - node.level + 1]
+            name = ".".join(base + ([node.module] if node.module else []))
+            resolved.append(_resolve_module(root_path, name))
+    return resolved
+
+
+def _resolve_module(root_path, name: str) -> Optional[Tuple[str, Path]]:
+    parts = name.split(".")
+    root = Path(root_path)
+    if not ((root / parts[0]).is_dir() or (root / parts[0]).with_suffix(".py").is_file()):
+        if parts[0] in sys.builtin_module_names or importlib.util.find_spec(parts[0]) is not None:
+            return None
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    path = root.joinpath(*parts)
+    if path.with_suffix(".py").is_file():
+        return name, path.with_suffix(".py")
+    if (path / "__init__.py").is_file():
+        return name, path / "__init__.py"
+    if path.is_dir():  # Namespace package
+        return None
+    raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+
+_VALIDATE_IN_SUBPROCESS = """
+import importlib, json, sys
+from cognite.experimental._api.functions import _validate_function_handle, convert_file_path_to_module_path
+root_path, function_path = sys.argv[1:]
+sys.path.insert(0, root_path)
+try:
+    handler = importlib.import_module(convert_file_path_to_module_path(function_path))
     _validate_function_handle(handler.handle)
-    sys.path.remove(root_path)
+    error = None
+except Exception as e:
+    error = [type(e).__name__, str(e)]
+print()
+print(json.dumps(error))
+"""
+
+
+def _validate_function_folder_in_subprocess(root_path, function_path):
+    result = subprocess.run(
+        [sys.executable, "-c", _VALIDATE_IN_SUBPROCESS, os.path.abspath(root_path), function_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if result.returncode != 0:
+        raise ImportError(f"Could not import {function_path}: {result.stderr.strip()}")
+    error = json.loads(result.stdout.splitlines()[-1])
+    if error is not None:
+        error_type = getattr(builtins, error[0], None)
+        if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+            raise ImportError(f"Could not import {function_path}: {error[0]}: {error[1]}")
+        raise error_type(error[1])
 
 
 def _validate_function_handle(function_handle):
@@ -393,8 +980,9 @@ class FunctionCallsAPI(APIClient):
         schedule_id: Optional[int] = None,
         start_time: Optional[Dict[str, int]] = None,
         end_time: Optional[Dict[str, int]] = None,
+        limit: int = 25,
     ) -> FunctionCallList:
-        """List all calls associated with a specific function id. Either function_id or function_external_id must be specified.
+        """List calls associated with a specific function id. Either function_id or function_external_id must be specified.
 
         Args:
             function_id (int, optional): ID of the function on which the calls were made.
@@ -403,6 +991,7 @@ class FunctionCallsAPI(APIClient):
             schedule_id (int, optional): Schedule id from which the call belongs (if any).
             start_time (Dict[str, int], optional): Start time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
             end_time (Dict[str, int], optional): End time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            limit (int): Maximum number of calls to return. Defaults to 25. Set to -1, float("inf") or None to return all calls.
 
         Returns:
             FunctionCallList: List of function calls
@@ -423,14 +1012,120 @@ class FunctionCallsAPI(APIClient):
                 >>> calls = func.list_calls()
 
         """
+        return FunctionCallList(
+            list(
+                self(
+                    function_id=function_id,
+                    function_external_id=function_external_id,
+                    status=status,
+                    schedule_id=schedule_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    limit=limit,
+                )
+            ),
+            cognite_client=self._cognite_client,
+        )
+
+    def __call__(
+        self,
+        function_id: Optional[int] = None,
+        function_external_id: Optional[str] = None,
+        status: Optional[str] = None,
+        schedule_id: Optional[int] = None,
+        start_time: Optional[Dict[str, int]] = None,
+        end_time: Optional[Dict[str, int]] = None,
+        chunk_size: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Union[FunctionCall, FunctionCallList]]:
+        """Iterate over the calls of a function, fetching pages lazily by following cursors.
+
+        Either function_id or function_external_id must be specified.
+
+        Args:
+            function_id (int, optional): ID of the function on which the calls were made.
+            function_external_id (str, optional): External ID of the function on which the calls were made.
+            status (str, optional): Status of the call. Possible values ["Running", "Failed", "Completed", "Timeout"].
+            schedule_id (int, optional): Schedule id from which the call belongs (if any).
+            start_time (Dict[str, int], optional): Start time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            end_time (Dict[str, int], optional): End time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            chunk_size (int, optional): Number of calls to yield at a time. Yields single calls if not given.
+            limit (int, optional): Maximum number of calls to return. Defaults to all calls.
+
+        Yields:
+            Union[FunctionCall, FunctionCallList]: Function calls, or lists of function calls if chunk_size is given.
+
+        Examples:
+
+            Iterate over all failed calls of a function::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> for call in c.functions.calls(function_id=1, status="Failed"):
+                ...     call # do something with the call
+        """
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(function_id, function_external_id)
         if function_external_id:
-            function_id = self._cognite_client.functions.retrieve(external_id=function_external_id).id
-        url = f"/functions/{function_id}/calls/list"
+            function_id = self._cognite_client.functions._resolve_id(function_external_id)
         filter = {"status": status, "scheduleId": schedule_id, "startTime": start_time, "endTime": end_time}
-        post_body = {"filter": filter}
-        res = self._post(url, json=post_body)
-        return FunctionCallList._load(res.json()["items"], cognite_client=self._cognite_client)
+        return self._list_generator(
+            "POST",
+            cls=FunctionCallList,
+            resource_path=f"/functions/{function_id}/calls",
+            limit=limit,
+            chunk_size=chunk_size,
+            filter=filter,
+        )
+
+    def stats(
+        self,
+        function_id: Optional[int] = None,
+        function_external_id: Optional[str] = None,
+        status: Optional[str] = None,
+        schedule_id: Optional[int] = None,
+        start_time: Optional[Dict[str, int]] = None,
+        end_time: Optional[Dict[str, int]] = None,
+        limit: Optional[int] = None,
+    ) -> FunctionCallStats:
+        """Loads the calls of a function for latency, throughput and error analytics. Requires numpy.
+
+        Calls are fetched page by page and converted to arrays as they arrive, so that all calls of a function can be
+        analyzed without keeping them as objects in memory.
+
+        Args:
+            function_id (int, optional): ID of the function on which the calls were made.
+            function_external_id (str, optional): External ID of the function on which the calls were made.
+            status (str, optional): Status of the call. Possible values ["Running", "Failed", "Completed", "Timeout"].
+            schedule_id (int, optional): Schedule id from which the call belongs (if any).
+            start_time (Dict[str, int], optional): Start time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            end_time (Dict[str, int], optional): End time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            limit (int, optional): Maximum number of calls to load. Defaults to all calls.
+
+        Returns:
+            FunctionCallStats: The calls in columnar form.
+
+        Examples:
+
+            Find the 99th percentile latency and the failure rate per schedule over the last day::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> stats = c.functions.calls.stats(function_id=1, start_time={"min": timestamp_to_ms("1d-ago")})
+                >>> p99 = stats.latency_percentiles([99])[99]
+                >>> rates = stats.error_rates()
+        """
+        return FunctionCallStats._load(
+            self(
+                function_id=function_id,
+                function_external_id=function_external_id,
+                status=status,
+                schedule_id=schedule_id,
+                start_time=start_time,
+                end_time=end_time,
+                chunk_size=self._LIST_LIMIT,
+                limit=limit,
+            )
+        )
 
     def retrieve(
         self, call_id: int, function_id: Optional[int] = None, function_external_id: Optional[str] = None
@@ -463,7 +1158,7 @@ class FunctionCallsAPI(APIClient):
         """
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(function_id, function_external_id)
         if function_external_id:
-            function_id = self._cognite_client.functions.retrieve(external_id=function_external_id).id
+            function_id = self._cognite_client.functions._resolve_id(function_external_id)
         url = f"/functions/{function_id}/calls/{call_id}"
         res = self._get(url)
         return FunctionCall._load(res.json(), cognite_client=self._cognite_client)
@@ -497,7 +1192,7 @@ class FunctionCallsAPI(APIClient):
         """
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(function_id, function_external_id)
         if function_external_id:
-            function_id = self._cognite_client.functions.retrieve(external_id=function_external_id).id
+            function_id = self._cognite_client.functions._resolve_id(function_external_id)
         url = f"/functions/{function_id}/calls/{call_id}/response"
         res = self._get(url)
         return res.json().get("response")
@@ -533,11 +1228,175 @@ class FunctionCallsAPI(APIClient):
         """
         utils._auxiliary.assert_exactly_one_of_id_or_external_id(function_id, function_external_id)
         if function_external_id:
-            function_id = self._cognite_client.functions.retrieve(external_id=function_external_id).id
+            function_id = self._cognite_client.functions._resolve_id(function_external_id)
         url = f"/functions/{function_id}/calls/{call_id}/logs"
         res = self._get(url)
         return FunctionCallLog._load(res.json()["items"])
 
+    def stream_logs(
+        self,
+        call_id: int,
+        function_id: Optional[int] = None,
+        function_external_id: Optional[str] = None,
+        follow: bool = False,
+        poll_interval: float = 1.0,
+    ) -> Iterator[FunctionCallLogEntry]:
+        """Yields the log entries of a function call one by one, optionally following the log of a running call.
+
+        When following, the log is fetched again every `poll_interval` seconds while the call is running, and only the
+        new entries are yielded. The log is fetched a final time once the call has finished.
+
+        Args:
+            call_id (int): ID of the call.
+            function_id (int, optional): ID of the function on which the call was made.
+            function_external_id (str, optional): External ID of the function on which the call was made.
+            follow (bool): Keep yielding new entries until the call has finished.
+            poll_interval (float): Seconds between fetching the log of a running call.
+
+        Yields:
+            FunctionCallLogEntry: Log entries, in order.
+
+        Examples:
+
+            Follow the log of a running call::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> call = c.functions.call(id=1, wait=False)
+                >>> for entry in c.functions.calls.stream_logs(call_id=call.id, function_id=1, follow=True):
+                ...     print(entry.message)
+        """
+        utils._auxiliary.assert_exactly_one_of_id_or_external_id(function_id, function_external_id)
+        if function_external_id:
+            function_id = self._cognite_client.functions._resolve_id(function_external_id)
+        url = f"/functions/{function_id}/calls/{call_id}/logs"
+        seen = 0
+        while True:
+            running = follow and self.retrieve(call_id=call_id, function_id=function_id).status == "Running"
+            items = self._get(url).json()["items"]
+            for item in items[seen:]:
+                yield FunctionCallLogEntry._load(item, cognite_client=self._cognite_client)
+            seen = max(seen, len(items))
+            if not running:
+                return
+            time.sleep(poll_interval)
+
+    def as_completed(
+        self,
+        calls: List[FunctionCall],
+        timeout: Optional[float] = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+    ) -> Iterator[FunctionCall]:
+        """Yields function calls as they finish, tracking all of them in a single polling loop.
+
+        In each round, the running calls of each function are refreshed with a single `list` request, filtered on the
+        start times of those calls, and the functions are polled concurrently. Calls which are not in the listed page are
+        retrieved one by one. The wait between rounds starts at `poll_interval` seconds, doubles up to
+        `max_poll_interval` seconds while no call finishes, and is reset when one does.
+
+        Args:
+            calls (List[FunctionCall]): Calls to wait for, e.g. made with `wait=False`. The calls are updated in place.
+            timeout (float, optional): Raise TimeoutError if not all calls have finished after this many seconds.
+            poll_interval (float): Initial number of seconds between polling rounds.
+            max_poll_interval (float): Maximum number of seconds between polling rounds.
+
+        Yields:
+            FunctionCall: Finished calls, in order of completion.
+
+        Examples:
+
+            Make many calls and process the responses as the calls finish::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> calls = [c.functions.call(id=1, data={"x": x}, wait=False) for x in range(100)]
+                >>> for call in c.functions.calls.as_completed(calls):
+                ...     response = call.get_response()
+        """
+        start = time.time()
+        pending = {}
+        for call in calls:
+            if call.status == "Running":
+                pending[call.id] = call
+            else:
+                yield call
+        interval = poll_interval
+        while pending:
+            if timeout is not None and time.time() - start + interval > timeout:
+                raise TimeoutError(f"{len(pending)} function calls did not finish within {timeout} seconds")
+            time.sleep(interval)
+            finished = self._refresh_calls(list(pending.values()))
+            for call in finished:
+                del pending[call.id]
+                yield call
+            interval = poll_interval if finished else min(2 * interval, max_poll_interval)
+
+    def wait_all(
+        self,
+        calls: List[FunctionCall],
+        timeout: Optional[float] = None,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 30.0,
+    ) -> FunctionCallList:
+        """Waits until all function calls have finished, tracking all of them in a single polling loop. See `as_completed`.
+
+        Args:
+            calls (List[FunctionCall]): Calls to wait for, e.g. made with `wait=False`. The calls are updated in place.
+            timeout (float, optional): Raise TimeoutError if not all calls have finished after this many seconds.
+            poll_interval (float): Initial number of seconds between polling rounds.
+            max_poll_interval (float): Maximum number of seconds between polling rounds.
+
+        Returns:
+            FunctionCallList: The finished calls, in the same order as given.
+
+        Examples:
+
+            Make many calls and wait for all of them::
+
+                >>> from cognite.experimental import CogniteClient
+                >>> c = CogniteClient()
+                >>> calls = [c.functions.call(id=1, data={"x": x}, wait=False) for x in range(100)]
+                >>> calls = c.functions.calls.wait_all(calls)
+                >>> failed = [call for call in calls if call.status != "Completed"]
+        """
+        for _ in self.as_completed(
+            calls, timeout=timeout, poll_interval=poll_interval, max_poll_interval=max_poll_interval
+        ):
+            pass
+        return FunctionCallList(calls, cognite_client=self._cognite_client)
+
+    def _refresh_calls(self, calls: List[FunctionCall]) -> List[FunctionCall]:
+        """Updates running calls in place by listing the calls of each function in the start time window of the
+        running calls, and returns those which have finished. Calls which are not found in the window are retrieved."""
+        calls_by_function = {}
+        for call in calls:
+            calls_by_function.setdefault(call.function_id, []).append(call)
+
+        def refresh(function_id, function_calls):
+            start_times = [call.start_time for call in function_calls if call.start_time is not None]
+            pending = {call.id for call in function_calls if call.start_time is not None}
+            latest = {}
+            if pending:
+                start_time = {"min": min(start_times), "max": max(start_times)}
+                for call in self(function_id=function_id, start_time=start_time):
+                    latest[call.id] = call
+                    pending.discard(call.id)
+                    if not pending:
+                        break
+            for call in function_calls:
+                if call.id not in latest:
+                    latest[call.id] = self.retrieve(call_id=call.id, function_id=function_id)
+                call.status = latest[call.id].status
+                call.end_time = latest[call.id].end_time
+                call.error = latest[call.id].error
+
+        summary = utils._concurrency.execute_tasks_concurrently(
+            refresh, list(calls_by_function.items()), max_workers=self._config.max_workers
+        )
+        summary.raise_compound_exception_if_failed_tasks()
+        return [call for call in calls if call.status != "Running"]
+
 
 class FunctionSchedulesAPI(APIClient):
     def list(self) -> FunctionSchedulesList:
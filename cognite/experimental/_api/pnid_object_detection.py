@@ -16,4 +16,4 @@ class PNIDObjectDetectionAPI(ContextAPI):
         Returns:
             ContextualizationJob: Resulting queued job. Note that .results property of this job will block waiting for results.
         """
-        return self._run_job(job_path="/findobjects", status_path="/", file_id=file_id,)
+        return self._run_job(job_path="/findobjects", status_path="/", use_cache=True, file_id=file_id,)
@@ -1,8 +1,21 @@
-from typing import Dict, List, Union
+import gzip
+import os
+import re
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 
+import requests
+
+from cognite.client import utils
 from cognite.experimental._context_client import ContextAPI
 from cognite.experimental.data_classes import ContextualizationJob
 
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return [token.upper() for token in _TOKEN_PATTERN.findall(text or "")]
+
 
 class PNIDParsingAPI(ContextAPI):
     _RESOURCE_PATH = "/context/pnid"
@@ -16,6 +29,7 @@ class PNIDParsingAPI(ContextAPI):
         min_tokens: int = 1,
         file_id: int = None,
         file_external_id: str = None,
+        prefilter: bool = False,
     ) -> ContextualizationJob:
         """Detect entities in a PNID
 
@@ -27,6 +41,7 @@ class PNIDParsingAPI(ContextAPI):
             name_mapping (Dict[str,str]): Optional mapping between entity names and their synonyms in the P&ID. Used if the P&ID contains names on a different form than the entity list (e.g a substring only). The response will contain names as given in the entity list.
             partial_match (bool): Allow for a partial match (e.g. missing prefix).
             min_tokens (int): Minimal number of tokens a match must be based on
+            prefilter (bool): Download the OCR text of the file first and only submit entities which can plausibly be found in it, see `prefilter_entities`. The reduction is reported in `prefilter_stats` on the returned job. If no entities are left, no job is submitted, and a completed job without items is returned.
         Returns:
             ContextualizationJob: Resulting queued job. Note that .results property of this job will block waiting for results."""
 
@@ -41,9 +56,28 @@ class PNIDParsingAPI(ContextAPI):
 
         entities, entities_return = self._detect_before_hook(entities, search_field)
 
+        prefilter_stats = None
+        if prefilter:
+            entities, name_mapping, prefilter_stats = self.prefilter_entities(
+                entities,
+                name_mapping=name_mapping,
+                partial_match=partial_match,
+                min_tokens=min_tokens,
+                file_id=file_id,
+                file_external_id=file_external_id,
+            )
+
+        if prefilter and not entities:
+            # Nothing can be detected, so there is no job to submit
+            job = ContextualizationJob(status="Completed", cognite_client=self._cognite_client)
+            job._result = {"items": [], "fileId": file_id, "fileExternalId": file_external_id}
+            job.prefilter_stats = prefilter_stats
+            return job
+
         job = self._run_job(
             job_path="/detect",
             status_path="/detect/",
+            use_cache=True,
             file_id=file_id,
             file_external_id=file_external_id,
             entities=entities,
@@ -51,11 +85,76 @@ class PNIDParsingAPI(ContextAPI):
             name_mapping=name_mapping,
             min_tokens=min_tokens,
         )
+        job.prefilter_stats = prefilter_stats
         job.wait_for_completion()
         if job.status == "Completed":
             job = self._detect_after_hook(job, entities_return, search_field)
         return job
 
+    def prefilter_entities(
+        self,
+        entities: List[str],
+        name_mapping: Dict[str, str] = None,
+        partial_match: bool = False,
+        min_tokens: int = 1,
+        file_id: int = None,
+        file_external_id: str = None,
+        ocr_text: str = None,
+    ) -> Tuple[List[str], Optional[Dict[str, str]], Dict[str, float]]:
+        """Narrow down a list of entities to those which can plausibly be detected in a P&ID, based on its OCR text.
+
+        Names and OCR text are compared on their letters and digits only, ignoring case, separators and whitespace, so that "21-PT-1019"
+        is found in "21PT1019" or "21-PT 1019". An entity is kept if its name (or, with partial_match, its last `min_tokens` alphanumeric
+        tokens), or its synonym in name_mapping, occurs in the OCR text compared this way. As separators between words of the text are
+        ignored too, some entities which are not in the file are kept, but an entity which OCR read correctly is not removed.
+
+        Args:
+            entities (List[str]): List of entity names.
+            name_mapping (Dict[str,str]): Optional mapping between entity names and their synonyms in the P&ID.
+            partial_match (bool): Allow for a partial match (e.g. missing prefix).
+            min_tokens (int): Minimal number of tokens a match must be based on
+            file_id (int): ID of the file to download OCR results for.
+            file_external_id (str): External ID of the file to download OCR results for.
+            ocr_text (str): OCR text of the file, if already downloaded. If given, file_id and file_external_id are ignored.
+
+        Returns:
+            Tuple[List[str], Dict[str,str], Dict[str,float]]: The candidate entities, name_mapping restricted to those entities, and statistics
+            with keys 'entities_before', 'entities_after' and 'reduction_ratio'."""
+        if ocr_text is None:
+            ocr_text = self._cognite_client.files.unstructured.download(id=file_id, external_id=file_external_id)
+        ocr_text = "".join(_tokenize(ocr_text))
+
+        candidates = [
+            entity
+            for entity in entities
+            if self._is_candidate(entity, ocr_text, partial_match, min_tokens)
+            or (
+                name_mapping
+                and entity in name_mapping
+                and self._is_candidate(name_mapping[entity], ocr_text, partial_match, min_tokens)
+            )
+        ]
+        if name_mapping:
+            candidate_set = set(candidates)
+            name_mapping = {k: v for k, v in name_mapping.items() if k in candidate_set}
+
+        stats = {
+            "entities_before": len(entities),
+            "entities_after": len(candidates),
+            "reduction_ratio": 1 - len(candidates) / len(entities) if entities else 0.0,
+        }
+        return candidates, name_mapping, stats
+
+    @staticmethod
+    def _is_candidate(name: str, ocr_text: str, partial_match: bool, min_tokens: int) -> bool:
+        tokens = _tokenize(name)
+        if not tokens:  # nothing to filter on, leave it to the API
+            return True
+        if partial_match:
+            # a partial match may drop any prefix, so the shortest allowed suffix is the weakest requirement
+            tokens = tokens[-max(min_tokens, 1) :]
+        return "".join(tokens) in ocr_text
+
     @staticmethod
     def _detect_before_hook(entities, search_field):
         """To decide whether to use search_field or not and make sure the entities are of type List[str]
@@ -100,6 +199,59 @@ class PNIDParsingAPI(ContextAPI):
             patterns=patterns,
         )
 
+    def extract_pattern_many(
+        self,
+        patterns: List[str],
+        file_ids: List[int] = None,
+        file_external_ids: List[str] = None,
+        max_workers: int = None,
+    ) -> Dict[str, List]:
+        """Extract tags from many P&IDs based on the same patterns, and merge the results into a single table.
+
+        The patterns are validated once before any job is submitted. At most `max_workers` jobs are in progress at any time.
+
+        Args:
+            patterns (list): List of regular expression patterns to look for in the P&IDs. See API docs for details.
+            file_ids (List[int]): IDs of the files, should already be uploaded in the same tenant.
+            file_external_ids (List[str]): External IDs of the files.
+            max_workers (int): Maximum number of concurrent jobs. Defaults to the max_workers of the client.
+
+        Returns:
+            Dict[str, List]: Columns 'file_id', 'file_external_id', 'pattern', 'text', 'x_min', 'x_max', 'y_min' and 'y_max', with one row per match.
+            The pattern is the first of the given patterns fully matching the text, or None if the match can not be attributed locally.
+            Use e.g. `pandas.DataFrame(table)` for further processing."""
+        try:
+            compiled_patterns = [(pattern, re.compile(pattern)) for pattern in patterns]
+        except re.error as e:
+            raise ValueError(f"Invalid pattern '{e.pattern}': {e}") from e
+
+        files = [{"file_id": id} for id in file_ids or []] + [
+            {"file_external_id": external_id} for external_id in file_external_ids or []
+        ]
+        summary = utils._concurrency.execute_tasks_concurrently(
+            lambda **file: self.extract_pattern(patterns=patterns, **file).result,
+            files,
+            max_workers=max_workers or self._config.max_workers,
+        )
+        summary.raise_compound_exception_if_failed_tasks(
+            task_unwrap_fn=lambda task: task.get("file_id") or task.get("file_external_id")
+        )
+
+        table = {k: [] for k in ["file_id", "file_external_id", "pattern", "text", "x_min", "x_max", "y_min", "y_max"]}
+        for file, result in zip(files, summary.results):
+            for item in result.get("items", []):
+                text = item.get("text")
+                bounding_box = item.get("boundingBox") or {}
+                table["file_id"].append(result.get("fileId", file.get("file_id")))
+                table["file_external_id"].append(result.get("fileExternalId", file.get("file_external_id")))
+                table["pattern"].append(
+                    next((pattern for pattern, regex in compiled_patterns if regex.fullmatch(text or "")), None)
+                )
+                table["text"].append(text)
+                for key in ["xMin", "xMax", "yMin", "yMax"]:
+                    table[utils._auxiliary.to_snake_case(key)].append(bounding_box.get(key))
+        return table
+
     def convert(
         self, items: List[Dict], grayscale: bool = None, file_id: int = None, file_external_id: str = None
     ) -> ContextualizationJob:
@@ -124,3 +276,63 @@ class PNIDParsingAPI(ContextAPI):
             items=items,
             grayscale=grayscale,
         )
+
+    def convert_many(
+        self, items: Dict[Union[int, str], List[Dict]], grayscale: bool = None
+    ) -> List[ContextualizationJob]:
+        """Convert many P&IDs to interactive SVGs, submitting the jobs concurrently.
+
+        Args:
+            items (Dict[Union[int,str],List[Dict]]): Entity annotations to highlight per file, keyed by file id (int) or file external id (str).
+            grayscale (bool, optional): Return the SVG versions in grayscale colors only (reduces the file size). Defaults to None.
+
+        Returns:
+            List[ContextualizationJob]: Resulting queued jobs, in the same order as items. Use `download_svgs` to retrieve the results."""
+        tasks = [
+            {"items": file_items, "grayscale": grayscale, "file_external_id": file}
+            if isinstance(file, str)
+            else {"items": file_items, "grayscale": grayscale, "file_id": file}
+            for file, file_items in items.items()
+        ]
+        summary = utils._concurrency.execute_tasks_concurrently(
+            self.convert, tasks, max_workers=self._config.max_workers
+        )
+        summary.raise_compound_exception_if_failed_tasks(
+            task_unwrap_fn=lambda task: task.get("file_id") or task.get("file_external_id")
+        )
+        return summary.results
+
+    def download_svgs(
+        self, jobs: List[ContextualizationJob], directory: str, compress: bool = False, chunk_size: int = 2 ** 16
+    ) -> List[str]:
+        """Download the SVGs of convert jobs to a directory, streaming each file to disk as soon as its job completes.
+        The status of all unfinished jobs is polled together, see `as_completed`.
+
+        Args:
+            jobs (List[ContextualizationJob]): Convert jobs, e.g. as returned by `convert_many`.
+            directory (str): Directory to download to. Files are named `<fileId>.svg` after the P&ID, or `<jobId>.svg`
+                if the job result has no file id, with `.gz` appended when compressed.
+            compress (bool): Gzip the SVGs while writing them to disk. Defaults to False.
+            chunk_size (int): Number of bytes to read into memory at a time.
+
+        Returns:
+            List[str]: Paths of the downloaded files, in the same order as jobs."""
+        os.makedirs(directory, exist_ok=True)
+        with ThreadPoolExecutor(self._config.max_workers) as p:
+            futures = {
+                job.job_id: p.submit(self._download_svg, job, directory, compress, chunk_size)
+                for job in self.as_completed(jobs)
+            }
+            return [futures[job.job_id].result() for job in jobs]
+
+    def _download_svg(self, job: ContextualizationJob, directory: str, compress: bool, chunk_size: int) -> str:
+        job.wait_for_completion()  # raises if the job failed
+        path = os.path.join(directory, f"{job.result.get('fileId') or job.job_id}.svg")
+        if compress:
+            path += ".gz"
+        with requests.get(job.result["svgUrl"], stream=True, timeout=self._config.timeout) as response:
+            response.raise_for_status()
+            with (gzip.open(path, "wb") if compress else open(path, "wb")) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        return path
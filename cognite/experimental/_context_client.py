@@ -1,15 +1,107 @@
 import functools
 import re
-from typing import Any, Dict, List, Union
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Union
 
+import requests
 from requests import Response
 
+from cognite.client import utils
 from cognite.client._api_client import APIClient
+from cognite.client._http_client import GLOBAL_REQUEST_SESSION
+from cognite.client.data_classes._base import CogniteResource, CogniteResourceList
 from cognite.client.utils._auxiliary import to_camel_case, to_snake_case
 from cognite.experimental.data_classes import ContextualizationJob
 
 
+class JobStatusPoller:
+    """Polls the status of contextualization jobs and models over the shared keep-alive session of the SDK.
+
+    A poll is a single GET without the retry machinery of the client, falling back to a regular request (with retries and
+    error handling) only if it does not succeed. Statistics are kept per status path, see `stats`, for the `max_jobs` most
+    recently polled jobs. Statistics of older jobs are only kept in aggregate, see `summary`.
+    """
+
+    def __init__(self, api: APIClient, max_jobs: int = 1000):
+        self._api = api
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.stats = OrderedDict()
+        self._evicted = {"jobs": 0, "polls": 0, "wasted_polls": 0, "latency": 0.0}
+
+    def get(self, status_path: str, id: int) -> Dict[str, Any]:
+        """Retrieves the status of a job or model.
+
+        Args:
+            status_path (str): Path to the status endpoint, ending in '/'.
+            id (int): Job id or model id.
+
+        Returns:
+            Dict[str, Any]: The response body."""
+        path = f"{status_path}{id}"
+        start = time.time()
+        try:
+            res = GLOBAL_REQUEST_SESSION.get(
+                self._api._get_base_url_with_base_path() + path,
+                headers=self._api._configure_headers(self._api._config.headers.copy()),
+                timeout=self._api._config.timeout,
+                allow_redirects=False,
+            )
+        except requests.exceptions.RequestException:
+            res = None
+        if res is None or res.status_code != 200:
+            res = self._api._get(path)
+        data = res.json()
+        self._record(path, time.time() - start, data.get("status") in ["Queued", "Running"])
+        return data
+
+    def _record(self, path: str, latency: float, wasted: bool):
+        with self._lock:
+            if path not in self.stats and len(self.stats) >= self.max_jobs:
+                _, evicted = self.stats.popitem(last=False)
+                self._evicted["jobs"] += 1
+                for key, value in evicted.items():
+                    self._evicted[key] += value
+            stats = self.stats.setdefault(path, {"polls": 0, "wasted_polls": 0, "latency": 0.0})
+            self.stats.move_to_end(path)
+            stats["polls"] += 1
+            stats["wasted_polls"] += wasted
+            stats["latency"] += latency
+
+    def summary(self) -> Dict[str, float]:
+        """Aggregated statistics over all polled jobs.
+
+        Returns:
+            Dict[str, float]: Total number of jobs, polls and wasted polls (polls of unfinished jobs), and the mean latency per poll in seconds."""
+        with self._lock:
+            totals = {
+                key: value + sum(stats[key] for stats in self.stats.values())
+                for key, value in self._evicted.items()
+                if key != "jobs"
+            }
+            return {
+                "jobs": self._evicted["jobs"] + len(self.stats),
+                "polls": totals["polls"],
+                "wasted_polls": totals["wasted_polls"],
+                "mean_latency": totals["latency"] / totals["polls"] if totals["polls"] else 0.0,
+            }
+
+    def reset(self):
+        """Clears all statistics."""
+        with self._lock:
+            self.stats = OrderedDict()
+            self._evicted = {"jobs": 0, "polls": 0, "wasted_polls": 0, "latency": 0.0}
+
+
 class ContextAPI(APIClient):
+    job_cache = None  # Optional ContextualizationJobCache used by jobs which run on a single file
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status_poller = JobStatusPoller(self)
+
     def _camel_post(
         self,
         context_path: str,
@@ -31,11 +123,110 @@ class ContextAPI(APIClient):
             headers=headers,
         )
 
-    def _run_job(self, job_path, status_path=None, headers=None, **kwargs) -> ContextualizationJob:
+    def _camel_list_generator(
+        self,
+        context_path: str,
+        limit: int = None,
+        chunk_size: int = None,
+        json: Dict[str, Any] = None,
+        method: str = "POST",
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yields pages of items from a list endpoint, following nextCursor until exhausted or `limit` items were returned."""
+        if limit in [-1, float("inf")]:
+            limit = None
+        chunk_size = chunk_size or self._LIST_LIMIT
+        cursor, count = None, 0
+        while limit is None or count < limit:
+            body = {
+                **(json or {}),
+                "limit": chunk_size if limit is None else min(chunk_size, limit - count),
+                "cursor": cursor,
+            }
+            if method == "GET":
+                res = self._camel_get(context_path, params=body).json()
+            else:
+                res = self._camel_post(context_path, json=body).json()
+            count += len(res["items"])
+            yield res["items"]
+            cursor = res.get("nextCursor")
+            if not cursor or not res["items"]:
+                break
+
+    def _camel_list_iterator(
+        self,
+        context_path: str,
+        load: Callable[[List[Dict[str, Any]]], CogniteResourceList],
+        chunk_size: int = None,
+        limit: int = None,
+        json: Dict[str, Any] = None,
+        method: str = "POST",
+    ) -> Iterator[Union[CogniteResource, CogniteResourceList]]:
+        """Yields resources one by one, or in lists of chunk_size if given, fetching pages lazily."""
+        for page in self._camel_list_generator(
+            context_path, limit=limit, chunk_size=chunk_size, json=json, method=method
+        ):
+            resources = load(page)
+            if chunk_size:
+                yield resources
+            else:
+                yield from resources
+
+    def as_completed(
+        self, jobs: List[ContextualizationJob], interval: float = 1, timeout: float = None
+    ) -> Iterator[ContextualizationJob]:
+        """Yields jobs as they finish, polling the status of all unfinished jobs concurrently. Failed jobs are yielded with status 'Failed'
+        instead of raising an exception.
+
+        Args:
+            jobs (List[ContextualizationJob]): jobs to wait for.
+            interval (float): seconds to wait between polling rounds.
+            timeout (float): raise TimeoutError if not all jobs have finished after this many seconds.
+
+        Yields:
+            ContextualizationJob: finished jobs, in order of completion."""
+        pending = list(jobs)
+        start = time.time()
+        while pending:
+            summary = utils._concurrency.execute_tasks_concurrently(
+                lambda job: job.update_status(), [(job,) for job in pending], max_workers=self._config.max_workers
+            )
+            summary.raise_compound_exception_if_failed_tasks()
+            for job in pending:
+                if job.status not in ["Queued", "Running"]:
+                    yield job
+            pending = [job for job in pending if job.status in ["Queued", "Running"]]
+            if pending:
+                if timeout is not None and time.time() - start + interval > timeout:
+                    raise TimeoutError(f"{len(pending)} jobs did not finish within {timeout} seconds")
+                time.sleep(interval)
+
+    def _run_job(self, job_path, status_path=None, headers=None, use_cache=False, **kwargs) -> ContextualizationJob:
         if status_path is None:
             status_path = job_path + "/"
-        return ContextualizationJob._load_with_status(
+        cache_key = None
+        if use_cache and self.job_cache is not None:
+            file = self._cognite_client.files.retrieve(
+                id=kwargs.get("file_id"), external_id=kwargs.get("file_external_id")
+            )
+            if file is not None:
+                cache_key = self.job_cache.fingerprint(
+                    endpoint=self._RESOURCE_PATH + job_path,
+                    file_id=file.id,
+                    file_last_updated_time=file.last_updated_time,
+                    arguments={k: v for k, v in kwargs.items() if k not in ["file_id", "file_external_id"]},
+                )
+                job = self.job_cache.get(
+                    cache_key, status_path=self._RESOURCE_PATH + status_path, cognite_client=self._cognite_client
+                )
+                if job is not None:
+                    return job
+        job = ContextualizationJob._load_with_status(
             self._camel_post(job_path, json=kwargs, headers=headers).json(),
             status_path=self._RESOURCE_PATH + status_path,
             cognite_client=self._cognite_client,
         )
+        job._status_poller = self.status_poller
+        if cache_key is not None:
+            job._job_cache = self.job_cache
+            job._cache_key = cache_key
+        return job
@@ -1,17 +1,23 @@
 import copy
+import json
 import math
+import re
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from typing_extensions import TypedDict
 
+from cognite.client import utils
 from cognite.client.data_classes._base import (
     CognitePrimitiveUpdate,
     CogniteResource,
     CogniteResourceList,
     CogniteUpdate,
 )
-from cognite.client.utils._auxiliary import to_camel_case
+from cognite.client.utils._auxiliary import to_camel_case, to_snake_case
 from cognite.experimental.exceptions import ModelFailedException
 
 
@@ -53,21 +59,27 @@ class ContextualizationJob(CogniteResource):
         self._cognite_client = cognite_client
         self._result = None
         self._status_path = status_path
+        self._job_cache = None
+        self._cache_key = None
+        self._status_poller = None
 
     def update_status(self) -> str:
         """Updates the model status and returns it"""
-        data = self._cognite_client.entity_matching._get(f"{self._status_path}{self.job_id}").json()
+        poller = self._status_poller or self._cognite_client.entity_matching.status_poller
+        data = poller.get(self._status_path, self.job_id)
         self.status = data["status"]
         self.status_timestamp = data.get("statusTimestamp")
         self.start_timestamp = data.get("startTimestamp")
         self.request_timestamp = self.request_timestamp or data.get("requestTimestamp")
         self.error_message = data.get("errorMessage")
         self._result = {k: v for k, v in data.items() if k not in self._COMMON_FIELDS}
+        if self.status == "Completed" and self._job_cache is not None:
+            self._job_cache.put(self._cache_key, self)
         return self.status
 
     def wait_for_completion(self, interval=1):
         """Waits for job completion, raising ModelFailedException if fit failed - generally not needed to call as it is called by result"""
-        while True:
+        while self._result is None or self.status in ["Queued", "Running"]:
             self.update_status()
             if self.status not in ["Queued", "Running"]:
                 break
@@ -75,6 +87,13 @@ class ContextualizationJob(CogniteResource):
         if self.status == "Failed":
             raise ModelFailedException(self.__class__.__name__, self.job_id, self.error_message)
 
+    @property
+    def polling_stats(self) -> Optional[Dict[str, float]]:
+        """Number of polls, number of wasted polls (while the job was queued or running) and total latency in seconds spent polling this job.
+        None if the job has not been polled, or if it is no longer among the most recently polled jobs of the API."""
+        poller = self._status_poller or self._cognite_client.entity_matching.status_poller
+        return poller.stats.get(f"{self._status_path}{self.job_id}")
+
     @property
     def result(self):
         """Waits for the job to finish and returns the results."""
@@ -82,8 +101,12 @@ class ContextualizationJob(CogniteResource):
             self.wait_for_completion()
         return self._result
 
+    def matches(self) -> "EntityMatchingMatches":
+        """Waits for an entity matching predict job to finish and returns its results in columnar form."""
+        return EntityMatchingMatches._load(self.result["items"])
+
     def __str__(self):
-        return "%s(id: %d,status: %s,error: %s)" % (
+        return "%s(id: %s,status: %s,error: %s)" % (
             self.__class__.__name__,
             self.job_id,
             self.status,
@@ -134,11 +157,11 @@ class EntityMatchingModel(CogniteResource):
         self._cognite_client = cognite_client
 
     def __str__(self):
-        return "%s(id: %d,status: %s,error: %s)" % (self.__class__.__name__, self.id, self.status, self.error_message,)
+        return "%s(id: %s,status: %s,error: %s)" % (self.__class__.__name__, self.id, self.status, self.error_message,)
 
     def update_status(self) -> str:
         """Updates the model status and returns it"""
-        data = self._cognite_client.entity_matching._get(f"{self._STATUS_PATH}{self.id}").json()
+        data = self._cognite_client.entity_matching.status_poller.get(self._STATUS_PATH, self.id)
         self.status = data["status"]
         self.status_timestamp = data.get("statusTimestamp")
         self.start_timestamp = data.get("startTimestamp")
@@ -162,6 +185,7 @@ class EntityMatchingModel(CogniteResource):
         match_to: Optional[List[Dict]] = None,
         num_matches=1,
         score_threshold=None,
+        project_fields: bool = False,
     ) -> ContextualizationJob:
         """Predict entity matching. NB. blocks and waits for the model to be ready if it has been recently created.
 
@@ -171,6 +195,7 @@ class EntityMatchingModel(CogniteResource):
             num_matches (int): number of matches to return for each item.
             score_threshold (float): only return matches with a score above this threshold
             ignore_missing_fields (bool): whether missing data in keyFrom or keyTo should be filled in with an empty string.
+            project_fields (bool): only send the fields used by the model's match_fields, plus 'id' and 'externalId'. Reduces payload size and preparation time for large inputs.
 
         Returns:
             ContextualizationJob: object which can be used to wait for and retrieve results."""
@@ -179,12 +204,147 @@ class EntityMatchingModel(CogniteResource):
             job_path=f"/predict",
             status_path=f"/jobs/",
             id=self.id,
-            match_from=self.dump_entities(match_from),
-            match_to=self.dump_entities(match_to),
+            match_from=self.dump_entities(match_from, self._projected_fields("from", project_fields)),
+            match_to=self.dump_entities(match_to, self._projected_fields("to", project_fields)),
             num_matches=num_matches,
             score_threshold=score_threshold,
         )
 
+    def predict_chunked(
+        self,
+        match_from: List[Union[Dict, CogniteResource]],
+        match_to: Optional[List[Union[Dict, CogniteResource]]] = None,
+        num_matches=1,
+        score_threshold=None,
+        max_chunk_bytes: int = 10 * 1024 ** 2,
+        max_retries: int = 2,
+        project_fields: bool = False,
+    ) -> List[Dict]:
+        """Predict entity matching for a large number of entities, by splitting match_from into chunks which are predicted concurrently.
+        NB. blocks and waits for all predictions to finish.
+
+        Args:
+            match_from: entities to match from, does not need an 'id' field. Tolerant to passing more than is needed or used (e.g. json dump of time series list).
+            match_to: entities to match to, does not need an 'id' field.  Tolerant to passing more than is needed or used. If omitted, will use data from fit.
+            num_matches (int): number of matches to return for each item.
+            score_threshold (float): only return matches with a score above this threshold
+            max_chunk_bytes (int): maximum size of the serialized entities in each request, including match_to, which is sent with every chunk. A single entity which does not fit is sent in a chunk by itself. Raises ValueError if match_to alone does not fit.
+            max_retries (int): number of times a chunk is resubmitted if its job fails.
+            project_fields (bool): only send the fields used by the model's match_fields, plus 'id' and 'externalId'.
+
+        Returns:
+            List[Dict]: the combined result items of all chunks, in the order of match_from."""
+        self.wait_for_completion()
+        match_to = self.dump_entities(match_to, self._projected_fields("to", project_fields))
+        match_to_bytes = len(json.dumps(match_to, default=utils._auxiliary.json_dump_default)) if match_to else 0
+        if match_to_bytes >= max_chunk_bytes:
+            raise ValueError(
+                f"match_to is {match_to_bytes} bytes when serialized, which leaves no room for match_from within "
+                f"max_chunk_bytes={max_chunk_bytes}. Increase max_chunk_bytes, or use predict_blocked to send only candidates."
+            )
+        chunks = []
+        chunk, chunk_bytes = [], match_to_bytes
+        for entity in self.dump_entities(match_from, self._projected_fields("from", project_fields)) or []:
+            entity_bytes = len(json.dumps(entity, default=utils._auxiliary.json_dump_default)) + 2  # separator
+            if chunk and chunk_bytes + entity_bytes > max_chunk_bytes:
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], match_to_bytes
+            chunk.append(entity)
+            chunk_bytes += entity_bytes
+        if chunk:
+            chunks.append(chunk)
+
+        results = self._predict_concurrently(
+            [(chunk, match_to) for chunk in chunks], num_matches, score_threshold, max_retries
+        )
+        return [item for items in results for item in items]
+
+    def predict_blocked(
+        self,
+        match_from: List[Union[Dict, CogniteResource]],
+        match_to: List[Union[Dict, CogniteResource]],
+        blocker: "EntityMatchingBlocker" = None,
+        num_matches=1,
+        score_threshold=None,
+        block_size: int = 1000,
+        max_retries: int = 2,
+    ) -> List[Dict]:
+        """Predict entity matching with client-side blocking: match_from is split into blocks, and each block is predicted
+        concurrently against only the entities in match_to which are candidates for it. NB. blocks and waits for all predictions to finish.
+
+        Args:
+            match_from: entities to match from, does not need an 'id' field. Tolerant to passing more than is needed or used (e.g. json dump of time series list).
+            match_to: entities to match to, does not need an 'id' field.  Tolerant to passing more than is needed or used.
+            blocker (EntityMatchingBlocker): blocking settings. Its `stats` are updated with the pruning ratio. Defaults to blocking on shared tokens.
+            num_matches (int): number of matches to return for each item.
+            score_threshold (float): only return matches with a score above this threshold
+            block_size (int): maximum number of entities to match from in each block.
+            max_retries (int): number of times a block is resubmitted if its job fails.
+
+        Returns:
+            List[Dict]: the combined result items of all blocks, in the order of match_from. Entities without candidates have no matches."""
+        self.wait_for_completion()
+        blocker = blocker or EntityMatchingBlocker()
+        match_from = self.dump_entities(match_from) or []
+        match_to = self.dump_entities(match_to) or []
+        blocks = blocker.blocks(
+            match_from,
+            match_to,
+            self._match_field_names(self.match_fields, "from"),
+            self._match_field_names(self.match_fields, "to"),
+            block_size=block_size,
+        )
+        results = self._predict_concurrently(
+            [([match_from[i] for i in from_block], [match_to[j] for j in to_block]) for from_block, to_block in blocks],
+            num_matches,
+            score_threshold,
+            max_retries,
+        )
+        items = [{"matchFrom": entity, "matches": []} for entity in match_from]
+        for (from_block, _), block_items in zip(blocks, results):
+            for i, item in zip(from_block, block_items):
+                items[i] = item
+        return items
+
+    def _predict_concurrently(
+        self, tasks: List[Tuple[List[Dict], Optional[List[Dict]]]], num_matches, score_threshold, max_retries: int
+    ) -> List[List[Dict]]:
+        """Runs a predict job for each (match_from, match_to) pair, and returns the result items of each. Jobs are submitted
+        concurrently and waited for together with `as_completed`. Failed jobs are resubmitted once all jobs of a round have finished."""
+        api = self._cognite_client.entity_matching
+
+        def submit(match_from, match_to):
+            return api._run_job(
+                job_path=f"/predict",
+                status_path=f"/jobs/",
+                id=self.id,
+                match_from=match_from,
+                match_to=match_to,
+                num_matches=num_matches,
+                score_threshold=score_threshold,
+            )
+
+        results = [None] * len(tasks)
+        attempts = [0] * len(tasks)
+        pending = list(range(len(tasks)))
+        while pending:
+            summary = utils._concurrency.execute_tasks_concurrently(
+                submit, [tasks[i] for i in pending], max_workers=self._cognite_client.config.max_workers
+            )
+            summary.raise_compound_exception_if_failed_tasks()
+            task_indices = {id(job): i for job, i in zip(summary.results, pending)}
+            pending = []
+            for job in api.as_completed(summary.results):
+                i = task_indices[id(job)]
+                if job.status == "Completed":
+                    results[i] = job.result["items"]
+                elif attempts[i] < max_retries:
+                    attempts[i] += 1
+                    pending.append(i)
+                else:
+                    raise ModelFailedException(job.__class__.__name__, job.job_id, job.error_message)
+        return results
+
     def refit(self, true_matches: List[Union[Dict, Tuple[Union[int, str], Union[int, str]]]]) -> "EntityMatchingModel":
         """Re-fits an entity matching model, using the combination of the old and new true matches.
 
@@ -201,14 +361,450 @@ class EntityMatchingModel(CogniteResource):
         return self._load(response.json(), cognite_client=self._cognite_client)
 
     @staticmethod
-    def dump_entities(entities: List[Union[Dict, CogniteResource]]) -> Optional[List[Dict]]:
-        if entities:
+    def dump_entities(
+        entities: Union[List[Union[Dict, CogniteResource]], "pandas.DataFrame"], fields: Optional[List[str]] = None
+    ) -> Optional[List[Dict]]:
+        """Dump entities for use in fit or predict.
+
+        Args:
+            entities: entities as dicts, CogniteResources or the rows of a pandas DataFrame.
+            fields (List[str]): if given, only these fields are included, together with 'id' and 'externalId'.
+                Otherwise CogniteResources are dumped with all string fields and 'id', and other entities are passed as-is.
+
+        Returns:
+            List[Dict]: the dumped entities, or None if there are no entities."""
+        keys = None
+        if fields:
+            keys = ["id", "externalId"] + [field for field in fields if field not in ["id", "externalId"]]
+        if hasattr(entities, "columns") and hasattr(entities, "to_dict"):  # pandas DataFrame
+            if keys:
+                entities = entities[[key for key in keys if key in entities.columns]]
+            records = entities.to_dict("records")
             return [
-                {k: v for k, v in e.dump(camel_case=True).items() if isinstance(v, str) or k == "id"}
+                {k: v for k, v in row.items() if v is not None and v == v} for row in records
+            ] or None  # v == v: NaN
+        if not entities:
+            return None
+        if keys:
+            attributes = [(key, to_snake_case(key)) for key in keys]
+            return [
+                {key: getattr(e, attribute) for key, attribute in attributes if getattr(e, attribute, None) is not None}
                 if isinstance(e, CogniteResource)
-                else e
+                else {key: e[key] for key in keys if key in e}
                 for e in entities
             ]
+        return [
+            {k: v for k, v in e.dump(camel_case=True).items() if isinstance(v, str) or k == "id"}
+            if isinstance(e, CogniteResource)
+            else e
+            for e in entities
+        ]
+
+    def _projected_fields(self, side: str, project_fields: bool) -> Optional[List[str]]:
+        return self._match_field_names(self.match_fields, side) if project_fields else None
+
+    @staticmethod
+    def _match_field_names(match_fields: Optional[List[Union[Dict, Tuple[str, str]]]], side: str) -> List[str]:
+        """Names of the fields used in matching on the 'from' or 'to' side, defaulting to 'name' as the API does."""
+        if not match_fields:
+            return ["name"]
+        return [mf[side] if isinstance(mf, dict) else mf[["from", "to"].index(side)] for mf in match_fields]
+
+
+class EntityMatchingBlocker:
+    """Client-side blocking for entity matching. Entities to match to are indexed on the tokens (or character n-grams of tokens)
+    of their match fields, and only entities sharing enough of these with an entity to match from are considered candidates for it.
+
+    Args:
+        ngram (int): Index character n-grams of this length within each token instead of whole tokens. Increases recall for names which are formatted differently.
+        min_overlap (int): Minimum number of shared tokens or n-grams for a candidate.
+        max_candidates (int): Maximum number of candidates per entity to match from, keeping those with the largest overlap. Defaults to no limit.
+        max_key_frequency (float): Ignore tokens or n-grams shared by more than this fraction of the entities to match to, such as common suffixes. Defaults to no limit.
+
+    Attributes:
+        stats (Dict[str, float]): Statistics of the last pruning or blocking, including the 'pruning_ratio'.
+    """
+
+    _TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+    def __init__(
+        self, ngram: int = None, min_overlap: int = 1, max_candidates: int = None, max_key_frequency: float = None
+    ):
+        self.ngram = ngram
+        self.min_overlap = min_overlap
+        self.max_candidates = max_candidates
+        self.max_key_frequency = max_key_frequency
+        self.stats = None
+
+    def _keys(self, entity: Dict, fields: List[str]) -> Set[str]:
+        tokens = self._TOKEN_PATTERN.findall(" ".join(str(entity.get(field) or "") for field in fields).upper())
+        if not self.ngram:
+            return set(tokens)
+        return {token[i : i + self.ngram] for token in tokens for i in range(max(len(token) - self.ngram + 1, 1))}
+
+    def candidates(
+        self, match_from: List[Dict], match_to: List[Dict], from_fields: List[str], to_fields: List[str]
+    ) -> List[List[int]]:
+        """Finds the candidates in match_to for each entity in match_from.
+
+        Args:
+            match_from (List[Dict]): dumped entities to match from.
+            match_to (List[Dict]): dumped entities to match to.
+            from_fields (List[str]): fields of the entities to match from to block on.
+            to_fields (List[str]): fields of the entities to match to to block on.
+
+        Returns:
+            List[List[int]]: sorted indices into match_to of the candidates for each entity in match_from."""
+        index = defaultdict(list)
+        for j, entity in enumerate(match_to):
+            for key in self._keys(entity, to_fields):
+                index[key].append(j)
+        if self.max_key_frequency is not None:
+            max_count = self.max_key_frequency * len(match_to)
+            index = {key: indices for key, indices in index.items() if len(indices) <= max_count}
+
+        candidates = []
+        for entity in match_from:
+            overlap = Counter(j for key in self._keys(entity, from_fields) for j in index.get(key, []))
+            candidates.append(
+                sorted(j for j, count in overlap.most_common(self.max_candidates) if count >= self.min_overlap)
+            )
+        return candidates
+
+    def prune(
+        self,
+        match_from: List[Dict],
+        match_to: List[Dict],
+        from_fields: List[str],
+        to_fields: List[str],
+        keep: Iterable[int] = (),
+    ) -> List[Dict]:
+        """Removes the entities in match_to which are not a candidate for any entity in match_from.
+
+        Args:
+            match_from (List[Dict]): dumped entities to match from.
+            match_to (List[Dict]): dumped entities to match to.
+            from_fields (List[str]): fields of the entities to match from to block on.
+            to_fields (List[str]): fields of the entities to match to to block on.
+            keep (Iterable[int]): indices into match_to to keep regardless, e.g. entities in true matches.
+
+        Returns:
+            List[Dict]: the remaining entities to match to."""
+        remaining = set(keep)
+        for candidates in self.candidates(match_from, match_to, from_fields, to_fields):
+            remaining.update(candidates)
+        self.stats = {
+            "entities_before": len(match_to),
+            "entities_after": len(remaining),
+            "pruning_ratio": 1 - len(remaining) / len(match_to) if match_to else 0.0,
+        }
+        return [entity for j, entity in enumerate(match_to) if j in remaining]
+
+    def blocks(
+        self,
+        match_from: List[Dict],
+        match_to: List[Dict],
+        from_fields: List[str],
+        to_fields: List[str],
+        block_size: int = 1000,
+    ) -> List[Tuple[List[int], List[int]]]:
+        """Splits match_from into blocks with the union of their candidates in match_to. Entities with similar candidates are
+        grouped together to keep blocks small, and entities without candidates are left out.
+
+        Args:
+            match_from (List[Dict]): dumped entities to match from.
+            match_to (List[Dict]): dumped entities to match to.
+            from_fields (List[str]): fields of the entities to match from to block on.
+            to_fields (List[str]): fields of the entities to match to to block on.
+            block_size (int): maximum number of entities to match from in each block.
+
+        Returns:
+            List[Tuple[List[int], List[int]]]: indices into match_from and match_to for each block."""
+        candidates = self.candidates(match_from, match_to, from_fields, to_fields)
+        order = sorted((i for i in range(len(match_from)) if candidates[i]), key=lambda i: candidates[i])
+        blocks = []
+        for start in range(0, len(order), block_size):
+            from_block = order[start : start + block_size]
+            blocks.append((from_block, sorted({j for i in from_block for j in candidates[i]})))
+        pairs_before = len(match_from) * len(match_to)
+        pairs_after = sum(len(from_block) * len(to_block) for from_block, to_block in blocks)
+        self.stats = {
+            "blocks": len(blocks),
+            "pairs_before": pairs_before,
+            "pairs_after": pairs_after,
+            "pruning_ratio": 1 - pairs_after / pairs_before if pairs_before else 0.0,
+        }
+        return blocks
+
+
+class EntityMatchingMatches:
+    """Columnar representation of entity matching predict results, with one row per match. Requires numpy.
+
+    Args:
+        from_index (numpy.ndarray): Index of the entity matched from in the result items.
+        from_id (numpy.ndarray): Id of the entity matched from, or None.
+        from_external_id (numpy.ndarray): External id of the entity matched from, or None.
+        to_index (numpy.ndarray): Index of the entity matched to among the distinct entities matched to.
+        to_id (numpy.ndarray): Id of the entity matched to, or None.
+        to_external_id (numpy.ndarray): External id of the entity matched to, or None.
+        score (numpy.ndarray): Score of the match.
+        rank (numpy.ndarray): Rank of the match among the matches of the same entity matched from, 0 being the best.
+    """
+
+    _COLUMNS = ["from_index", "from_id", "from_external_id", "to_index", "to_id", "to_external_id", "score", "rank"]
+
+    def __init__(self, from_index, from_id, from_external_id, to_index, to_id, to_external_id, score, rank):
+        self.from_index = from_index
+        self.from_id = from_id
+        self.from_external_id = from_external_id
+        self.to_index = to_index
+        self.to_id = to_id
+        self.to_external_id = to_external_id
+        self.score = score
+        self.rank = rank
+
+    @classmethod
+    def _load(cls, items: List[Dict]) -> "EntityMatchingMatches":
+        np = utils._auxiliary.local_import("numpy")
+        columns = {column: [] for column in cls._COLUMNS if column != "rank"}
+        to_indices = {}
+        for i, item in enumerate(items):
+            match_from = item["matchFrom"]
+            for match in item.get("matches") or []:
+                match_to = match.get("matchTo") or {}
+                to_key = (match_to.get("id"), match_to.get("externalId"))
+                columns["from_index"].append(i)
+                columns["from_id"].append(match_from.get("id"))
+                columns["from_external_id"].append(match_from.get("externalId"))
+                columns["to_index"].append(to_indices.setdefault(to_key, len(to_indices)))
+                columns["to_id"].append(to_key[0])
+                columns["to_external_id"].append(to_key[1])
+                columns["score"].append(match.get("score", math.nan))
+        columns = {
+            column: np.array(values, dtype=int if column.endswith("index") else float if column == "score" else object)
+            for column, values in columns.items()
+        }
+        order = np.lexsort((-columns["score"], columns["from_index"]))
+        group_starts = np.r_[0, np.flatnonzero(np.diff(columns["from_index"][order])) + 1]
+        rank = np.empty(len(order), dtype=int)
+        rank[order] = np.arange(len(order)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(order)]))
+        return cls(rank=rank, **columns)
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def _select(self, mask) -> "EntityMatchingMatches":
+        return EntityMatchingMatches(**{column: getattr(self, column)[mask] for column in self._COLUMNS})
+
+    def top_k(self, k: int) -> "EntityMatchingMatches":
+        """Keeps the k best matches for each entity matched from."""
+        return self._select(self.rank < k)
+
+    def threshold(self, score: float) -> "EntityMatchingMatches":
+        """Keeps the matches with a score of at least `score`."""
+        return self._select(self.score >= score)
+
+    def one_to_one(self, method: str = "greedy") -> "EntityMatchingMatches":
+        """Keeps at most one match for each entity matched from and each entity matched to.
+
+        Args:
+            method (str): 'greedy' repeatedly takes the best remaining match. 'hungarian' maximizes the total score, and requires scipy.
+                It solves an assignment problem for each group of entities connected by matches, so memory grows with the
+                square of the number of entities in the largest group rather than of all entities.
+
+        Returns:
+            EntityMatchingMatches: the selected matches."""
+        np = utils._auxiliary.local_import("numpy")
+        if method == "greedy":
+            keep = np.zeros(len(self), dtype=bool)
+            used_from, used_to = set(), set()
+            for i in np.argsort(-self.score, kind="stable"):
+                if self.from_index[i] not in used_from and self.to_index[i] not in used_to:
+                    keep[i] = True
+                    used_from.add(self.from_index[i])
+                    used_to.add(self.to_index[i])
+            return self._select(keep)
+        elif method == "hungarian":
+            optimize, sparse, csgraph = utils._auxiliary.local_import(
+                "scipy.optimize", "scipy.sparse", "scipy.sparse.csgraph"
+            )
+            keep = np.zeros(len(self), dtype=bool)
+            if not len(self):
+                return self._select(keep)
+            _, rows = np.unique(self.from_index, return_inverse=True)
+            _, cols = np.unique(self.to_index, return_inverse=True)
+            n_rows, n_cols = rows.max() + 1, cols.max() + 1
+            graph = sparse.coo_matrix(
+                (np.ones(len(self)), (rows, cols + n_rows)), shape=(n_rows + n_cols, n_rows + n_cols)
+            )
+            _, components = csgraph.connected_components(graph, directed=False)
+            by_component = np.argsort(components[rows], kind="stable")
+            boundaries = np.flatnonzero(np.diff(components[rows][by_component])) + 1
+            for group in np.split(by_component, boundaries):
+                if len(group) == 1:
+                    keep[group] = True
+                    continue
+                _, group_rows = np.unique(rows[group], return_inverse=True)
+                _, group_cols = np.unique(cols[group], return_inverse=True)
+                scores = np.zeros((group_rows.max() + 1, group_cols.max() + 1))
+                match_indices = np.full(scores.shape, -1)
+                by_score = np.argsort(self.score[group], kind="stable")
+                scores[group_rows[by_score], group_cols[by_score]] = self.score[group][by_score]
+                match_indices[group_rows[by_score], group_cols[by_score]] = group[by_score]
+                assigned = match_indices[optimize.linear_sum_assignment(scores, maximize=True)]
+                keep[assigned[assigned >= 0]] = True
+            return self._select(keep)
+        raise ValueError("Unknown method '{}', should be 'greedy' or 'hungarian'".format(method))
+
+    def to_relationships(
+        self, source_type: str, target_type: str, external_id_prefix: str = "match:", data_set_id: int = None
+    ):
+        """Converts the matches to relationships from the entity matched from to the entity matched to, with the score as confidence.
+        External ids are derived from the external ids of the source and target, so creating them again is detected as a duplicate.
+
+        Args:
+            source_type (str): Resource type of the entities matched from, e.g. 'timeSeries'.
+            target_type (str): Resource type of the entities matched to, e.g. 'asset'.
+            external_id_prefix (str): Prefix of the relationship external ids.
+            data_set_id (int): Data set of the relationships.
+
+        Returns:
+            RelationshipList: one relationship per match."""
+        from cognite.client.data_classes import Relationship, RelationshipList
+
+        if any(ext_id is None for ext_id in self.from_external_id) or any(
+            ext_id is None for ext_id in self.to_external_id
+        ):
+            raise ValueError("Relationships require an external id for all entities matched from and to")
+        return RelationshipList(
+            [
+                Relationship(
+                    external_id=f"{external_id_prefix}{source}:{target}",
+                    source_external_id=source,
+                    source_type=source_type,
+                    target_external_id=target,
+                    target_type=target_type,
+                    confidence=float(score),
+                    data_set_id=data_set_id,
+                )
+                for source, target, score in zip(self.from_external_id, self.to_external_id, self.score)
+            ]
+        )
+
+    def dump(self) -> Dict[str, List]:
+        """Dumps the matches to a dictionary of columns."""
+        return {column: getattr(self, column).tolist() for column in self._COLUMNS}
+
+    def to_pandas(self):
+        """Returns the matches as a pandas DataFrame with one column per attribute."""
+        pd = utils._auxiliary.local_import("pandas")
+        return pd.DataFrame({column: getattr(self, column) for column in self._COLUMNS})
+
+
+class EntityMatchingTrueMatchStore:
+    """Local store of true matches for incrementally refitting an entity matching model. True matches are deduplicated on the
+    entity matched from, with the latest label replacing earlier ones in the store, and each refit only submits the true matches
+    which changed since the last one. Refits run in the background, with at most one outstanding refit at a time.
+
+    A refit adds the submitted true matches to those the model was already fitted with, so a label which replaces one that was
+    already submitted is added next to it on the server rather than replacing it. To drop replaced labels, fit a new model with
+    `true_matches` from the store. `add` reports such replacements as 'conflicts'.
+
+    Args:
+        model (EntityMatchingModel): The model to refit. Replaced by each refitted model.
+        true_matches: True matches the model was already fitted with.
+    """
+
+    def __init__(
+        self,
+        model: EntityMatchingModel,
+        true_matches: List[Union[Dict, Tuple[Union[int, str], Union[int, str]]]] = None,
+    ):
+        self.model = model
+        self._labels = {}
+        self._submitted = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._refitting = False
+        self._future = None
+        self.add(true_matches or [])
+        self._submitted = dict(self._labels)
+
+    @staticmethod
+    def _key(true_match: Dict, side: str) -> Tuple[str, Union[int, str]]:
+        if side + "Id" in true_match:
+            return "id", true_match[side + "Id"]
+        return "externalId", true_match[side + "ExternalId"]
+
+    def add(self, true_matches: List[Union[Dict, Tuple[Union[int, str], Union[int, str]]]]) -> Dict[str, int]:
+        """Adds true matches to the store.
+
+        Args:
+            true_matches: Known valid matches given as a list of dicts with keys 'fromId', 'fromExternalId', 'toId', 'toExternalId').
+                 A tuple can be used instead of the dictionary for convenience, interpreted as id/externalId based on type.
+
+        Returns:
+            Dict[str, int]: number of true matches 'added', 'duplicates' which were already known, and 'conflicts' which replaced an earlier label."""
+        counts = {"added": 0, "duplicates": 0, "conflicts": 0}
+        with self._lock:
+            for true_match in true_matches:
+                true_match = convert_true_match(true_match)
+                from_key, to_key = self._key(true_match, "from"), self._key(true_match, "to")
+                known = self._labels.get(from_key)
+                if known is None:
+                    counts["added"] += 1
+                elif self._key(known, "to") == to_key:
+                    counts["duplicates"] += 1
+                    continue
+                else:
+                    counts["conflicts"] += 1
+                self._labels[from_key] = true_match
+        return counts
+
+    @property
+    def true_matches(self) -> List[Dict]:
+        """All true matches in the store."""
+        with self._lock:
+            return list(self._labels.values())
+
+    def delta(self) -> List[Dict]:
+        """True matches which were added or changed since the last refit."""
+        with self._lock:
+            return self._delta()
+
+    def _delta(self) -> List[Dict]:
+        return [tm for key, tm in self._labels.items() if self._submitted.get(key) is not tm]
+
+    def refit(self) -> Future:
+        """Refits the model with the true matches added since the last refit, in the background. If a refit is already running,
+        true matches added in the meantime are submitted in a new refit once it has completed.
+
+        Returns:
+            Future: resolves to the latest refitted model once there are no more true matches to submit."""
+        with self._lock:
+            if not self._refitting:
+                self._refitting = True
+                self._future = self._executor.submit(self._refit_pending)
+            return self._future
+
+    def _refit_pending(self) -> EntityMatchingModel:
+        try:
+            while True:
+                with self._lock:
+                    delta = self._delta()
+                    if not delta:
+                        self._refitting = False
+                        return self.model
+                model = self.model.refit(delta)
+                model.wait_for_completion()
+                with self._lock:
+                    self.model = model
+                    for true_match in delta:
+                        self._submitted[self._key(true_match, "from")] = true_match
+        except Exception:
+            with self._lock:
+                self._refitting = False
+            raise
 
 
 class EntityMatchingModelUpdate(CogniteUpdate):
@@ -287,8 +883,12 @@ class EntityMatchingPipeline(CogniteResource):
 
         self._cognite_client = cognite_client
 
-    def run(self):
-        self._cognite_client.entity_matching.pipelines.run(id=self.id)
+    def run(self) -> ContextualizationJob:
+        """Runs the pipeline.
+
+        Returns:
+            ContextualizationJob: object which can be used to wait for and retrieve results."""
+        return self._cognite_client.entity_matching.pipelines.run(id=self.id)
 
 
 class EntityMatchingPipelineUpdate(CogniteUpdate):  # not implemented yet
@@ -1,7 +1,9 @@
+import math
 import time
 from numbers import Number
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from cognite.client import utils
 from cognite.client.data_classes._base import CogniteResource, CogniteResourceList
 
 
@@ -78,20 +80,27 @@ class Function(CogniteResource):
         schedule_id: Optional[int] = None,
         start_time: Optional[Dict[str, int]] = None,
         end_time: Optional[Dict[str, int]] = None,
+        limit: int = 25,
     ) -> "FunctionCallList":
-        """List all calls to this function.
+        """List calls to this function.
 
         Args:
             status (str, optional): Status of the call. Possible values ["Running", "Failed", "Completed", "Timeout"].
             schedule_id (int, optional): Schedule id from which the call belongs (if any).
             start_time ([Dict[str, int], optional): Start time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
             end_time (Dict[str, int], optional): End time of the call. Possible keys are `min` and `max`, with values given as time stamps in ms.
+            limit (int): Maximum number of calls to return. Defaults to 25. Set to -1, float("inf") or None to return all calls.
 
         Returns:
             FunctionCallList: List of function calls
         """
         return self._cognite_client.functions.calls.list(
-            function_id=self.id, status=status, schedule_id=schedule_id, start_time=start_time, end_time=end_time
+            function_id=self.id,
+            status=status,
+            schedule_id=schedule_id,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
         )
 
     def list_schedules(self) -> "FunctionSchedulesList":
@@ -247,6 +256,138 @@ class FunctionCallList(CogniteResourceList):
     _RESOURCE = FunctionCall
     _ASSERT_CLASSES = False
 
+    def stats(self) -> "FunctionCallStats":
+        """Loads the calls into a FunctionCallStats for latency and error analytics. Requires numpy."""
+        return FunctionCallStats._load(self)
+
+
+class FunctionCallStats:
+    """Columnar representation of function calls, with latency, throughput and error analytics. Requires numpy.
+
+    Times are in milliseconds since epoch, and are NaN where missing, e.g. the end time of running calls.
+
+    Args:
+        id (numpy.ndarray): Id of the call.
+        start_time (numpy.ndarray): Start time of the call.
+        end_time (numpy.ndarray): End time of the call.
+        status (numpy.ndarray): Status of the call.
+        schedule_id (numpy.ndarray): Id of the schedule which made the call, NaN for calls not made by a schedule.
+    """
+
+    _COLUMNS = ["id", "start_time", "end_time", "status", "schedule_id"]
+    _CHUNK_SIZE = 1000
+
+    def __init__(self, id, start_time, end_time, status, schedule_id):
+        self.id = id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.status = status
+        self.schedule_id = schedule_id
+
+    @classmethod
+    def _load(cls, calls: Iterable[Union[FunctionCall, List[FunctionCall]]]) -> "FunctionCallStats":
+        """Loads calls, or chunks of calls, converting them to arrays a chunk at a time."""
+        np = utils._auxiliary.local_import("numpy")
+        chunks, buffer = [], []
+
+        def flush():
+            chunks.append(
+                {
+                    "id": np.array([call.id for call in buffer], dtype=int),
+                    "start_time": np.array([_or_nan(call.start_time) for call in buffer], dtype=float),
+                    "end_time": np.array([_or_nan(call.end_time) for call in buffer], dtype=float),
+                    "status": np.array([call.status for call in buffer], dtype=object),
+                    "schedule_id": np.array([_or_nan(call.schedule_id) for call in buffer], dtype=float),
+                }
+            )
+            buffer.clear()
+
+        for item in calls:
+            buffer.extend(item if isinstance(item, (list, CogniteResourceList)) else [item])
+            if len(buffer) >= cls._CHUNK_SIZE:
+                flush()
+        flush()
+        return cls(**{column: np.concatenate([chunk[column] for chunk in chunks]) for column in cls._COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @property
+    def duration(self):
+        """numpy.ndarray: Duration of each call in milliseconds, NaN for calls which have not finished."""
+        return self.end_time - self.start_time
+
+    def latency_percentiles(self, percentiles: List[float] = (50, 90, 95, 99)) -> Dict[float, float]:
+        """Percentiles of the duration of finished calls, in milliseconds.
+
+        Args:
+            percentiles (List[float]): Percentiles to compute, between 0 and 100.
+
+        Returns:
+            Dict[float, float]: Duration at each percentile, NaN if no call has finished."""
+        np = utils._auxiliary.local_import("numpy")
+        durations = self.duration[~np.isnan(self.duration)]
+        if len(durations) == 0:
+            return {p: math.nan for p in percentiles}
+        return dict(zip(percentiles, np.percentile(durations, percentiles).tolist()))
+
+    def throughput(self, bucket_size: int = 60 * 1000) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+        """Number of calls started per time bucket.
+
+        Args:
+            bucket_size (int): Size of the buckets in milliseconds. Defaults to one minute.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The start time of each bucket, from the first to the last call, and the number of calls started in it."""
+        np = utils._auxiliary.local_import("numpy")
+        start_time = self.start_time[~np.isnan(self.start_time)]
+        if len(start_time) == 0:
+            return np.array([], dtype=float), np.array([], dtype=int)
+        first = start_time.min() // bucket_size * bucket_size
+        counts = np.bincount(((start_time - first) // bucket_size).astype(int))
+        return first + bucket_size * np.arange(len(counts)), counts
+
+    def error_rates(self) -> Dict[Optional[int], Dict[str, float]]:
+        """Failure and timeout rates per schedule.
+
+        Returns:
+            Dict[Optional[int], Dict[str, float]]: For each schedule id (None for calls not made by a schedule), the number of finished 'calls', and the 'failure_rate' and 'timeout_rate' among them."""
+        np = utils._auxiliary.local_import("numpy")
+        finished = self.status != "Running"
+        schedule_ids = np.where(np.isnan(self.schedule_id), -1, self.schedule_id).astype(int)
+        rates = {}
+        for schedule_id in np.unique(schedule_ids[finished]):
+            status = self.status[finished & (schedule_ids == schedule_id)]
+            rates[None if schedule_id == -1 else int(schedule_id)] = {
+                "calls": len(status),
+                "failure_rate": float(np.mean(status == "Failed")),
+                "timeout_rate": float(np.mean(status == "Timeout")),
+            }
+        return rates
+
+    def cold_starts(self, idle_time: int = 15 * 60 * 1000) -> "numpy.ndarray":
+        """Detects calls which likely had a cold start, for calls to a single function.
+
+        A call is counted as a cold start if no other call of the function was running during the `idle_time`
+        milliseconds before it started, as the function is then likely to have been scaled down.
+
+        Args:
+            idle_time (int): Milliseconds without calls after which the next call is counted as a cold start. Defaults to 15 minutes.
+
+        Returns:
+            numpy.ndarray: Boolean mask of cold starts, aligned with the calls."""
+        np = utils._auxiliary.local_import("numpy")
+        order = np.argsort(self.start_time, kind="stable")
+        start_time = self.start_time[order]
+        busy_until = np.maximum.accumulate(np.where(np.isnan(self.end_time[order]), np.inf, self.end_time[order]))
+        cold = np.empty(len(order), dtype=bool)
+        cold[order] = np.r_[True, start_time[1:] - busy_until[:-1] > idle_time] if len(order) else []
+        return cold
+
+
+def _or_nan(value: Optional[Number]) -> float:
+    return math.nan if value is None else value
+
 
 class FunctionCallLogEntry(CogniteResource):
     """A log entry for a function call.
@@ -0,0 +1,329 @@
+import importlib
+import inspect
+import io
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from numbers import Number
+from typing import Any, Dict, Iterable, Optional
+
+from cognite.experimental._api.functions import (
+    HANDLER_FILE_NAME,
+    convert_file_path_to_module_path,
+    validate_function_folder,
+)
+from cognite.experimental.data_classes import FunctionCall, FunctionCallList, FunctionCallLog
+
+
+class LocalFunctionRunner:
+    """Runs the code of a Cognite Function locally, for testing and profiling handlers before deploying them.
+
+    The `handle` function is loaded from `function_path` in `folder` in the same way as in `FunctionsAPI.create`, and is
+    called with the arguments among `data`, `client` and `secrets` that it accepts. Calls run in a pool of freshly
+    started worker processes, each limited to `memory` GB of address space and to `cpu` cores (rounded up, as fractional cores cannot
+    be enforced without cgroups). Limits are only applied where the platform supports them. Output to stdout and stderr
+    is captured as the log of the call, and the response must be JSON serializable, as in a deployed function.
+
+    If a worker process exits during a call, e.g. because it was killed or crashed, the call fails, and if it does not
+    finish within `timeout` seconds, the worker is killed and the call gets status 'Timeout'. The worker is then
+    replaced by a new one. A RuntimeError is raised if a worker process cannot be started, e.g. if the limits cannot
+    be applied.
+
+    The first call in each worker process imports the handler module and is counted as a cold start, see `latency`.
+
+    Args:
+        folder (str): Path to the folder where the function source code is located.
+        function_path (str): Relative path from the root folder to the file containing the `handle` function. Defaults to `handler.py`.
+        api_key (str, optional): API key used to instantiate the CogniteClient passed through the `client` argument, and passed as `secrets["apikey"]`. The remaining client configuration is read from the environment.
+        secrets (Dict[str, str], optional): Secrets passed through the `secrets` argument.
+        cpu (Number): Number of CPU cores per worker. Defaults to 0.25.
+        memory (Number): Memory per worker measured in GB. Defaults to 1.
+        workers (int): Number of worker processes. Defaults to 1.
+        timeout (float, optional): Maximum number of seconds per call. Defaults to no limit.
+
+    Examples:
+
+        Call a handler locally and inspect the response and logs::
+
+            >>> from cognite.experimental.function_runtime import LocalFunctionRunner
+            >>> with LocalFunctionRunner("path/to/code", workers=4) as runner:
+            ...     call = runner.call(data={"x": 1})
+            ...     response = runner.get_response(call.id)
+            ...     logs = runner.get_logs(call.id)
+            ...     calls = runner.call_many([{"x": x} for x in range(100)])
+            ...     latency = runner.latency()
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        function_path: str = HANDLER_FILE_NAME,
+        api_key: Optional[str] = None,
+        secrets: Optional[Dict[str, str]] = None,
+        cpu: Number = 0.25,
+        memory: Number = 1.0,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+    ):
+        validate_function_folder(folder, function_path)
+        secrets = dict(secrets or {})
+        if api_key:
+            secrets["apikey"] = api_key
+        self._worker_args = (os.path.abspath(folder), function_path, api_key, secrets, cpu, memory)
+        self._timeout = timeout
+        self._workers = workers
+        self._idle = queue.Queue()
+        try:
+            for _ in range(workers):
+                self._idle.put(_LocalFunctionWorker(self._worker_args))
+        except BaseException:
+            self.close()
+            raise
+        self._calls = {}
+        self._next_id = 1
+
+    def call(self, data: Any = None) -> FunctionCall:
+        """Calls the function and waits for it to finish.
+
+        Args:
+            data (Any, optional): Input data to the function (JSON serializable), passed through the `data` argument.
+
+        Returns:
+            FunctionCall: The finished call, with status 'Completed', 'Failed' or 'Timeout'.
+        """
+        return self.call_many([data])[0]
+
+    def call_many(self, inputs: Iterable[Any]) -> FunctionCallList:
+        """Calls the function once for each input, concurrently in the worker processes, and waits for all calls to finish.
+
+        Args:
+            inputs (Iterable[Any]): Input data for each call.
+
+        Returns:
+            FunctionCallList: The finished calls, in the same order as the inputs.
+        """
+        inputs = [json.loads(json.dumps(data)) for data in inputs]
+        with ThreadPoolExecutor(self._workers) as p:
+            results = list(p.map(self._run, inputs))
+        calls = []
+        for result in results:
+            call = FunctionCall(
+                id=self._next_id,
+                start_time=result["start_time"],
+                end_time=result["end_time"],
+                status=result["status"],
+                error=result["error"],
+            )
+            self._calls[call.id] = result
+            self._next_id += 1
+            calls.append(call)
+        return FunctionCallList(calls)
+
+    def get_response(self, call_id: int) -> Any:
+        """Returns the response of a call, or None if the call failed."""
+        return self._calls[call_id]["response"]
+
+    def get_logs(self, call_id: int) -> FunctionCallLog:
+        """Returns the lines written to stdout and stderr during a call."""
+        return FunctionCallLog._load(self._calls[call_id]["logs"])
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        """Latency statistics of the calls made so far, separately for cold starts and warm calls.
+
+        Returns:
+            Dict[str, Dict[str, float]]: For 'cold' and 'warm' calls, the number of 'calls' and the 'mean' and 'max' duration in seconds. Cold starts include importing the handler module.
+        """
+        stats = {}
+        for kind, cold in [("cold", True), ("warm", False)]:
+            durations = [result["duration"] for result in self._calls.values() if result["cold"] == cold]
+            stats[kind] = {
+                "calls": len(durations),
+                "mean": sum(durations) / len(durations) if durations else 0.0,
+                "max": max(durations, default=0.0),
+            }
+        return stats
+
+    def close(self) -> None:
+        """Shuts down the worker processes."""
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+
+    def _run(self, data: Any) -> Dict[str, Any]:
+        worker = self._idle.get()
+        start = time.time()
+        try:
+            worker.conn.send(("call", data))
+            return worker.receive(self._timeout)
+        except (EOFError, OSError, TimeoutError) as e:
+            timed_out = isinstance(e, TimeoutError)
+            worker.kill()
+            if timed_out:
+                message = f"Call did not finish within {self._timeout} seconds"
+            else:
+                message = f"Worker process exited with code {worker.process.exitcode}"
+            worker = _LocalFunctionWorker(self._worker_args)
+            end = time.time()
+            return {
+                "status": "Timeout" if timed_out else "Failed",
+                "response": None,
+                "error": {"message": message, "trace": ""},
+                "logs": [],
+                "start_time": int(start * 1000),
+                "end_time": int(end * 1000),
+                "duration": end - start,
+                "cold": False,
+            }
+        finally:
+            self._idle.put(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _LogCapture(io.TextIOBase):
+    def __init__(self):
+        self.entries = []
+        self._line = ""
+
+    def write(self, text: str) -> int:
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        self.entries.extend({"timestamp": int(time.time() * 1000), "message": line} for line in lines)
+        return len(text)
+
+    def close(self):
+        if self._line:
+            self.write("\n")
+        super().close()
+
+
+class _LocalFunctionWorker:
+    """A worker process of a LocalFunctionRunner, which runs calls sent over a pipe one at a time."""
+
+    def __init__(self, args):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_local_function_worker, args=(child_conn, *args), daemon=True)
+        self.process.start()
+        child_conn.close()
+        try:
+            error = self.receive()
+        except EOFError:
+            error = {"message": f"Worker process exited with code {self.process.exitcode}", "trace": ""}
+        if error is not None:
+            self.kill()
+            raise RuntimeError(f"Could not start a worker process: {error['message']}\n{error['trace']}".strip())
+
+    def receive(self, timeout: Optional[float] = None) -> Any:
+        """Waits for the next message from the worker, raising EOFError if it exits, or TimeoutError."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.conn.poll(0.05):
+            if not self.process.is_alive() and not self.conn.poll():
+                self.process.join()
+                raise EOFError
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self) -> None:
+        """Asks the worker to exit, and kills it if it does not."""
+        if self.process.is_alive():
+            try:
+                self.conn.send(("stop", None))
+            except OSError:
+                pass
+            self.process.join(1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+_local_function = {}  # State of a LocalFunctionRunner worker process
+
+
+def _local_function_worker(conn, folder, function_path, api_key, secrets, cpu, memory):
+    try:
+        _init_local_function_worker(folder, function_path, api_key, secrets, cpu, memory)
+    except BaseException as e:
+        conn.send({"message": f"{type(e).__name__}: {e}", "trace": traceback.format_exc()})
+        return
+    conn.send(None)
+    while True:
+        try:
+            command, data = conn.recv()
+        except EOFError:
+            return
+        if command == "stop":
+            return
+        conn.send(_run_local_function_call(data))
+
+
+def _init_local_function_worker(folder, function_path, api_key, secrets, cpu, memory):
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        resource = None
+    if resource is not None:
+        limit = int(memory * 1024 ** 3)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    if hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, cores[: max(1, math.ceil(cpu))])
+    _local_function.update(
+        folder=folder, function_path=function_path, api_key=api_key, secrets=secrets, handle=None, client=None
+    )
+
+
+def _run_local_function_call(data):
+    start = time.time()
+    cold = _local_function["handle"] is None
+    logs = _LogCapture()
+    response, error = None, None
+    try:
+        with redirect_stdout(logs), redirect_stderr(logs):
+            if cold:
+                sys.path.insert(0, _local_function["folder"])
+                module = importlib.import_module(convert_file_path_to_module_path(_local_function["function_path"]))
+                _local_function["handle"] = module.handle
+            handle = _local_function["handle"]
+            arguments = {"data": data, "secrets": _local_function["secrets"]}
+            if "client" in inspect.signature(handle).parameters:
+                if _local_function["client"] is None:
+                    from cognite.experimental import CogniteClient
+
+                    _local_function["client"] = CogniteClient(api_key=_local_function["api_key"])
+                arguments["client"] = _local_function["client"]
+            response = handle(
+                **{name: value for name, value in arguments.items() if name in inspect.signature(handle).parameters}
+            )
+            response = json.loads(json.dumps(response))
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:
+        error = {"message": f"{type(e).__name__}: {e}", "trace": traceback.format_exc()}
+    logs.close()
+    end = time.time()
+    return {
+        "status": "Failed" if error else "Completed",
+        "response": response,
+        "error": error,
+        "logs": logs.entries,
+        "start_time": int(start * 1000),
+        "end_time": int(end * 1000),
+        "duration": end - start,
+        "cold": cold,
+    }
@@ -1,4 +1,13 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
 from functools import wraps
+from typing import Any, Dict, Optional
+
+from cognite.client.utils._auxiliary import json_dump_default
+from cognite.experimental.data_classes import ContextualizationJob
 
 
 def use_v1_instead_of_playground(f):
@@ -11,3 +20,89 @@ def use_v1_instead_of_playground(f):
         return result
 
     return wrapper
+
+
+class ContextualizationJobCache:
+    """Local, persistent cache of completed contextualization jobs, stored in a SQLite database.
+
+    Jobs are keyed by a fingerprint of the endpoint, the file (id and last updated time) and all other arguments of the job,
+    so changing a file or the entity list results in a new job. The least recently used jobs are evicted when the total size of
+    the stored results exceeds `max_size`.
+
+    Args:
+        path (str): Path to the SQLite database file, created if it does not exist.
+        max_size (int): Maximum total size in bytes of the stored results. Defaults to 256MB.
+
+    Examples:
+
+        Cache P&ID detect results between runs::
+
+            >>> from cognite.experimental import CogniteClient
+            >>> from cognite.experimental.utils import ContextualizationJobCache
+            >>> c = CogniteClient()
+            >>> c.pnid_parsing.job_cache = ContextualizationJobCache("jobs.sqlite")
+            >>> job = c.pnid_parsing.detect(file_id=123, entities=["21-PT-1019"])
+    """
+
+    def __init__(self, path: str, max_size: int = 256 * 1024 ** 2):
+        self.path = path
+        self.max_size = max_size
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (key TEXT PRIMARY KEY, data TEXT, size INTEGER, last_access REAL)"
+            )
+
+    @staticmethod
+    def fingerprint(endpoint: str, file_id: int, file_last_updated_time: int, arguments: Dict[str, Any]) -> str:
+        """Computes the cache key of a job.
+
+        Args:
+            endpoint (str): Resource path of the job endpoint, e.g. '/context/pnid/detect'.
+            file_id (int): ID of the file the job runs on.
+            file_last_updated_time (int): Last updated time of the file.
+            arguments (Dict[str, Any]): Remaining arguments of the job, such as entities and options.
+
+        Returns:
+            str: The cache key."""
+        arguments_hash = hashlib.sha256(
+            json.dumps(arguments, sort_keys=True, default=json_dump_default).encode()
+        ).hexdigest()
+        return hashlib.sha256(
+            json.dumps([endpoint, file_id, file_last_updated_time, arguments_hash]).encode()
+        ).hexdigest()
+
+    def get(self, key: str, status_path: str = None, cognite_client=None) -> Optional[ContextualizationJob]:
+        """Returns the cached completed job for a key, or None if there is no such job."""
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            row = conn.execute("SELECT data FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET last_access = ? WHERE key = ?", (time.time(), key))
+        data = json.loads(row[0])
+        job = ContextualizationJob._load_with_status(
+            data["job"], status_path=status_path, cognite_client=cognite_client
+        )
+        job._result = data["result"]
+        return job
+
+    def put(self, key: str, job: ContextualizationJob) -> None:
+        """Stores a completed job, evicting the least recently used jobs if the cache grows too large."""
+        common_fields = {k: v for k, v in job.dump(camel_case=True).items() if k in job._COMMON_FIELDS}
+        data = json.dumps({"job": common_fields, "result": job._result}, default=json_dump_default)
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (key, data, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM jobs").fetchone()[0]
+            if total_size > self.max_size:
+                for evict_key, size in conn.execute("SELECT key, size FROM jobs ORDER BY last_access").fetchall():
+                    if total_size <= self.max_size:
+                        break
+                    conn.execute("DELETE FROM jobs WHERE key = ?", (evict_key,))
+                    total_size -= size
+
+    def clear(self) -> None:
+        """Removes all jobs from the cache."""
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute("DELETE FROM jobs")
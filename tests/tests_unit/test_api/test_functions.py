@@ -1,11 +1,18 @@
+import io
+import itertools
 import json
 import os
+import re
+import sys
+import threading
+import zipfile
 from unittest.mock import Mock, patch
 
 import pytest
 
 from cognite.experimental import CogniteClient
-from cognite.experimental._api.functions import validate_function_folder
+from cognite.experimental._api import functions as functions_module
+from cognite.experimental._api.functions import FunctionCallError, _hash_folder, _zip_folder, validate_function_folder
 from cognite.experimental.data_classes import (
     Function,
     FunctionCall,
@@ -73,6 +80,11 @@ CALL_TIMEOUT = {
 }
 
 
+@pytest.fixture(autouse=True)
+def clear_function_id_cache():
+    FUNCTIONS_API._id_cache.clear()
+
+
 @pytest.fixture
 def mock_functions_list_response(rsps):
     response_body = {"items": [EXAMPLE_FUNCTION]}
@@ -109,15 +121,142 @@ def mock_functions_create_response(rsps):
     files_url = FILES_API._get_base_url_with_base_path() + "/files"
     files_byids_url = FILES_API._get_base_url_with_base_path() + "/files/byids"
 
+    def files_byids_callback(request):
+        items = jsgz_load(request.body)["items"]
+        if "externalId" in items[0]:
+            return 400, {}, json.dumps({"error": {"code": 400, "message": "Files not found", "missing": items}})
+        return 201, {}, json.dumps({"items": [files_response_body]})
+
     rsps.add(rsps.POST, files_url, status=201, json=files_response_body)
     rsps.add(rsps.PUT, "https://upload.here", status=201)
-    rsps.add(rsps.POST, files_byids_url, status=201, json={"items": [files_response_body]})
+    rsps.add_callback(rsps.POST, files_byids_url, files_byids_callback)
+    functions_url = FUNCTIONS_API._get_base_url_with_base_path() + "/functions"
+    rsps.add(rsps.POST, functions_url, status=201, json={"items": [EXAMPLE_FUNCTION]})
+
+    yield rsps
+
+
+@pytest.fixture
+def mock_functions_create_with_uploaded_code_response(rsps):
+    files_response_body = {
+        "name": "myfunction.zip",
+        "id": 4321,
+        "externalId": "function-code-abc",
+        "uploaded": True,
+        "createdTime": 1585662507939,
+        "lastUpdatedTime": 1585662507939,
+    }
+    files_byids_url = FILES_API._get_base_url_with_base_path() + "/files/byids"
+    rsps.add(rsps.POST, files_byids_url, status=200, json={"items": [files_response_body]})
     functions_url = FUNCTIONS_API._get_base_url_with_base_path() + "/functions"
     rsps.add(rsps.POST, functions_url, status=201, json={"items": [EXAMPLE_FUNCTION]})
 
     yield rsps
 
 
+@pytest.fixture
+def mock_functions_deploy_many_response(mock_functions_create_response):
+    rsps = mock_functions_create_response
+    functions_url = FUNCTIONS_API._get_base_url_with_base_path() + "/functions"
+    rsps.remove(rsps.POST, functions_url)
+    statuses = {"f1": ["Deploying", "Ready"], "f2": ["Queued", "Deploying", "Failed"]}
+
+    def functions_callback(request):
+        item = jsgz_load(request.body)["items"][0]
+        return 201, {}, json.dumps({"items": [{"id": int(item["name"][1:]), "name": item["name"], "status": "Queued"}]})
+
+    def functions_byids_callback(request):
+        items = []
+        for item in jsgz_load(request.body)["items"]:
+            name = f"f{item['id']}"
+            status = statuses[name].pop(0)
+            items.append({"id": item["id"], "name": name, "status": status})
+            if status == "Failed":
+                items[-1]["error"] = {"message": "build failed", "trace": ""}
+        return 200, {}, json.dumps({"items": items})
+
+    rsps.add_callback(rsps.POST, functions_url, functions_callback)
+    rsps.add_callback(rsps.POST, functions_url + "/byids", functions_byids_callback)
+
+    yield rsps
+
+
+@pytest.fixture
+def mock_function_calls_refresh_responses(rsps):
+    rsps.assert_all_requests_are_fired = False
+    base_url = FUNCTIONS_API._get_base_url_with_base_path()
+    rounds = [
+        [{"id": 1, "status": "Completed", "startTime": 100}, {"id": 2, "status": "Running", "startTime": 200}],
+        [{"id": 2, "status": "Running", "startTime": 200}],
+        [{"id": 2, "status": "Failed", "startTime": 200, "error": {"message": "oops", "trace": ""}}],
+    ]
+    rsps.add_callback(
+        rsps.POST,
+        base_url + "/functions/10/calls/list",
+        lambda request: (200, {}, json.dumps({"items": rounds.pop(0)})),
+    )
+    rsps.add(rsps.POST, base_url + "/functions/20/calls/list", status=200, json={"items": []})
+    rsps.add(rsps.GET, base_url + "/functions/20/calls/3", status=200, json={"id": 3, "status": "Timeout"})
+
+    yield rsps
+
+
+@pytest.fixture
+def mock_functions_map_responses(rsps):
+    base_url = FUNCTIONS_API._get_base_url_with_base_path() + f"/functions/{FUNCTION_ID}"
+    state = {
+        "inputs": {},
+        "attempts": {},
+        "running": set(),
+        "max_running": 0,
+        "fail": {2: 1},
+        "delay": {},
+        "slow": {},
+        "log": [],
+    }
+    call_ids = itertools.count(100)
+    lock = threading.Lock()
+
+    def call_callback(request):
+        data = jsgz_load(request.body)["data"]
+        with lock:
+            return register_call(data["x"] if isinstance(data, dict) else data)
+
+    def register_call(x):
+        call_id = next(call_ids)
+        state["log"].append(("call", x))
+        state["inputs"][call_id] = x
+        state["attempts"][x] = state["attempts"].get(x, 0) + 1
+        state["running"].add(call_id)
+        state["max_running"] = max(state["max_running"], len(state["running"]))
+        return 201, {}, json.dumps({"id": call_id, "status": "Running", "startTime": 0, "functionId": FUNCTION_ID})
+
+    def list_callback(request):
+        items = []
+        for call_id in sorted(state["running"]):
+            x = state["inputs"][call_id]
+            if state["slow"].get(x, 0) > 0:
+                state["slow"][x] -= 1
+                status = "Running"
+            else:
+                status = "Failed" if state["attempts"][x] <= state["fail"].get(x, 0) else "Completed"
+                state["running"].remove(call_id)
+                state["log"].append(("done", x))
+            items.append({"id": call_id, "status": status, "startTime": 0, "functionId": FUNCTION_ID})
+        return 200, {}, json.dumps({"items": items})
+
+    def response_callback(request):
+        call_id = int(request.url.split("/")[-2])
+        threading.Event().wait(state["delay"].get(state["inputs"][call_id], 0))
+        return 200, {}, json.dumps({"response": state["inputs"][call_id] ** 2})
+
+    rsps.add_callback(rsps.POST, base_url + "/call", call_callback)
+    rsps.add_callback(rsps.POST, base_url + "/calls/list", list_callback)
+    rsps.add_callback(rsps.GET, re.compile(re.escape(base_url) + r"/calls/\d+/response"), response_callback)
+
+    yield state
+
+
 @pytest.fixture
 def mock_file_not_uploaded(rsps):
 
@@ -241,6 +380,57 @@ class TestFunctionsAPI:
             with pytest.raises(exception):
                 validate_function_folder(folder, function_path)
 
+    def test_validate_folder_does_not_import_handler(self, tmp_path):
+        (tmp_path / "handler.py").write_text(
+            "import os\nopen(os.path.join(os.path.dirname(__file__), 'imported'), 'w').close()\n\n"
+            "def handle(data, client):\n    pass\n"
+        )
+        sys_path = list(sys.path)
+
+        validate_function_folder(str(tmp_path), "handler.py")
+
+        assert not (tmp_path / "imported").exists()
+        assert sys_path == sys.path
+
+    @pytest.mark.parametrize(
+        "handler, exception",
+        [
+            ("from impl import handle\n", None),
+            ("from impl import wrong_handle as handle\n", TypeError),
+            ("from impl import handle\nimport no_such_module_here\n", ModuleNotFoundError),
+            (
+                "try:\n    import impl\nexcept ImportError:\n    pass\nelse:\n    def handle(data):\n        pass\n",
+                None,
+            ),
+            ("if True:\n    def handle(x):\n        pass\n", TypeError),
+            ("def wrapper():\n    def handle(data):\n        pass\n", TypeError),
+        ],
+    )
+    def test_validate_folder_in_subprocess(self, tmp_path, handler, exception):
+        (tmp_path / "impl.py").write_text("def handle(data):\n    pass\n\ndef wrong_handle(x):\n    pass\n")
+        (tmp_path / "handler.py").write_text(handler)
+        if exception is None:
+            validate_function_folder(str(tmp_path), "handler.py")
+        else:
+            with pytest.raises(exception):
+                validate_function_folder(str(tmp_path), "handler.py")
+
+    def test_validate_folder_is_cached(self, tmp_path):
+        (tmp_path / "handler.py").write_text("def handle(x):\n    pass\n")
+        with patch(
+            "cognite.experimental._api.functions._validate_function_folder_statically",
+            wraps=functions_module._validate_function_folder_statically,
+        ) as mock_validate:
+            for _ in range(2):
+                with pytest.raises(TypeError):
+                    validate_function_folder(str(tmp_path), "handler.py")
+            assert 1 == mock_validate.call_count
+
+            (tmp_path / "handler.py").write_text("def handle(data):\n    pass\n")
+            validate_function_folder(str(tmp_path), "handler.py")
+            validate_function_folder(str(tmp_path), "handler.py")
+            assert 2 == mock_validate.call_count
+
     @patch("cognite.experimental._api.functions.MAX_RETRIES", 1)
     def test_create_function_with_file_not_uploaded(self, mock_file_not_uploaded):
         with pytest.raises(IOError):
@@ -251,7 +441,78 @@ class TestFunctionsAPI:
         res = FUNCTIONS_API.create(name="myfunction", folder=folder, function_path="handler.py")
 
         assert isinstance(res, Function)
-        assert mock_functions_create_response.calls[3].response.json()["items"][0] == res.dump(camel_case=True)
+        assert mock_functions_create_response.calls[4].response.json()["items"][0] == res.dump(camel_case=True)
+        code_external_id = jsgz_load(mock_functions_create_response.calls[0].request.body)["items"][0]["externalId"]
+        assert code_external_id == "function-code-" + _hash_folder(folder)
+        assert code_external_id == jsgz_load(mock_functions_create_response.calls[1].request.body)["externalId"]
+
+    def test_create_with_path_reuses_uploaded_code(self, mock_functions_create_with_uploaded_code_response):
+        folder = os.path.join(os.path.dirname(__file__), "function_code")
+        FUNCTIONS_API.create(name="myfunction", folder=folder, function_path="handler.py")
+
+        calls = mock_functions_create_with_uploaded_code_response.calls
+        assert all(call.request.method == "POST" and not call.request.url.endswith("/files") for call in calls)
+        assert 4321 == jsgz_load(calls[-1].request.body)["items"][0]["fileId"]
+
+    def test_hash_folder_is_deterministic(self, tmp_path):
+        folder = os.path.join(os.path.dirname(__file__), "function_code")
+        assert _hash_folder(folder) == _hash_folder(folder)
+        (tmp_path / "handler.py").write_text("def handle():\n    pass\n")
+        first = _hash_folder(str(tmp_path))
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "handler.pyc").write_bytes(b"x")
+        assert first == _hash_folder(str(tmp_path))
+        (tmp_path / "handler.py").write_text("def handle():\n    return 1\n")
+        assert first != _hash_folder(str(tmp_path))
+
+    def test_zip_folder_is_deterministic(self, tmp_path):
+        for folder in [tmp_path / "a", tmp_path / "b"]:
+            (folder / "pkg").mkdir(parents=True)
+            (folder / "pkg" / "util.py").write_text("x = 1\n")
+            (folder / "handler.py").write_text("def handle():\n    pass\n")
+            os.utime(folder / "handler.py", (0, 1000000000 + len(str(folder))))
+        cwd = os.getcwd()
+
+        content = _zip_folder(str(tmp_path / "a"))
+
+        assert cwd == os.getcwd()
+        assert content == _zip_folder(str(tmp_path / "b"))
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            assert zf.testzip() is None
+            assert ["handler.py", "pkg/util.py"] == zf.namelist()
+            assert b"x = 1\n" == zf.read("pkg/util.py")
+            assert {(1980, 1, 1, 0, 0, 0)} == {info.date_time for info in zf.infolist()}
+
+    def test_zip_folder_ignores_files(self, tmp_path):
+        for path in [
+            "handler.py",
+            "data/big.csv",
+            "data/keep.txt",
+            "notes.md",
+            ".git/HEAD",
+            "__pycache__/handler.cpython-38.pyc",
+            "env/pyvenv.cfg",
+            "env/lib/site.py",
+            "build/out.py",
+        ]:
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).write_text("x")
+        (tmp_path / ".functionignore").write_text("# comment\n*.md\n/data/*.csv\nbuild/\n")
+
+        with zipfile.ZipFile(io.BytesIO(_zip_folder(str(tmp_path)))) as zf:
+            assert [".functionignore", "data/keep.txt", "handler.py"] == zf.namelist()
+
+    def test_zip_folder_compresses_concurrently(self, tmp_path):
+        for i in range(10):
+            (tmp_path / f"file{i}.bin").write_bytes(os.urandom(2 ** 17) + bytes(2 ** 17))
+
+        with patch("cognite.experimental._api.functions.PARALLEL_COMPRESSION_THRESHOLD", 0):
+            parallel = _zip_folder(str(tmp_path), max_workers=4)
+
+        assert _zip_folder(str(tmp_path), max_workers=1) == parallel
+        with zipfile.ZipFile(io.BytesIO(parallel)) as zf:
+            assert zf.testzip() is None
+            assert 10 == len(zf.namelist())
 
     def test_create_with_file_id(self, mock_functions_create_response):
         res = FUNCTIONS_API.create(name="myfunction", file_id=1234)
@@ -265,6 +526,92 @@ class TestFunctionsAPI:
         assert isinstance(res, Function)
         assert mock_functions_create_response.calls[3].response.json()["items"][0] == res.dump(camel_case=True)
 
+    @pytest.mark.parametrize("ordered", [True, False])
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_map(self, mock_sleep, mock_functions_map_responses, ordered):
+        res = list(FUNCTIONS_API.map(({"x": x} for x in range(5)), id=FUNCTION_ID, concurrency=2, ordered=ordered))
+
+        if ordered:
+            assert [0, 1, 4, 9, 16] == res
+        else:
+            assert [0, 1, 4, 9, 16] == sorted(res)
+        assert 2 == mock_functions_map_responses["max_running"]
+        assert {0: 1, 1: 1, 2: 2, 3: 1, 4: 1} == mock_functions_map_responses["attempts"]
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_map_ordered_waits_for_next_response(self, mock_sleep, mock_functions_map_responses):
+        mock_functions_map_responses["delay"] = {0: 0.5}
+        with patch(
+            "cognite.experimental._api.functions.wait_for_futures", wraps=functions_module.wait_for_futures
+        ) as mock_wait:
+            res = list(FUNCTIONS_API.map([{"x": x} for x in range(2)], id=FUNCTION_ID, concurrency=2))
+
+        assert [0, 1] == res
+        assert mock_wait.call_count < 5
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_map_yields_error_after_retries(self, mock_sleep, mock_functions_map_responses):
+        mock_functions_map_responses["fail"] = {1: 3}
+        res = list(FUNCTIONS_API.map([{"x": x} for x in range(3)], id=FUNCTION_ID, max_retries=2))
+
+        assert 0 == res[0]
+        assert isinstance(res[1], FunctionCallError)
+        assert {"x": 1} == res[1].data
+        assert "Failed" == res[1].call.status
+        assert 4 == res[2]
+        assert 3 == mock_functions_map_responses["attempts"][1]
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_map_falsy_inputs(self, mock_sleep, mock_functions_map_responses):
+        mock_functions_map_responses["fail"] = {}
+        assert [0, 4] == list(FUNCTIONS_API.map([0, 2], id=FUNCTION_ID))
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_map_ordered_bounds_buffered_responses(self, mock_sleep, mock_functions_map_responses):
+        mock_functions_map_responses["slow"] = {0: 5}
+        res = list(FUNCTIONS_API.map([{"x": x} for x in range(4)], id=FUNCTION_ID, concurrency=2))
+
+        assert [0, 1, 4, 9] == res
+        log = mock_functions_map_responses["log"]
+        assert log.index(("call", 2)) > log.index(("done", 0))
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_deploy_many(self, mock_sleep, mock_functions_deploy_many_response, function_handle):
+        reports = FUNCTIONS_API.deploy_many(
+            [
+                {"name": "f1", "function_handle": function_handle},
+                {"name": "f2", "file_id": 1234, "cpu": 0.5},
+                {"name": "f3", "folder": "does/not/exist"},
+            ]
+        )
+
+        assert ["f1", "f2", "f3"] == [report["name"] for report in reports]
+        assert ["Ready", "Failed", "Error"] == [report["status"] for report in reports]
+        assert {"message": "build failed", "trace": ""} == reports[1]["error"]
+        assert "No file found" in reports[2]["error"]
+        assert reports[2]["function"] is None
+        assert [1, 2] == [report["function"].id for report in reports[:2]]
+        assert [1.0, 2.0, 4.0] == [call[0][0] for call in mock_sleep.call_args_list]
+
+        calls = mock_functions_deploy_many_response.calls
+        byids_bodies = [jsgz_load(call.request.body) for call in calls if call.request.url.endswith("/functions/byids")]
+        assert [[1, 2], [1, 2], [2]] == [sorted(item["id"] for item in body["items"]) for body in byids_bodies]
+        created = [
+            jsgz_load(call.request.body)["items"][0] for call in calls if call.request.url.endswith("/functions")
+        ]
+        assert {"f1": 0.25, "f2": 0.5} == {item["name"]: item["cpu"] for item in created}
+
+    def test_deploy_many_invalid_spec_raises(self):
+        with pytest.raises(TypeError):
+            FUNCTIONS_API.deploy_many([{"name": "f1", "file_id": 1, "cpus": 1}])
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_deploy_many_timeout(self, mock_sleep, mock_functions_deploy_many_response):
+        reports = FUNCTIONS_API.deploy_many([{"name": "f2", "file_id": 1234}], timeout=0)
+
+        assert "Queued" == reports[0]["status"]
+        assert not mock_sleep.called
+
     def test_create_with_function_handle_with_illegal_name_raises(self, function_handle_illegal_name):
         with pytest.raises(TypeError):
             FUNCTIONS_API.create(name="myfunction", function_handle=function_handle_illegal_name)
@@ -363,6 +710,42 @@ class TestFunctionsAPI:
         assert isinstance(res, FunctionCall)
         assert mock_functions_call_by_external_id_responses.calls[2].response.json() == res.dump(camel_case=True)
 
+    @pytest.mark.usefixtures("mock_function_call_logs_response")
+    def test_function_external_id_resolved_once(self, mock_functions_retrieve_response):
+        for _ in range(3):
+            FUNCTION_CALLS_API.get_logs(call_id=CALL_ID, function_external_id=f"func-no-{FUNCTION_ID}")
+
+        byids_calls = [call for call in mock_functions_retrieve_response.calls if call.request.url.endswith("/byids")]
+        assert 1 == len(byids_calls)
+
+    @pytest.mark.usefixtures("mock_function_call_logs_response")
+    def test_function_external_id_cache_expires(self, mock_functions_retrieve_response, monkeypatch):
+        monkeypatch.setattr(FUNCTIONS_API, "_id_cache_ttl", 0)
+        for _ in range(2):
+            FUNCTION_CALLS_API.get_logs(call_id=CALL_ID, function_external_id=f"func-no-{FUNCTION_ID}")
+
+        byids_calls = [call for call in mock_functions_retrieve_response.calls if call.request.url.endswith("/byids")]
+        assert 2 == len(byids_calls)
+
+    def test_resolve_function_external_ids_in_bulk(self, rsps):
+        url = FUNCTIONS_API._get_base_url_with_base_path() + "/functions/byids"
+        functions = [{**EXAMPLE_FUNCTION, "id": i, "externalId": f"func-no-{i}"} for i in range(3)]
+        rsps.add(rsps.POST, url, status=200, json={"items": functions})
+        rsps.add(rsps.POST, url, status=200, json={"items": [{**EXAMPLE_FUNCTION, "id": 3, "externalId": "func-no-3"}]})
+
+        assert {"func-no-0": 0, "func-no-1": 1, "func-no-2": 2} == FUNCTIONS_API._resolve_ids(
+            ["func-no-0", "func-no-1", "func-no-2"]
+        )
+        assert {"func-no-1": 1, "func-no-3": 3} == FUNCTIONS_API._resolve_ids(["func-no-1", "func-no-3"])
+        assert [{"externalId": "func-no-3"}] == jsgz_load(rsps.calls[1].request.body)["items"]
+
+    def test_delete_forgets_function_external_id(
+        self, mock_functions_retrieve_response, mock_functions_delete_response
+    ):
+        FUNCTIONS_API._resolve_id(f"func-no-{FUNCTION_ID}")
+        FUNCTIONS_API.delete(id=FUNCTION_ID)
+        assert {} == FUNCTIONS_API._id_cache
+
     def test_function_call_failed(self, mock_functions_call_failed_response):
         res = FUNCTIONS_API.call(id=FUNCTION_ID)
         assert isinstance(res, FunctionCall)
@@ -586,3 +969,137 @@ class TestFunctionCallsAPI:
         response = call.get_response()
         assert isinstance(response, dict)
         assert mock_function_call_response_response.calls[1].response.json()["response"] == response
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_as_completed(self, mock_sleep, mock_function_calls_refresh_responses):
+        calls = [
+            FunctionCall(id=1, function_id=10, status="Running", start_time=100),
+            FunctionCall(id=2, function_id=10, status="Running", start_time=200),
+            FunctionCall(id=3, function_id=20, status="Running", start_time=150),
+            FunctionCall(id=4, function_id=20, status="Completed", start_time=50),
+        ]
+
+        res = list(FUNCTION_CALLS_API.as_completed(calls))
+
+        assert [4, 1, 3, 2] == [call.id for call in res]
+        assert ["Completed", "Failed", "Timeout", "Completed"] == [call.status for call in calls]
+        assert {"message": "oops", "trace": ""} == calls[1].error
+        assert [1.0, 1.0, 2.0] == [call[0][0] for call in mock_sleep.call_args_list]
+        list_bodies = [
+            jsgz_load(call.request.body)
+            for call in mock_function_calls_refresh_responses.calls
+            if call.request.url.endswith("/functions/10/calls/list")
+        ]
+        assert {"min": 100, "max": 200} == list_bodies[0]["filter"]["startTime"]
+        assert {"min": 200, "max": 200} == list_bodies[1]["filter"]["startTime"]
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_wait_all(self, mock_sleep, mock_function_calls_refresh_responses):
+        calls = [FunctionCall(id=2, function_id=10, status="Running", start_time=200)]
+
+        res = FUNCTION_CALLS_API.wait_all(calls)
+
+        assert isinstance(res, FunctionCallList)
+        assert ["Failed"] == [call.status for call in res]
+        assert 3 == len(mock_function_calls_refresh_responses.calls)
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_wait_for_files_not_found_yet(self, mock_sleep, rsps):
+        url = FILES_API._get_base_url_with_base_path() + "/files/byids"
+        file = {"name": "code", "uploaded": True, "createdTime": 0, "lastUpdatedTime": 0}
+        responses = [
+            (400, {}, json.dumps({"error": {"code": 400, "message": "Not found", "missing": [{"id": 2}]}})),
+            (200, {}, json.dumps({"items": [{**file, "id": 1}]})),
+            (200, {}, json.dumps({"items": [{**file, "id": 2}]})),
+        ]
+        rsps.add_callback(rsps.POST, url, lambda request: responses.pop(0))
+
+        assert {1, 2} == FUNCTIONS_API._wait_for_uploaded_files([1, 2])
+        assert [[1, 2], [1], [2]] == [
+            [item["id"] for item in jsgz_load(call.request.body)["items"]] for call in rsps.calls
+        ]
+
+    def test_refresh_calls_follows_cursor(self, rsps):
+        url = FUNCTIONS_API._get_base_url_with_base_path() + "/functions/10/calls/list"
+        pages = [
+            {"items": [{**CALL_COMPLETED, "id": i, "functionId": 10} for i in range(3)], "nextCursor": "next"},
+            {"items": [{**CALL_FAILED, "id": 3, "functionId": 10}], "nextCursor": "more"},
+        ]
+        rsps.add_callback(rsps.POST, url, lambda request: (200, {}, json.dumps(pages.pop(0))))
+        calls = [FunctionCall(id=i, function_id=10, status="Running", start_time=100) for i in [0, 3]]
+
+        res = FUNCTION_CALLS_API._refresh_calls(calls)
+
+        assert [0, 3] == [call.id for call in res]
+        assert ["Completed", "Failed"] == [call.status for call in calls]
+        assert 2 == len(rsps.calls)
+
+    def test_wait_all_timeout(self):
+        with pytest.raises(TimeoutError):
+            FUNCTION_CALLS_API.wait_all([FunctionCall(id=1, function_id=10, status="Running")], timeout=0)
+
+    def test_list_calls_follows_cursor(self, rsps):
+        url = FUNCTIONS_API._get_base_url_with_base_path() + f"/functions/{FUNCTION_ID}/calls/list"
+        pages = [
+            {"items": [{**CALL_COMPLETED, "id": 1}, {**CALL_COMPLETED, "id": 2}], "nextCursor": "next"},
+            {"items": [{**CALL_COMPLETED, "id": 3}]},
+        ]
+        rsps.add_callback(rsps.POST, url, lambda request: (200, {}, json.dumps(pages.pop(0))))
+
+        res = FUNCTION_CALLS_API.list(function_id=FUNCTION_ID, status="Completed", limit=None)
+
+        assert [1, 2, 3] == [call.id for call in res]
+        bodies = [jsgz_load(call.request.body) for call in rsps.calls]
+        assert [None, "next"] == [body["cursor"] for body in bodies]
+        assert "Completed" == bodies[0]["filter"]["status"]
+
+    def test_iterate_calls_in_chunks(self, rsps):
+        url = FUNCTIONS_API._get_base_url_with_base_path() + f"/functions/{FUNCTION_ID}/calls/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{**CALL_COMPLETED, "id": i} for i in range(3)]})
+
+        chunks = list(FUNCTION_CALLS_API(function_id=FUNCTION_ID, chunk_size=2, limit=3))
+
+        assert [FunctionCallList, FunctionCallList] == [type(chunk) for chunk in chunks]
+        assert [[0, 1], [2]] == [[call.id for call in chunk] for chunk in chunks]
+        assert 3 == jsgz_load(rsps.calls[0].request.body)["limit"]
+
+    def test_stats(self, rsps):
+        url = FUNCTIONS_API._get_base_url_with_base_path() + f"/functions/{FUNCTION_ID}/calls/list"
+        pages = [
+            {"items": [{**CALL_COMPLETED, "id": 1}, {**CALL_FAILED, "id": 2}], "nextCursor": "next"},
+            {"items": [{**CALL_TIMEOUT, "id": 3}]},
+        ]
+        rsps.add_callback(rsps.POST, url, lambda request: (200, {}, json.dumps(pages.pop(0))))
+
+        stats = FUNCTION_CALLS_API.stats(function_id=FUNCTION_ID)
+
+        assert [1, 2, 3] == stats.id.tolist()
+        assert {None: {"calls": 3, "failure_rate": 1 / 3, "timeout_rate": 1 / 3}} == stats.error_rates()
+
+    @patch("cognite.experimental._api.functions.time.sleep")
+    def test_stream_logs_follow(self, mock_sleep, rsps):
+        base_url = FUNCTIONS_API._get_base_url_with_base_path() + f"/functions/{FUNCTION_ID}/calls/{CALL_ID}"
+        statuses = [CALL_RUNNING, CALL_RUNNING, CALL_COMPLETED]
+        logs = [["a"], ["a", "b"], ["a", "b", "c"]]
+        rsps.add_callback(rsps.GET, base_url, lambda request: (200, {}, json.dumps(statuses.pop(0))))
+        rsps.add_callback(
+            rsps.GET,
+            base_url + "/logs",
+            lambda request: (
+                200,
+                {},
+                json.dumps({"items": [{"timestamp": 0, "message": message} for message in logs.pop(0)]}),
+            ),
+        )
+
+        entries = list(FUNCTION_CALLS_API.stream_logs(call_id=CALL_ID, function_id=FUNCTION_ID, follow=True))
+
+        assert ["a", "b", "c"] == [entry.message for entry in entries]
+        assert 2 == mock_sleep.call_count
+
+    def test_stream_logs(self, mock_function_call_logs_response):
+        entries = list(FUNCTION_CALLS_API.stream_logs(call_id=CALL_ID, function_id=FUNCTION_ID))
+
+        assert mock_function_call_logs_response.calls[0].response.json()["items"] == [
+            entry.dump(camel_case=True) for entry in entries
+        ]
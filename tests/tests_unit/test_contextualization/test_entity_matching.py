@@ -1,10 +1,19 @@
+import json
 import re
+import threading
 
 import pytest
 
 from cognite.client.data_classes import Asset, TimeSeries
+from cognite.client.exceptions import CogniteAPIError, CogniteDuplicatedError
 from cognite.experimental import CogniteClient
-from cognite.experimental.data_classes import ContextualizationJob, EntityMatchingModel
+from cognite.experimental.data_classes import (
+    ContextualizationJob,
+    EntityMatchingBlocker,
+    EntityMatchingMatches,
+    EntityMatchingModel,
+    EntityMatchingTrueMatchStore,
+)
 from cognite.experimental.exceptions import ModelFailedException
 from tests.utils import jsgz_load
 
@@ -91,6 +100,81 @@ def mock_status_rules_ok(rsps):
     yield rsps
 
 
+@pytest.fixture
+def mock_predict_chunks(rsps):
+    jobs = {}
+    lock = threading.Lock()
+
+    def predict_callback(request):
+        body = jsgz_load(request.body)
+        with lock:
+            job_id = len(jobs) + 1
+            jobs[job_id] = body
+        return 200, {}, json.dumps({"jobId": job_id, "status": "Queued"})
+
+    def status_callback(request):
+        job_id = int(request.url.split("/")[-1])
+        match_from = jobs[job_id]["matchFrom"]
+        if match_from[0]["name"] == "fail" and job_id == 1:
+            return 200, {}, json.dumps({"jobId": job_id, "status": "Failed", "errorMessage": "error"})
+        items = [{"matchFrom": e, "matches": []} for e in match_from]
+        return 200, {}, json.dumps({"jobId": job_id, "status": "Completed", "items": items})
+
+    rsps.add_callback(
+        rsps.POST, EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/predict", predict_callback
+    )
+    rsps.add_callback(
+        rsps.GET, re.compile(f"{EMAPI._get_base_url_with_base_path()}{EMAPI._RESOURCE_PATH}/jobs/\\d+"), status_callback
+    )
+    yield jobs
+
+
+@pytest.fixture
+def mock_evaluate(rsps, mock_status_ok):
+    jobs = {}
+    lock = threading.Lock()
+
+    def predict_callback(request):
+        body = jsgz_load(request.body)
+        with lock:
+            job_id = len(jobs) + 1
+            jobs[job_id] = body
+        return 200, {}, json.dumps({"jobId": job_id, "status": "Queued"})
+
+    def status_callback(request):
+        body = jobs[int(request.url.split("/")[-1])]
+        items = [
+            {"matchFrom": e, "matches": [{"matchTo": t, "score": 1} for t in body["matchTo"] if t["name"] == e["name"]]}
+            for e in body["matchFrom"]
+        ]
+        return 200, {}, json.dumps({"jobId": 1, "status": "Completed", "items": items})
+
+    url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH
+    rsps.add(rsps.POST, url + "/", status=200, json={"id": 123, "status": "Queued", "requestTimestamp": 42})
+    rsps.add_callback(rsps.POST, url + "/predict", predict_callback)
+    rsps.add_callback(rsps.GET, re.compile(url + "/jobs/\\d+"), status_callback)
+    rsps.add(rsps.POST, url + "/delete", status=200, json={})
+    yield jobs
+
+
+@pytest.fixture
+def predict_items():
+    return [
+        {
+            "matchFrom": {"id": 1, "externalId": "ts1"},
+            "matches": [
+                {"matchTo": {"id": 10, "externalId": "a"}, "score": 0.7},
+                {"matchTo": {"id": 11, "externalId": "b"}, "score": 0.9},
+            ],
+        },
+        {
+            "matchFrom": {"id": 2, "externalId": "ts2"},
+            "matches": [{"matchTo": {"id": 11, "externalId": "b"}, "score": 0.8}],
+        },
+        {"matchFrom": {"id": 3, "externalId": "ts3"}, "matches": []},
+    ]
+
+
 class TestEntityMatching:
     def test_fit(self, mock_fit, mock_status_ok):
         entities_from = [{"id": 1, "name": "xx"}]
@@ -148,6 +232,365 @@ class TestEntityMatching:
             "ignoreMissingFields": False,
         } == jsgz_load(mock_fit.calls[0].request.body)
 
+    def test_fit_project_fields(self, mock_fit):
+        entities_from = [TimeSeries(id=1, name="x", description="d", unit="m")]
+        entities_to = [{"id": 2, "externalId": "abc", "name": "x", "tag": "y", "description": "d"}]
+        EMAPI.fit(
+            match_from=entities_from,
+            match_to=entities_to,
+            match_fields=[("name", "tag"), ("description", "description")],
+            project_fields=True,
+        )
+        body = jsgz_load(mock_fit.calls[0].request.body)
+        assert [{"id": 1, "name": "x", "description": "d"}] == body["matchFrom"]
+        assert [{"id": 2, "externalId": "abc", "tag": "y", "description": "d"}] == body["matchTo"]
+
+    def test_fit_blocker(self, mock_fit):
+        entities_from = [{"id": 1, "name": "PUMP 21-PT-1001"}]
+        entities_to = [
+            {"id": 2, "name": "21-PT-1001"},
+            {"id": 3, "name": "VALVE 33"},
+            {"id": 4, "name": "HEATER"},
+        ]
+        blocker = EntityMatchingBlocker()
+        EMAPI.fit(match_from=entities_from, match_to=entities_to, true_matches=[(1, 4)], blocker=blocker)
+        body = jsgz_load(mock_fit.calls[0].request.body)
+        assert [2, 4] == [e["id"] for e in body["matchTo"]]
+        assert {"entities_before": 3, "entities_after": 2, "pruning_ratio": 1 - 2 / 3} == blocker.stats
+
+    def test_blocker_candidates(self):
+        match_from = [{"name": "21-PT-1001"}, {"name": "VALVE"}, {"name": "nothing"}]
+        match_to = [{"tag": "21PT1001"}, {"tag": "21-PT-1001 VALVE"}, {"tag": "valve 21"}]
+        assert [[1, 2], [1, 2], []] == EntityMatchingBlocker().candidates(match_from, match_to, ["name"], ["tag"])
+        assert [[1], [1, 2], []] == EntityMatchingBlocker(min_overlap=2, max_candidates=1).candidates(
+            match_from[:1], match_to, ["name"], ["tag"]
+        ) + EntityMatchingBlocker().candidates(match_from[1:], match_to, ["name"], ["tag"])
+        assert [[0, 1], [1, 2], []] == EntityMatchingBlocker(ngram=3, min_overlap=2).candidates(
+            match_from, match_to, ["name"], ["tag"]
+        )
+        assert [[1], [], []] == EntityMatchingBlocker(max_key_frequency=0.5).candidates(
+            match_from, match_to, ["name"], ["tag"]
+        )
+
+    def test_predict_blocked(self, mock_retrieve, mock_status_ok, mock_predict_chunks):
+        entities_from = [
+            {"id": 1, "name": "A 1"},
+            {"id": 2, "name": "B 2"},
+            {"id": 3, "name": "A 3"},
+            {"id": 4, "name": "C"},
+        ]
+        entities_to = [{"id": 10, "name": "A"}, {"id": 11, "name": "B"}, {"id": 12, "name": "D"}]
+        blocker = EntityMatchingBlocker()
+        items = EMAPI.predict_blocked(
+            match_from=entities_from, match_to=entities_to, blocker=blocker, block_size=2, id=123
+        )
+        assert entities_from == [item["matchFrom"] for item in items]
+        assert [] == items[3]["matches"]
+        blocks = sorted(
+            ([e["id"] for e in body["matchFrom"]], [e["id"] for e in body["matchTo"]])
+            for body in mock_predict_chunks.values()
+        )
+        assert [([1, 3], [10]), ([2], [11])] == blocks
+        assert 2 == blocker.stats["blocks"]
+        assert 1 - 3 / 12 == blocker.stats["pruning_ratio"]
+
+    def test_evaluate(self, mock_evaluate):
+        entities_from = [{"id": i, "name": "abc"[i % 3]} for i in range(6)]
+        entities_to = [{"id": 10, "name": "a"}, {"id": 11, "name": "b"}, {"id": 12, "name": "d"}]
+        true_matches = [(0, 10), (1, 11), (2, 12), (3, 10), (4, 11), (5, 12)]
+        cache = {}
+        evaluations = EMAPI.evaluate(
+            entities_from, entities_to, true_matches, [{"feature_type": "simple"}], n_folds=3, cache=cache
+        )
+        assert [
+            {"configuration": {"feature_type": "simple"}, "precision": 1.0, "recall": 2 / 3, "f1": 0.8}
+        ] == evaluations
+        assert 3 == len(mock_evaluate) == len(cache)
+        assert sorted(e["id"] for body in mock_evaluate.values() for e in body["matchFrom"]) == list(range(6))
+
+        assert evaluations == EMAPI.evaluate(
+            entities_from, entities_to, true_matches, [{"feature_type": "simple"}], n_folds=3, cache=cache
+        )
+        assert 3 == len(mock_evaluate)
+
+    def test_evaluate_invalid_folds(self):
+        with pytest.raises(ValueError, match="n_folds"):
+            EMAPI.evaluate([], [], [(1, 2)], [{}], n_folds=2)
+
+    def test_matches(self, predict_items):
+        job = ContextualizationJob(job_id=1, status="Completed")
+        job._result = {"items": predict_items}
+        matches = job.matches()
+        assert isinstance(matches, EntityMatchingMatches)
+        assert {
+            "from_index": [0, 0, 1],
+            "from_id": [1, 1, 2],
+            "from_external_id": ["ts1", "ts1", "ts2"],
+            "to_index": [0, 1, 1],
+            "to_id": [10, 11, 11],
+            "to_external_id": ["a", "b", "b"],
+            "score": [0.7, 0.9, 0.8],
+            "rank": [1, 0, 0],
+        } == matches.dump()
+        assert [11, 11] == matches.top_k(1).to_id.tolist()
+        assert [0.9, 0.8] == matches.threshold(0.8).score.tolist()
+        assert [(1, 11)] == list(zip(*[matches.one_to_one().from_id, matches.one_to_one().to_id]))
+
+    def test_matches_one_to_one_hungarian(self, predict_items):
+        pytest.importorskip("scipy")
+        matches = EntityMatchingMatches._load(predict_items).one_to_one("hungarian")
+        assert [(1, 10), (2, 11)] == list(zip(matches.from_id, matches.to_id))
+
+    def test_matches_one_to_one_hungarian_components(self):
+        pytest.importorskip("scipy")
+        items = [
+            {
+                "matchFrom": {"id": 1},
+                "matches": [{"matchTo": {"id": 10}, "score": 0.9}, {"matchTo": {"id": 11}, "score": 0.8}],
+            },
+            {"matchFrom": {"id": 2}, "matches": [{"matchTo": {"id": 10}, "score": 0.7}]},
+            {"matchFrom": {"id": 3}, "matches": [{"matchTo": {"id": 20}, "score": 0.5}]},
+            {"matchFrom": {"id": 4}, "matches": []},
+        ]
+        matches = EntityMatchingMatches._load(items).one_to_one("hungarian")
+        assert [(1, 11), (2, 10), (3, 20)] == sorted(zip(matches.from_id, matches.to_id))
+
+    def test_matches_to_relationships(self, predict_items):
+        relationships = EntityMatchingMatches._load(predict_items).top_k(1).to_relationships("timeSeries", "asset")
+        assert [
+            {
+                "externalId": "match:ts1:b",
+                "sourceExternalId": "ts1",
+                "sourceType": "timeSeries",
+                "targetExternalId": "b",
+                "targetType": "asset",
+                "confidence": 0.9,
+            },
+            {
+                "externalId": "match:ts2:b",
+                "sourceExternalId": "ts2",
+                "sourceType": "timeSeries",
+                "targetExternalId": "b",
+                "targetType": "asset",
+                "confidence": 0.8,
+            },
+        ] == relationships.dump(camel_case=True)
+        with pytest.raises(ValueError):
+            EntityMatchingMatches._load(
+                [{"matchFrom": {"id": 1}, "matches": [{"matchTo": {"id": 2}}]}]
+            ).to_relationships("timeSeries", "asset")
+
+    def test_write_matches_relationships(self, rsps, predict_items):
+        def create_callback(request):
+            items = jsgz_load(request.body)["items"]
+            if any(item["externalId"] == "match:ts1:b" for item in items):
+                error = {"code": 409, "message": "Duplicated", "duplicated": [{"externalId": "match:ts1:b"}]}
+                return 409, {}, json.dumps({"error": error})
+            return 200, {}, json.dumps({"items": items})
+
+        rsps.add_callback(
+            rsps.POST, COGNITE_CLIENT.relationships._get_base_url_with_base_path() + "/relationships", create_callback
+        )
+        matches = EntityMatchingMatches._load(predict_items).top_k(1)
+        assert {"written": 1, "existing": 1} == EMAPI.write_matches(matches, source_type="timeSeries")
+        assert [["match:ts1:b", "match:ts2:b"], ["match:ts2:b"]] == [
+            [item["externalId"] for item in jsgz_load(call.request.body)["items"]] for call in rsps.calls
+        ]
+
+    def test_write_matches_relationships_duplicates_without_external_id(self, rsps, predict_items):
+        error = {"code": 409, "message": "Duplicated", "duplicated": [{"id": 1}]}
+        rsps.add(
+            rsps.POST,
+            COGNITE_CLIENT.relationships._get_base_url_with_base_path() + "/relationships",
+            status=409,
+            json={"error": error},
+        )
+        matches = EntityMatchingMatches._load(predict_items).top_k(1)
+        with pytest.raises(CogniteDuplicatedError):
+            EMAPI.write_matches(matches, source_type="timeSeries")
+        assert 1 == len(rsps.calls)
+
+    def test_write_matches_relationships_in_chunks(self, rsps):
+        def create_callback(request):
+            items = jsgz_load(request.body)["items"]
+            if any(item["externalId"] == "match:ts0:a0" for item in items):
+                error = {"code": 409, "message": "Duplicated", "duplicated": [{"externalId": "match:ts0:a0"}]}
+                return 409, {}, json.dumps({"error": error})
+            return 200, {}, json.dumps({"items": items})
+
+        rsps.add_callback(
+            rsps.POST, COGNITE_CLIENT.relationships._get_base_url_with_base_path() + "/relationships", create_callback
+        )
+        matches = EntityMatchingMatches._load(
+            [
+                {"matchFrom": {"externalId": f"ts{i}"}, "matches": [{"matchTo": {"externalId": f"a{i}"}, "score": 1}]}
+                for i in range(2000)
+            ]
+        )
+        assert {"written": 1999, "existing": 1} == EMAPI.write_matches(matches, source_type="timeSeries")
+
+    def test_write_matches_asset_links(self, rsps, predict_items):
+        base_url = COGNITE_CLIENT.time_series._get_base_url_with_base_path()
+        rsps.add(rsps.POST, base_url + "/timeseries/update", status=200, json={"items": []})
+        rsps.add(rsps.POST, base_url + "/events/update", status=200, json={"items": []})
+        job = ContextualizationJob(job_id=1, status="Completed")
+        job._result = {"items": predict_items}
+
+        assert {"written": 3, "existing": 0} == EMAPI.write_matches(job, source_type="event", write_as="asset_links")
+        assert [
+            {"id": 1, "update": {"assetIds": {"add": [10, 11]}}},
+            {"id": 2, "update": {"assetIds": {"add": [11]}}},
+        ] == jsgz_load(rsps.calls[0].request.body)["items"]
+        with pytest.raises(ValueError, match="several matches"):
+            EMAPI.write_matches(job, source_type="timeSeries", write_as="asset_links")
+        EMAPI.write_matches(job.matches().one_to_one(), source_type="timeSeries", write_as="asset_links")
+        assert [{"id": 1, "update": {"assetId": {"set": 11}}}] == jsgz_load(rsps.calls[1].request.body)["items"]
+        with pytest.raises(ValueError, match="Asset links"):
+            EMAPI.write_matches(job, source_type="asset", write_as="asset_links")
+
+    def test_true_match_store(self, rsps, mock_status_ok):
+        rsps.add(
+            rsps.POST,
+            EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/refit",
+            status=200,
+            json={"id": 456, "status": "Queued", "requestTimestamp": 42},
+        )
+        model = EntityMatchingModel(id=123, status="Completed", cognite_client=COGNITE_CLIENT)
+        store = EntityMatchingTrueMatchStore(model, true_matches=[(1, 10)])
+        assert [] == store.delta()
+        assert {"added": 2, "duplicates": 1, "conflicts": 1} == store.add([(1, 10), (2, 11), (2, 12), ("a", "b")])
+        assert [{"fromId": 2, "toId": 12}, {"fromExternalId": "a", "toExternalId": "b"}] == store.delta()
+
+        refitted = store.refit().result()
+        assert 456 == refitted.id == store.model.id
+        assert [] == store.delta()
+        assert {
+            "trueMatches": [{"fromId": 2, "toId": 12}, {"fromExternalId": "a", "toExternalId": "b"}],
+            "id": 123,
+        } == jsgz_load([call for call in rsps.calls if "refit" in call.request.url][0].request.body)
+        assert refitted is store.refit().result()
+        assert 1 == len([call for call in rsps.calls if "refit" in call.request.url])
+
+    def test_run_many_pipelines_as_completed(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI.pipelines._RESOURCE_PATH
+        rsps.add(rsps.POST, url + "/run", status=200, json={"jobId": 1, "status": "Queued"})
+        rsps.add(rsps.GET, url + "/run/1", status=200, json={"jobId": 1, "status": "Running"})
+        rsps.add(rsps.GET, url + "/run/1", status=200, json={"jobId": 1, "status": "Completed", "items": []})
+        jobs = EMAPI.pipelines.run_many(ids=[1], external_ids=["a"])
+        assert 2 == len(jobs)
+        assert [{"id": 1}, {"externalId": "a"}] == sorted(
+            [jsgz_load(call.request.body) for call in rsps.calls], key=lambda body: "id" not in body
+        )
+        completed = list(EMAPI.pipelines.as_completed(jobs, interval=0))
+        assert ["Completed", "Completed"] == [job.status for job in completed]
+        assert {"items": []} == completed[0].result
+
+    def test_as_completed_timeout(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI.pipelines._RESOURCE_PATH
+        rsps.add(rsps.GET, url + "/run/1", status=200, json={"jobId": 1, "status": "Running"})
+        job = ContextualizationJob._load_with_status(
+            {"jobId": 1}, EMAPI.pipelines._RESOURCE_PATH + "/run/", COGNITE_CLIENT
+        )
+        with pytest.raises(TimeoutError):
+            list(EMAPI.pipelines.as_completed([job], interval=0.01, timeout=0))
+
+    def test_pipeline_runs_paginated(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI.pipelines.runs._RESOURCE_PATH + "/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"jobId": 1}, {"jobId": 2}], "nextCursor": "c"})
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"jobId": 3}]})
+        runs = EMAPI.pipelines.runs(id=5, chunk_size=2)
+        assert 0 == len(rsps.calls)
+        assert [[1, 2], [3]] == [[run.job_id for run in page] for page in runs]
+        assert [{"id": 5, "limit": 2}, {"id": 5, "limit": 2, "cursor": "c"}] == [
+            jsgz_load(call.request.body) for call in rsps.calls
+        ]
+
+    def test_pipeline_runs_list_limit(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI.pipelines.runs._RESOURCE_PATH + "/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"jobId": 1}], "nextCursor": "c"})
+        runs = EMAPI.pipelines.runs.list(external_id="a", limit=1)
+        assert [1] == [run.job_id for run in runs]
+        assert 1 == len(rsps.calls)
+
+    def test_models_generator(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"id": 1}, {"id": 2}], "nextCursor": "c"})
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"id": 3}]})
+        assert [1, 2, 3] == [model.id for model in EMAPI(filter={"feature_type": "bigram"})]
+        assert [
+            {"filter": {"featureType": "bigram"}, "limit": 1000},
+            {"filter": {"featureType": "bigram"}, "limit": 1000, "cursor": "c"},
+        ] == [jsgz_load(call.request.body) for call in rsps.calls]
+
+    def test_list_respects_limit(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"id": 1}, {"id": 2}], "nextCursor": "c"})
+        models = EMAPI.list(limit=2)
+        assert [1, 2] == [model.id for model in models]
+        assert 2 == jsgz_load(rsps.calls[0].request.body)["limit"]
+
+    def test_list_jobs_default_limit(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/jobs"
+        rsps.add(rsps.GET, re.compile(url), status=200, json={"items": [{"id": 1}], "nextCursor": "c"})
+        rsps.add(rsps.GET, re.compile(url), status=200, json={"items": [{"id": 2}]})
+        assert [1, 2] == [job.id for job in EMAPI.list_jobs()]
+        assert "limit=100" in rsps.calls[0].request.url
+        assert "limit=99" in rsps.calls[1].request.url
+
+    def test_jobs_generator(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/jobs"
+        rsps.add(rsps.GET, re.compile(url), status=200, json={"items": [{"id": 1}, {"id": 2}], "nextCursor": "c"})
+        rsps.add(rsps.GET, re.compile(url), status=200, json={"items": [{"id": 3}]})
+        pages = list(EMAPI.jobs(chunk_size=2))
+        assert [[1, 2], [3]] == [[job.id for job in page] for page in pages]
+        assert "cursor=c" in rsps.calls[1].request.url
+
+    def test_pipelines_generator(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI.pipelines._RESOURCE_PATH + "/list"
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"id": 1}], "nextCursor": "c"})
+        rsps.add(rsps.POST, url, status=200, json={"items": [{"id": 2}]})
+        assert [1, 2] == [pipeline.id for pipeline in EMAPI.pipelines]
+
+    def test_apply_retention(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH
+        models = [
+            {"id": 1, "status": "Completed", "requestTimestamp": 10},
+            {"id": 2, "status": "Failed", "requestTimestamp": 20},
+            {"id": 3, "status": "Completed", "requestTimestamp": 30},
+            {"id": 4, "status": "Failed", "requestTimestamp": 40},
+        ]
+        rsps.add(rsps.POST, url + "/list", status=200, json={"items": models})
+        rsps.add(rsps.POST, url + "/delete", status=200, json={})
+
+        assert [2, 4] == [m.id for m in EMAPI.apply_retention(statuses=["Failed"], dry_run=True)]
+        assert [1, 2] == [m.id for m in EMAPI.apply_retention(older_than=35, keep_latest=2, dry_run=True)]
+        assert 2 == len(rsps.calls)
+
+        assert [2] == [m.id for m in EMAPI.apply_retention(statuses=["Failed"], keep_latest=1)]
+        assert {"items": [{"id": 2}]} == jsgz_load(rsps.calls[-1].request.body)
+
+    def test_bulk_delete_reports_partial_failure(self, rsps):
+        url = EMAPI._get_base_url_with_base_path() + EMAPI._RESOURCE_PATH + "/delete"
+
+        def delete_callback(request):
+            if {"id": 0} in jsgz_load(request.body)["items"]:
+                return 500, {}, json.dumps({"error": {"code": 500, "message": "error"}})
+            return 200, {}, json.dumps({})
+
+        rsps.add_callback(rsps.POST, url, delete_callback)
+        with pytest.raises(CogniteAPIError) as exc_info:
+            EMAPI.delete(id=list(range(2500)))
+        assert 3 == len(rsps.calls)
+        assert list(range(1000, 2500)) == sorted(exc_info.value.successful)
+        assert list(range(1000)) == sorted(exc_info.value.failed + exc_info.value.unknown)
+
+    def test_dump_entities_dataframe(self):
+        pd = pytest.importorskip("pandas")
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None], "unit": ["m", "s"]})
+        assert [{"id": 1, "name": "a"}, {"id": 2}] == EntityMatchingModel.dump_entities(df, ["name"])
+        assert [{"id": 1, "name": "a", "unit": "m"}, {"id": 2, "unit": "s"}] == EntityMatchingModel.dump_entities(df)
+        assert EntityMatchingModel.dump_entities(df.iloc[:0]) is None
+
     def test_fit_fails(self, mock_fit, mock_status_failed):
         entities_from = [{"id": 1, "name": "xx"}]
         entities_to = [{"id": 2, "name": "yy"}]
@@ -173,3 +616,29 @@ class TestEntityMatching:
         assert "ContextualizationJob(id: 456,status: Queued,error: None)" == str(job)
         assert {"items": [1]} == job.result
         assert "Completed" == job.status
+
+    def test_predict_chunked(self, mock_retrieve, mock_status_ok, mock_predict_chunks):
+        entities_from = [{"id": i, "name": "x" * 10} for i in range(10)]
+        items = EMAPI.predict_chunked(match_from=entities_from, id=123, max_chunk_bytes=80)
+        assert entities_from == [item["matchFrom"] for item in items]
+        assert 5 == len(mock_predict_chunks)
+        assert all(2 == len(body["matchFrom"]) for body in mock_predict_chunks.values())
+
+    def test_predict_chunked_counts_match_to(self, mock_retrieve, mock_status_ok, mock_predict_chunks):
+        entities_from = [{"id": i, "name": "x" * 10} for i in range(10)]
+        entities_to = [{"id": 1, "name": "y" * 10}]
+        items = EMAPI.predict_chunked(match_from=entities_from, match_to=entities_to, id=123, max_chunk_bytes=80)
+        assert entities_from == [item["matchFrom"] for item in items]
+        assert 10 == len(mock_predict_chunks)
+        with pytest.raises(ValueError, match="match_to"):
+            EMAPI.predict_chunked(match_from=entities_from, match_to=entities_to * 3, id=123, max_chunk_bytes=80)
+
+    def test_predict_chunked_raises_after_retries(self, mock_retrieve, mock_status_ok, mock_predict_chunks):
+        with pytest.raises(ModelFailedException):
+            EMAPI.predict_chunked(match_from=[{"id": 1, "name": "fail"}], id=123, max_retries=0)
+
+    def test_predict_chunked_retries_failed_chunk(self, mock_retrieve, mock_status_ok, mock_predict_chunks):
+        entities_from = [{"id": 1, "name": "fail"}]
+        items = EMAPI.predict_chunked(match_from=entities_from, id=123)
+        assert entities_from == [item["matchFrom"] for item in items]
+        assert 2 == len(mock_predict_chunks)
@@ -5,6 +5,7 @@ import pytest
 from cognite.experimental import CogniteClient
 from cognite.experimental.data_classes import ContextualizationJob
 from cognite.experimental.exceptions import ModelFailedException
+from cognite.experimental.utils import ContextualizationJobCache
 from tests.utils import jsgz_load
 
 COGNITE_CLIENT = CogniteClient()
@@ -41,6 +42,25 @@ def mock_status_find_objects_ok(rsps):
     yield rsps
 
 
+@pytest.fixture
+def mock_file_retrieve(rsps):
+    files_api = COGNITE_CLIENT.files
+    rsps.add(
+        rsps.POST,
+        files_api._get_base_url_with_base_path() + "/files/byids",
+        status=200,
+        json={"items": [{"id": 123432423, "name": "pnid.pdf", "lastUpdatedTime": 42}]},
+    )
+    yield rsps
+
+
+@pytest.fixture
+def job_cache(tmp_path):
+    PNID_OBJECT_DETECTION_API.job_cache = ContextualizationJobCache(str(tmp_path / "jobs.sqlite"))
+    yield PNID_OBJECT_DETECTION_API.job_cache
+    PNID_OBJECT_DETECTION_API.job_cache = None
+
+
 @pytest.fixture
 def mock_status_failed(rsps):
     response_body = {"jobId": 789, "status": "Failed", "errorMessage": "error message"}
@@ -78,3 +98,26 @@ class TestPNIDObjectDetection:
                 assert "/789" in call.request.url
         assert 1 == n_find_objects_calls
         assert 1 == n_status_calls
+
+    def test_find_objects_cached(self, job_cache, mock_file_retrieve, mock_find_objects, mock_status_find_objects_ok):
+        job = PNID_OBJECT_DETECTION_API.find_objects(123432423)
+        assert {"items": []} == job.result
+
+        cached_job = PNID_OBJECT_DETECTION_API.find_objects(123432423)
+        assert "Completed" == cached_job.status
+        assert 789 == cached_job.job_id
+        assert {"items": []} == cached_job.result
+        assert 1 == len([call for call in mock_find_objects.calls if "findobjects" in call.request.url])
+        assert 1 == len([call for call in mock_find_objects.calls if call.request.method == "GET"])
+
+    def test_job_cache_evicts_least_recently_used(self, tmp_path):
+        cache = ContextualizationJobCache(str(tmp_path / "jobs.sqlite"), max_size=250)
+        for key in ["a", "b", "c"]:
+            job = ContextualizationJob(job_id=1, status="Completed")
+            job._result = {"items": ["x" * 50]}
+            cache.put(key, job)
+            if key == "b":
+                assert cache.get("a") is not None
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
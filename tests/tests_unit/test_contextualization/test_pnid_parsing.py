@@ -1,11 +1,15 @@
+import gzip
+import os
 import re
 import unittest
 
 import pytest
 
 from cognite.experimental import CogniteClient
+from cognite.experimental._context_client import JobStatusPoller
 from cognite.experimental.data_classes import ContextualizationJob
 from cognite.experimental.exceptions import ModelFailedException
+from cognite.experimental.utils import ContextualizationJobCache
 from tests.utils import jsgz_load
 
 COGNITE_CLIENT = CogniteClient()
@@ -36,6 +40,27 @@ def mock_extract_pattern(rsps):
     yield rsps
 
 
+@pytest.fixture
+def mock_status_pattern_items_ok(rsps):
+    response_body = {
+        "jobId": 456,
+        "status": "Completed",
+        "items": [
+            {"text": "21-PT-1019", "boundingBox": {"xMin": 0.1, "xMax": 0.2, "yMin": 0.3, "yMax": 0.4}},
+            {"text": "PIPE", "boundingBox": {"xMin": 0.5, "xMax": 0.6, "yMin": 0.7, "yMax": 0.8}},
+        ],
+        "fileId": 123432423,
+        "fileExternalId": "123432423",
+    }
+    rsps.add(
+        rsps.GET,
+        re.compile(PNIDAPI._get_base_url_with_base_path() + PNIDAPI._RESOURCE_PATH + "/extractpattern" + "/\\d+"),
+        status=200,
+        json=response_body,
+    )
+    yield rsps
+
+
 @pytest.fixture
 def mock_convert(rsps):
     response_body = {"jobId": 345, "status": "Queued"}
@@ -103,6 +128,38 @@ def mock_status_convert_ok(rsps):
     yield rsps
 
 
+@pytest.fixture
+def mock_status_convert_svg_ok(rsps):
+    response_body = {
+        "jobId": 345,
+        "status": "Completed",
+        "svgUrl": "https://svg.download.here",
+        "pngUrl": "https://png.download.here",
+        "fileId": 123432423,
+    }
+    rsps.add(
+        rsps.GET,
+        re.compile(PNIDAPI._get_base_url_with_base_path() + PNIDAPI._RESOURCE_PATH + "/convert" + "/\\d+"),
+        status=200,
+        json=response_body,
+    )
+    rsps.add(rsps.GET, "https://svg.download.here", status=200, body="<svg></svg>")
+    yield rsps
+
+
+@pytest.fixture
+def mock_ocr_download(rsps):
+    grep_api = COGNITE_CLIENT.files.unstructured
+    rsps.add(
+        rsps.POST,
+        grep_api._get_base_url_with_base_path() + grep_api._GREP_RESOURCE_PATH + "/downloadlink/parsed",
+        status=200,
+        json={"items": [{"id": 123432423, "downloadUrl": "https://ocr.download.here"}]},
+    )
+    rsps.add(rsps.GET, "https://ocr.download.here", status=200, body="21-PT-1019 PIPE\nXV 96125 LT-1234")
+    yield rsps
+
+
 @pytest.fixture
 def mock_status_failed(rsps):
     response_body = {"jobId": 123, "status": "Failed", "errorMessage": "error message"}
@@ -155,6 +212,25 @@ class TestPNIDParsing:
         assert 1 == n_detect_calls
         assert 1 == n_status_calls
 
+    def test_detect_cached_job_is_not_polled(self, tmp_path, mock_detect, mock_status_detect_ok):
+        mock_detect.add(
+            mock_detect.POST,
+            COGNITE_CLIENT.files._get_base_url_with_base_path() + "/files/byids",
+            status=200,
+            json={"items": [{"id": 123432423, "name": "pnid.pdf", "lastUpdatedTime": 42}]},
+        )
+        PNIDAPI.job_cache = ContextualizationJobCache(str(tmp_path / "jobs.sqlite"))
+        try:
+            PNIDAPI.detect(file_id=123432423, entities=["a", "b"])
+            n_status_calls = len([call for call in mock_detect.calls if call.request.method == "GET"])
+            job = PNIDAPI.detect(file_id=123432423, entities=["a", "b"])
+        finally:
+            PNIDAPI.job_cache = None
+        assert "Completed" == job.status
+        assert "items" in job.result
+        assert n_status_calls == len([call for call in mock_detect.calls if call.request.method == "GET"])
+        assert 1 == len([call for call in mock_detect.calls if call.request.url.endswith("/detect")])
+
     def test_detect_entities_dict(self, mock_detect, mock_status_detect_ok):
         entities = [{"name": "a"}, {"name": "b"}]
         file_id = 123432423
@@ -252,3 +328,93 @@ class TestPNIDParsing:
         assert "Completed" == job.status
         assert "fileId" in job.result
         assert "fileExternalId" in job.result
+
+    def test_prefilter_entities(self):
+        entities = ["21-PT-1019", "21-PT-1020", "IAA_XV-96125", "A-LT-1234", "ZZ-1"]
+        candidates, name_mapping, stats = PNIDAPI.prefilter_entities(
+            entities, name_mapping={"ZZ-1": "PIPE", "21-PT-1020": "QQ"}, ocr_text="21-PT-1019 PIPE\nXV 96125 LT-1234"
+        )
+        assert ["21-PT-1019", "ZZ-1"] == candidates
+        assert {"ZZ-1": "PIPE"} == name_mapping
+        assert {"entities_before": 5, "entities_after": 2, "reduction_ratio": 0.6} == stats
+
+        candidates, _, _ = PNIDAPI.prefilter_entities(
+            entities, partial_match=True, min_tokens=2, ocr_text="21-PT-1019 PIPE\nXV 96125 LT-1234"
+        )
+        assert ["21-PT-1019", "IAA_XV-96125", "A-LT-1234"] == candidates
+
+    def test_prefilter_entities_ignores_separators(self):
+        candidates, _, _ = PNIDAPI.prefilter_entities(
+            ["21-PT-1019", "21-pt-1020", "21-PT-1021", "XV-96125"], ocr_text="21PT1019 21-PT 1020\n21-PT-102 1"
+        )
+        assert ["21-PT-1019", "21-pt-1020", "21-PT-1021"] == candidates
+
+    def test_detect_prefilter_without_candidates(self, mock_ocr_download):
+        job = PNIDAPI.detect(file_id=123432423, entities=["AB-1"], prefilter=True)
+        assert "Completed" == job.status
+        assert [] == job.result["items"]
+        assert 0 == job.prefilter_stats["entities_after"]
+        assert not [call for call in mock_ocr_download.calls if "/context/" in call.request.url]
+
+    def test_detect_prefilter(self, mock_ocr_download, mock_detect, mock_status_detect_ok):
+        entities = [{"name": "21-PT-1019"}, {"name": "21-PT-1020"}]
+        job = PNIDAPI.detect(file_id=123432423, entities=entities, prefilter=True)
+        assert "Completed" == job.status
+        assert {"entities_before": 2, "entities_after": 1, "reduction_ratio": 0.5} == job.prefilter_stats
+        detect_calls = [call for call in mock_ocr_download.calls if call.request.url.endswith("/detect")]
+        assert ["21-PT-1019"] == jsgz_load(detect_calls[0].request.body)["entities"]
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_convert_many_and_download_svgs(self, tmp_path, mock_convert, mock_status_convert_svg_ok, compress):
+        items = [{"text": "21-PT-1019", "boundingBox": {"xMax": 0.59, "xMin": 0.57, "yMax": 0.37, "yMin": 0.36}}]
+        jobs = PNIDAPI.convert_many({123432423: items, "abc": []}, grayscale=True)
+        assert 2 == len(jobs)
+        bodies = [jsgz_load(call.request.body) for call in mock_convert.calls if call.request.method == "POST"]
+        assert {"fileId": 123432423, "items": items, "grayscale": True} in bodies
+        assert {"fileExternalId": "abc", "items": [], "grayscale": True} in bodies
+
+        paths = PNIDAPI.download_svgs(jobs[:1], str(tmp_path), compress=compress)
+        assert [os.path.join(str(tmp_path), "123432423.svg" + (".gz" if compress else ""))] == paths
+        with (gzip.open(paths[0]) if compress else open(paths[0], "rb")) as f:
+            assert b"<svg></svg>" == f.read()
+
+    def test_extract_pattern_many(self, mock_extract_pattern, mock_status_pattern_items_ok):
+        patterns = ["\\d+-[A-Z]+-\\d+", "[A-Z]+"]
+        table = PNIDAPI.extract_pattern_many(patterns, file_ids=[123432423, 123432423])
+        assert [123432423] * 4 == table["file_id"]
+        assert patterns + patterns == table["pattern"]
+        assert ["21-PT-1019", "PIPE"] * 2 == table["text"]
+        assert [0.1, 0.5, 0.1, 0.5] == table["x_min"]
+        assert [0.4, 0.8, 0.4, 0.8] == table["y_max"]
+        bodies = [jsgz_load(call.request.body) for call in mock_extract_pattern.calls if call.request.method == "POST"]
+        assert [{"patterns": patterns, "fileId": 123432423}] * 2 == bodies
+
+    def test_extract_pattern_many_invalid_pattern(self):
+        with pytest.raises(ValueError, match="Invalid pattern"):
+            PNIDAPI.extract_pattern_many(["ab{1,2}", "[a-"], file_ids=[123432423])
+
+    def test_status_polling_stats(self, mock_extract_pattern):
+        status_url = re.compile(PNIDAPI._get_base_url_with_base_path() + PNIDAPI._RESOURCE_PATH + "/extractpattern/456")
+        mock_extract_pattern.add(
+            mock_extract_pattern.GET, status_url, status=200, json={"jobId": 456, "status": "Running"}
+        )
+        mock_extract_pattern.add(
+            mock_extract_pattern.GET, status_url, status=200, json={"jobId": 456, "status": "Completed", "items": []}
+        )
+        PNIDAPI.status_poller.reset()
+        job = PNIDAPI.extract_pattern(file_id=123432423, patterns=["a"])
+        job.wait_for_completion(interval=0)
+        assert "Completed" == job.status
+        assert 2 == job.polling_stats["polls"]
+        assert 1 == job.polling_stats["wasted_polls"]
+        summary = PNIDAPI.status_poller.summary()
+        assert 1 == summary["jobs"]
+        assert 2 == summary["polls"]
+        assert summary["mean_latency"] >= 0
+
+    def test_status_polling_stats_bounded(self):
+        poller = JobStatusPoller(PNIDAPI, max_jobs=2)
+        for path, wasted in [("/a/1", True), ("/a/2", False), ("/a/1", False), ("/a/3", False)]:
+            poller._record(path, 1.0, wasted)
+        assert ["/a/1", "/a/3"] == list(poller.stats)
+        assert {"jobs": 3, "polls": 4, "wasted_polls": 1, "mean_latency": 1.0} == poller.summary()
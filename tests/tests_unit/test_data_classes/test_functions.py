@@ -1,8 +1,9 @@
+import math
 from unittest.mock import MagicMock
 
 import pytest
 
-from cognite.experimental.data_classes import Function
+from cognite.experimental.data_classes import Function, FunctionCall, FunctionCallList, FunctionCallStats
 
 
 @pytest.fixture
@@ -36,3 +37,45 @@ class TestFunction:
     def test_update_on_deleted_function(self, empty_function):
         empty_function._cognite_client.functions.retrieve.return_value = None
         empty_function.update()
+
+
+@pytest.fixture
+def calls():
+    return FunctionCallList(
+        [
+            FunctionCall(id=1, start_time=0, end_time=100, status="Completed"),
+            FunctionCall(id=2, start_time=30000, end_time=30300, status="Failed", schedule_id=7),
+            FunctionCall(id=3, start_time=10 ** 6, end_time=10 ** 6 + 200, status="Timeout", schedule_id=7),
+            FunctionCall(id=4, start_time=10 ** 6 + 100, status="Running", schedule_id=7),
+            FunctionCall(id=5, start_time=200000, end_time=200400, status="Completed", schedule_id=7),
+        ]
+    )
+
+
+class TestFunctionCallStats:
+    def test_load_in_chunks(self, calls):
+        stats = FunctionCallStats._load([FunctionCallList(calls[:2]), calls[2], FunctionCallList(calls[3:])])
+
+        assert [1, 2, 3, 4, 5] == stats.id.tolist()
+        assert math.isnan(stats.duration[3])
+
+    def test_latency_percentiles(self, calls):
+        assert {0: 100.0, 50: 250.0, 100: 400.0} == calls.stats().latency_percentiles([0, 50, 100])
+        assert math.isnan(FunctionCallList([]).stats().latency_percentiles([50])[50])
+
+    def test_throughput(self, calls):
+        bucket_start, counts = calls.stats().throughput(bucket_size=100000)
+
+        assert [0, 100000, 200000, 300000, 400000] == bucket_start[:5].tolist()
+        assert [2, 0, 1] == counts[:3].tolist()
+        assert 2 == counts[-1]
+        assert 5 == counts.sum()
+
+    def test_error_rates(self, calls):
+        assert {
+            None: {"calls": 1, "failure_rate": 0.0, "timeout_rate": 0.0},
+            7: {"calls": 3, "failure_rate": 1 / 3, "timeout_rate": 1 / 3},
+        } == calls.stats().error_rates()
+
+    def test_cold_starts(self, calls):
+        assert [True, False, True, False, True] == calls.stats().cold_starts(idle_time=60000).tolist()
@@ -0,0 +1,77 @@
+import sys
+
+import pytest
+
+from cognite.experimental.function_runtime import LocalFunctionRunner
+
+
+class TestLocalFunctionRunner:
+    def test_call(self, tmp_path):
+        (tmp_path / "handler.py").write_text(
+            "def handle(data, secrets):\n"
+            "    print('got', data['x'])\n"
+            "    return {'y': 2 * data['x'], 'secrets': sorted(secrets)}\n"
+        )
+        with LocalFunctionRunner(str(tmp_path), api_key="key", secrets={"a": "b"}) as runner:
+            call = runner.call({"x": 1})
+            calls = runner.call_many([{"x": x} for x in range(3)])
+
+            assert "Completed" == call.status
+            assert {"y": 2, "secrets": ["a", "apikey"]} == runner.get_response(call.id)
+            assert ["got 1"] == [entry.message for entry in runner.get_logs(call.id)]
+            assert [2, 3, 4] == [call.id for call in calls]
+            assert [0, 2, 4] == [runner.get_response(call.id)["y"] for call in calls]
+            latency = runner.latency()
+            assert 1 == latency["cold"]["calls"]
+            assert 3 == latency["warm"]["calls"]
+
+    def test_call_failed(self, tmp_path):
+        (tmp_path / "handler.py").write_text(
+            "def handle(data):\n"
+            "    if data == 'json':\n"
+            "        return {1, 2}\n"
+            "    raise ValueError('bad input')\n"
+        )
+        with LocalFunctionRunner(str(tmp_path)) as runner:
+            calls = runner.call_many(["error", "json"])
+
+        assert ["Failed", "Failed"] == [call.status for call in calls]
+        assert "ValueError: bad input" == calls[0].error["message"]
+        assert calls[1].error["message"].startswith("TypeError")
+        assert runner.get_response(calls[0].id) is None
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Memory limits are only enforced on Linux")
+    def test_call_memory_limit(self, tmp_path):
+        (tmp_path / "handler.py").write_text("def handle():\n    return len(bytearray(2 * 1024 ** 3))\n")
+        with LocalFunctionRunner(str(tmp_path), memory=1) as runner:
+            call = runner.call()
+
+        assert "Failed" == call.status
+        assert call.error["message"].startswith("MemoryError")
+
+    def test_worker_exit(self, tmp_path):
+        (tmp_path / "handler.py").write_text(
+            "import os\n\ndef handle(data):\n    if data == 'exit':\n        os._exit(3)\n    return data\n"
+        )
+        with LocalFunctionRunner(str(tmp_path)) as runner:
+            calls = runner.call_many(["exit", "ok"])
+
+            assert ["Failed", "Completed"] == [call.status for call in calls]
+            assert "Worker process exited with code 3" == calls[0].error["message"]
+            assert "ok" == runner.get_response(calls[1].id)
+
+    def test_call_timeout(self, tmp_path):
+        (tmp_path / "handler.py").write_text(
+            "import time\n\ndef handle(data):\n    time.sleep(data)\n    return data\n"
+        )
+        with LocalFunctionRunner(str(tmp_path), timeout=1) as runner:
+            calls = runner.call_many([30, 0])
+
+        assert ["Timeout", "Completed"] == [call.status for call in calls]
+        assert calls[0].end_time - calls[0].start_time < 10000
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="Memory limits are not available on Windows")
+    def test_worker_start_failed(self, tmp_path):
+        (tmp_path / "handler.py").write_text("def handle():\n    pass\n")
+        with pytest.raises(RuntimeError, match="Could not start a worker process: TypeError"):
+            LocalFunctionRunner(str(tmp_path), memory=None)